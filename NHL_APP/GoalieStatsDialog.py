@@ -0,0 +1,141 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTableView, QPushButton, QHeaderView, QMessageBox, QSizePolicy, QApplication
+from PyQt5.QtCore import Qt
+import sys
+
+from async_runtime import run_in_background, runtime
+from goalie_table_model import GoalieStatsModel
+from instrumentation import traced
+from refresh_scheduler import refresh_scheduler
+from stats_warehouse import stats_warehouse, warehouse_sync
+
+
+class GoalieStatsDialog(QDialog):
+    def __init__(self, parent=None):
+        """
+        Initializes the GoalieStatsDialog window with a sortable table and sort buttons.
+
+        The goalies are read from the stats warehouse on the shared async runtime, so the dialog opens
+        immediately and the table is filled in when they arrive. Background refreshes are then applied to
+        the rows that changed. Clicking a column header sorts by that column.
+
+        Parameters:
+        - parent: The parent widget of this dialog. Defaults to None.
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Goalie Stats")
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        self.model = GoalieStatsModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(self.table_view)
+
+        self.sort_save_pctg_button = QPushButton("Sort by Save Percentage")
+        layout.addWidget(self.sort_save_pctg_button)
+        self.sort_save_pctg_button.clicked.connect(self.sort_by_save_percentage)
+
+        self.sort_gaa_button = QPushButton("Sort by Goals Against Average")
+        layout.addWidget(self.sort_gaa_button)
+        self.sort_gaa_button.clicked.connect(self.sort_by_goals_against_average)
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(800, 600)  # Set a minimum size to prevent it from becoming too small
+
+        # Fetch goalie data in the background and display it once it arrives
+        self.fetch = run_in_background(fetch_goalie_data(), self.populate_table, self.show_fetch_error, self).future
+
+        # Apply background refreshes to the rows that changed
+        refresh_scheduler().goalies_updated.connect(self.apply_goalie_changes)
+
+    def resume_loading(self):
+        """
+        Fetches the goalies again if the dialog was closed, or the fetch failed, before they arrived.
+        """
+        if self.model.rowCount() == 0 and self.fetch.done():
+            self.fetch = run_in_background(fetch_goalie_data(), self.populate_table, self.show_fetch_error, self).future
+
+    def show_fetch_error(self, error):
+        """
+        Displays an error message to the user when goalie data could not be fetched.
+
+        Parameters:
+        - error (Exception): The exception raised by the fetch.
+        """
+        QMessageBox.critical(self, "Error", f"Failed to fetch goalie data: {str(error)}")
+
+    @traced("GoalieStatsDialog.populate_table", "ui")
+    def populate_table(self, goalie_data):
+        """
+        Replaces the table contents with the given goalies.
+
+        Parameters:
+        - goalie_data (list of GoalieStatLine): The goalies' statistics.
+        """
+        if not goalie_data:
+            self.show_fetch_error(ValueError("No goalies were returned."))
+            return
+        self.model.set_rows(goalie_data)
+        header = self.table_view.horizontalHeader()
+        if header.sortIndicatorSection() >= 0:
+            self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        # Newer statistics arrive through `apply_goalie_changes`
+        refresh_scheduler().refresh_now()
+
+    def apply_goalie_changes(self, changed, removed):
+        """
+        Applies a background refresh to the table, repainting only the rows that changed.
+
+        Parameters:
+        - changed (list of GoalieStatLine): The goalies that are new or whose statistics changed.
+        - removed (list): The key (see `GoalieStatLine.key`) of each goalie no longer on a roster.
+        """
+        self.model.upsert_rows(changed)
+        self.model.remove_goalies(removed)
+
+    def sort_by_save_percentage(self):
+        """
+        Sorts the goalies by save percentage, best first.
+        """
+        self.table_view.sortByColumn(8, Qt.DescendingOrder)
+
+    def sort_by_goals_against_average(self):
+        """
+        Sorts the goalies by goals against average, best (lowest) first.
+        """
+        self.table_view.sortByColumn(7, Qt.AscendingOrder)
+
+    def done(self, result):
+        """
+        Closes the dialog and stops waiting for a fetch still in progress.
+        """
+        self.fetch.cancel()
+        super().done(result)
+
+
+async def fetch_goalie_data():
+    """
+    Asynchronously returns every goalie's statistics from the stats warehouse, syncing it first if it
+    holds no goalies yet.
+
+    Returns:
+        list of GoalieStatLine: The goalies' statistics, most wins first.
+    """
+    goalies = stats_warehouse.goalie_stat_lines()
+    if not goalies:
+        await warehouse_sync.sync(runtime.scheduler)
+        goalies = stats_warehouse.goalie_stat_lines()
+    return goalies
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    dialog = GoalieStatsDialog()
+    try:
+        dialog.show()
+        sys.exit(app.exec_())
+    except Exception as e:
+        print(f"An error occurred: {e}")
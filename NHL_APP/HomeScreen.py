@@ -1,20 +1,31 @@
 import sys
-import requests
-from PyQt5.QtCore import Qt, QByteArray
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtSvg import QSvgWidget, QSvgRenderer
-from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout, QSizePolicy, QWidget
-from shared import top_3_players
-from team_stats import top_3_teams
+from PyQt5.QtCore import Qt, QStringListModel, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QHBoxLayout, QSizePolicy, QWidget, QCompleter
+from async_runtime import run_in_background, runtime
+from asset_cache import asset_loader, placeholder_pixmap
+from instrumentation import traced
+from player_search import player_search
+from refresh_scheduler import refresh_scheduler
+from shared import fetch_top_players
+from team_stats import standings_service
 
+LOGO_SIZE = (150, 100)  # Box the team logos are scaled to fit
+HEADSHOT_SIZE = (300, 150)  # Box the player headshots are scaled to fit
+SEARCH_SUGGESTIONS = 8  # Players suggested under the search box as the user types
 
 
 class HomeScreen(QWidget):
+    # Emitted with a player's name when the user searches for them
+    player_search_requested = pyqtSignal(str)
+
     def __init__(self):
         """
         Initializes the HomeScreen widget.
 
-        Sets the window title, geometry, and initializes the user interface.
+        Sets the window title, geometry, and initializes the user interface. The top teams and featured
+        players start as placeholders, so building the screen never waits on the network. They are filled
+        in from the data the app's refresh scheduler already holds, or else fetched in the background, and
+        are then kept current by the refresh scheduler. The search box suggests players as the user types.
         """
         super().__init__()
 
@@ -23,18 +34,39 @@ class HomeScreen(QWidget):
 
         self.init_ui()
 
+        scheduler = refresh_scheduler()
+        scheduler.standings_updated.connect(self.update_top_teams)
+        scheduler.leaders_updated.connect(self.update_featured_players)
+        if scheduler.standings is not None:
+            self.update_top_teams(scheduler.standings)
+        else:
+            run_in_background(fetch_top_teams(), self.update_top_teams, parent=self)
+        if scheduler.leaders is not None:
+            self.update_featured_players(scheduler.leaders)
+        else:
+            run_in_background(fetch_featured_players(), self.update_featured_players, parent=self)
+
+        self.search_results = []
+        self.search_completer = QCompleter(QStringListModel(self), self)
+        self.search_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.search_players_sb.setCompleter(self.search_completer)
+        self.search_players_sb.textEdited.connect(self.suggest_players)
+        self.search_players_sb.returnPressed.connect(self.search_players)
+        self.search_button.clicked.connect(self.search_players)
+
+    @traced("HomeScreen.init_ui", "ui")
     def init_ui(self):
         """
         Initializes the user interface of the HomeScreen widget.
 
         Creates the layout and adds the title label, description label, and get started button.
-        Sets the fixed size of the container and applies the stylesheet.
+        Sets the fixed size of the container and applies the stylesheet. The top teams and featured players
+        start as placeholders with empty labels; `update_top_teams` and `update_featured_players` fill them
+        in, and the shared asset loader loads their logos and headshots.
         """
         
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignCenter | Qt.AlignTop)
-        top_3 = top_3_teams()
-        top_3_player = top_3_players()
         
         l1_container = QWidget(self)
         l1_container.setObjectName("l1Container")
@@ -75,11 +107,7 @@ class HomeScreen(QWidget):
         
       
         
-        response = requests.get(top_3[0]['logo'])
-        tp_bytes = QByteArray(response.content)
-        tp_renderer = QSvgRenderer(tp_bytes)
-        tp_widget = QSvgWidget()
-        tp_widget.load(tp_bytes)
+        tp_widget = self.image_label(None, *LOGO_SIZE)
         
         
        
@@ -94,12 +122,12 @@ class HomeScreen(QWidget):
         
         
         
-        tn1 = QLabel(top_3[0]['Team'])
+        tn1 = QLabel("")
         tn1.setObjectName("tn1")
         tn1.setFixedHeight(15)
         tn1.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        td1 = QLabel(top_3[0]['wins_losses'])
+        td1 = QLabel("")
         td1.setObjectName("td1")
         td1.setFixedHeight(15)
         td1.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
@@ -110,19 +138,15 @@ class HomeScreen(QWidget):
         s3_container_layout.setSpacing(0)
         s3_container.setContentsMargins(0, 0, 0, 0)
         
-        response = requests.get(top_3[1]['logo'])
-        tp2_bytes = QByteArray(response.content)
-        tp2_renderer = QSvgRenderer(tp2_bytes)
-        tp2_widget = QSvgWidget()
-        tp2_widget.load(tp2_bytes)
+        tp2_widget = self.image_label(None, *LOGO_SIZE)
         tp2_widget.setFixedSize(150, 100)
         
-        tn2 = QLabel(top_3[1]['Team'])
+        tn2 = QLabel("")
         tn2.setObjectName("tn2")
         tn2.setFixedHeight(15)
         tn2.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        td2 = QLabel(top_3[1]['wins_losses'])
+        td2 = QLabel("")
         td2.setObjectName("td2")
         td2.setFixedHeight(15)
         td2.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
@@ -133,19 +157,15 @@ class HomeScreen(QWidget):
         s4_container_layout.setSpacing(0)
         s4_container.setContentsMargins(0, 0, 0, 0)
         
-        response = requests.get(top_3[2]['logo'])
-        tp3_bytes = QByteArray(response.content)
-        tp3_renderer = QSvgRenderer(tp2_bytes)
-        tp3_widget = QSvgWidget()
-        tp3_widget.load(tp3_bytes)
+        tp3_widget = self.image_label(None, *LOGO_SIZE)
         
         
-        tn3 = QLabel(top_3[2]['Team'])
+        tn3 = QLabel("")
         tn3.setObjectName("tn3")
         tn3.setFixedHeight(15)
         tn3.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        td3 = QLabel(top_3[2]['wins_losses'])
+        td3 = QLabel("")
         td3.setObjectName("td3")
         td3.setFixedHeight(15)
         td3.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
@@ -167,27 +187,24 @@ class HomeScreen(QWidget):
         self.view_all_players_button.setObjectName("viewAllPlayersButton")
         self.view_all_players_button.setFixedSize(110, 35)
         
+        self.view_goalies_button = QPushButton("View Goalie Stats", self)
+        self.view_goalies_button.setObjectName("viewGoaliesButton")
+        self.view_goalies_button.setFixedSize(110, 35)
+        
         fp1_container = QWidget(l3_container)
         fp1_container.setObjectName("fp1Container")
         fp1_container_layout = QVBoxLayout(fp1_container)
         
         
-        fp1_url = top_3_player[0]['Picture']
-        fp1_image = QImage()
-        fp1_image.loadFromData(requests.get(fp1_url).content)
-        fp1_pixmap = QPixmap(fp1_image) 
-        fp1_pixmap = fp1_pixmap.scaled(300, 150, Qt.KeepAspectRatio)
-        fp1_label = QLabel()
-        fp1_label.setPixmap(QPixmap(fp1_pixmap))
-        fp1_label.show()
+        fp1_label = self.image_label(None, *HEADSHOT_SIZE)
         fp1_label.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        fp1_name = QLabel(top_3_player[0]['Player'])
+        fp1_name = QLabel("")
         fp1_name.setObjectName("featuredPlayer1")
         fp1_name.setFixedHeight(15)
         fp1_name.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        fp1_data = QLabel(top_3_player[0]['Points'])
+        fp1_data = QLabel("")
         fp1_data.setObjectName("featuredPlayer1Data")
         fp1_data.setFixedHeight(15)
         fp1_data.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
@@ -197,23 +214,16 @@ class HomeScreen(QWidget):
         fp2_container_layout = QVBoxLayout(fp2_container)
         
         
-        fp2_url = top_3_player[1]['Picture']
-        fp2_image = QImage()
-        fp2_image.loadFromData(requests.get(fp2_url).content)
-        fp2_pixmap = QPixmap(fp2_image) 
-        fp2_pixmap = fp2_pixmap.scaled(300, 150, Qt.KeepAspectRatio)
-        fp2_label = QLabel()
-        fp2_label.setPixmap(QPixmap(fp2_pixmap))
-        fp2_label.show()
+        fp2_label = self.image_label(None, *HEADSHOT_SIZE)
         fp2_label.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
         
-        fp2_name = QLabel(top_3_player[1]['Player'])
+        fp2_name = QLabel("")
         fp2_name.setObjectName("featuredPlayer2")
         fp2_name.setFixedHeight(15)
         fp2_name.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        fp2_data = QLabel(top_3_player[1]['Points'])
+        fp2_data = QLabel("")
         fp2_data.setObjectName("featuredPlayer2Data")
         fp2_data.setFixedHeight(15)
         fp2_data.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
@@ -222,22 +232,15 @@ class HomeScreen(QWidget):
         fp3_container.setObjectName("fp3Container")
         fp3_container_layout = QVBoxLayout(fp3_container)
         
-        fp3_url = top_3_player[2]['Picture']
-        fp3_image = QImage()
-        fp3_image.loadFromData(requests.get(fp3_url).content)
-        fp3_pixmap = QPixmap(fp3_image) 
-        fp3_pixmap = fp3_pixmap.scaled(300, 150, Qt.KeepAspectRatio)
-        fp3_label = QLabel()
-        fp3_label.setPixmap(QPixmap(fp3_pixmap))
-        fp3_label.show()
+        fp3_label = self.image_label(None, *HEADSHOT_SIZE)
         fp3_label.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        fp3_name = QLabel(top_3_player[2]['Player'])
+        fp3_name = QLabel("")
         fp3_name.setObjectName("featuredPlayer3")
         fp3_name.setFixedHeight(15)
         fp3_name.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
         
-        fp3_data = QLabel(top_3_player[2]['Points'])
+        fp3_data = QLabel("")
         fp3_data.setObjectName("featuredPlayer3Data")
         fp3_data.setFixedHeight(15)
         fp3_data.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
@@ -371,6 +374,7 @@ class HomeScreen(QWidget):
         
         v3_container_layout.addWidget(self.featured_players_label)
         v3_container_layout.addWidget(self.view_all_players_button, alignment=Qt.AlignLeft)
+        v3_container_layout.addWidget(self.view_goalies_button, alignment=Qt.AlignLeft)
         
         l4_container_layout.addWidget(self.player_search_label)
         l4_container_layout.addWidget(self.search_players_sb, alignment=Qt.AlignHCenter)
@@ -389,6 +393,10 @@ class HomeScreen(QWidget):
         layout.addWidget(l4_container, alignment=Qt.AlignCenter | Qt.AlignTop)
         layout.addWidget(l5_container, alignment=Qt.AlignCenter | Qt.AlignTop)
         
+        # Keep the widgets showing the top teams and featured players so refreshes can update them in place
+        self.top_team_widgets = [(tp_widget, tn1, td1), (tp2_widget, tn2, td2), (tp3_widget, tn3, td3)]
+        self.featured_player_widgets = [(fp1_label, fp1_name, fp1_data), (fp2_label, fp2_name, fp2_data),
+                                        (fp3_label, fp3_name, fp3_data)]
         
         
         
@@ -399,10 +407,118 @@ class HomeScreen(QWidget):
             
         self.setLayout(layout)
         self.setStyleSheet(stylesheet)
+
+    def image_label(self, url, width, height):
+        """
+        Creates a label showing a placeholder until the image at `url` has been loaded.
+
+        The image is loaded in the background by the shared asset loader, which serves it from memory or
+        disk when it has been seen before, and is scaled to fit a `width` by `height` box.
+
+        Parameters:
+            url (str or None): The URL of the team logo or player headshot, or None to show the placeholder
+                until `set_image` is given one.
+            width (int): The width of the box the image is scaled to fit.
+            height (int): The height of the box the image is scaled to fit.
+
+        Returns:
+            QLabel: The label, which shows the image once it arrives.
+        """
+        label = QLabel()
+        label.setAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+        label.setPixmap(placeholder_pixmap(min(width, height), min(width, height)))
+        self.set_image(label, url, width, height)
+        return label
+
+    def set_image(self, label, url, width, height):
+        """
+        Loads the image at `url` into a label made by `image_label`, unless the label already shows it.
+        """
+        if not url or label.property("imageUrl") == url:
+            return
+        label.setProperty("imageUrl", url)
+        asset_loader().load(url, width, height, label.setPixmap)
+
+    def update_top_teams(self, snapshot):
+        """
+        Updates the top three teams from new standings, changing only the labels whose values changed.
+
+        Parameters:
+            snapshot (StandingsSnapshot): The current standings.
+        """
+        for (logo, name, record), team in zip(self.top_team_widgets, snapshot.top(3)):
+            self.set_image(logo, team['logo'], *LOGO_SIZE)
+            name.setText(team['Team'])
+            record.setText(team['wins_losses'])
+
+    def update_featured_players(self, players):
+        """
+        Updates the featured players from new points leaders, changing only the labels whose values changed.
+
+        Parameters:
+            players (list of dict): The leaders in the shape returned by `fetch_top_players`.
+        """
+        for (picture, name, points), player in zip(self.featured_player_widgets, players):
+            self.set_image(picture, player['Picture'], *HEADSHOT_SIZE)
+            name.setText(player['Player'])
+            points.setText(player['Points'])
+
+    @staticmethod
+    def suggestion_text(entry):
+        """
+        Returns the text a search result is listed as, e.g. "Connor McDavid (EDM)".
+        """
+        return f"{entry.name} ({entry.team})"
+
+    def suggest_players(self, text):
+        """
+        Lists the players best matching the text typed so far under the search box.
+
+        Parameters:
+            text (str): The contents of the search box.
+        """
+        self.search_results = player_search.search(text, SEARCH_SUGGESTIONS)
+        self.search_completer.model().setStringList([self.suggestion_text(entry) for entry in self.search_results])
+        if self.search_results:
+            self.search_completer.complete()
+
+    def search_players(self):
+        """
+        Emits `player_search_requested` with the player picked from the suggestions, or else the best match.
+
+        If nothing matches, the text is passed on as typed.
+        """
+        text = self.search_players_sb.text().strip()
+        if not text:
+            return
+        if not any(self.suggestion_text(entry) == text for entry in self.search_results):
+            self.search_results = player_search.search(text, SEARCH_SUGGESTIONS)
+        chosen = next((entry for entry in self.search_results if self.suggestion_text(entry) == text),
+                      self.search_results[0] if self.search_results else None)
+        self.player_search_requested.emit(chosen.name if chosen is not None else text)
         
         
     
 
+async def fetch_top_teams():
+    """
+    Asynchronously returns the current standings for the top teams, sharing the runtime's connection pool.
+
+    Returns:
+        StandingsSnapshot: The current standings.
+    """
+    return await standings_service.snapshot(runtime.scheduler)
+
+async def fetch_featured_players():
+    """
+    Asynchronously returns the points leaders shown as the featured players.
+
+    Returns:
+        list of dict: The leaders in the shape returned by `fetch_top_players`.
+    """
+    return await fetch_top_players(runtime.scheduler)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     home_screen = HomeScreen()
@@ -1,9 +1,8 @@
 import sys
-import pyodbc
-import bcrypt
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QFormLayout, QSpacerItem, QSizePolicy
+from auth_service import auth_service
 
 class LoginApp(QWidget):
     """
@@ -15,16 +14,25 @@ class LoginApp(QWidget):
         password_edit (QLineEdit): The text input field for the password.
         login_button (QPushButton): The button to initiate the login process.
         register_here_label (QLabel): The label indicating the option to register.
+
+    Parameters:
+        auth (AuthService, optional): The service that checks the credentials. Defaults to the app-wide one.
     """
     login_Successful = pyqtSignal()
     register = pyqtSignal()
-    def __init__(self):
+    def __init__(self, auth=None):
         super().__init__()
 
         self.setWindowTitle("NHL Statistics App - Login")
         self.login_attempts = 0 # Keeps track of the number of login attempts
         
         self.init_ui()
+
+        # Credentials are checked on the auth service's worker threads; the outcome arrives as signals
+        self.auth = auth or auth_service()
+        self.auth.login_succeeded.connect(self.on_login_succeeded)
+        self.auth.login_rejected.connect(self.on_login_rejected)
+        self.auth.login_failed.connect(self.on_login_failed)
         
     def init_ui(self):
         """
@@ -58,10 +66,10 @@ class LoginApp(QWidget):
         self.register_here_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
         
         
-        spacer_item = QSpacerItem(0, 20)
-        layout.addItem(spacer_item)
+        # Each spacer needs its own item, since the layout deletes every item it holds
+        layout.addItem(QSpacerItem(0, 20))
         layout.addRow(self.title_label)
-        layout.addItem(spacer_item)
+        layout.addItem(QSpacerItem(0, 20))
         layout.addRow(self.username_edit)      
         layout.addRow(self.password_edit)
         layout.addRow(self.login_button)
@@ -82,42 +90,49 @@ class LoginApp(QWidget):
         Performs the login process by retrieving the entered username and password,
         and validating them against the actual authentication logic.
 
-        If the login is successful, a success message is displayed.
-        Otherwise, an error message is displayed.
+        The check runs on the auth service's worker threads, so the window stays responsive. The login
+        button is disabled until the outcome arrives, so repeated clicks do not queue more checks.
         """
-        conn_str = (
-            r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
-            r"DBQ=C:\\Users\\domus\\OneDrive - Hillsborough Community College\\Desktop\\DB\\Database21.accdb"
-        )
-        self.conn = pyodbc.connect(conn_str)
-        self.cursor = self.conn.cursor()
-        
         username = self.username_edit.text()
         password = self.password_edit.text()
-        try:
-            query = "SELECT * FROM Users WHERE Username = ?"
-            self.cursor.execute(query, (username,))
-            user = self.cursor.fetchone()
+        self.login_button.setEnabled(False)
+        self.auth.login(username, password)
 
-            if user is not None:
-                stored_password = user.Password  # Assuming 'Password' is the column name in the database
-                # Check if the provided password matches the stored hashed password
-                if bcrypt.checkpw(password.encode(), stored_password.encode()):
-                    QMessageBox.information(self, "Login Successful", "Welcome, {}".format(username))
-                    self.login_Successful.emit()
-                
-                    return
-                else:
-                    self.login_attempts += 1
-                    if self.login_attempts >= 5:
-                        QMessageBox.warning(self, "Login Failed", "You have exceeded the maximum number of login attempts. Please try again later.")
-                    else:
-                        QMessageBox.warning(self, "Login Failed", "Invalid username or password. Please try again.")
-            else: 
-                QMessageBox.warning(self, "Login Failed", "Invalid username or password. Please try again.")
-        except Exception as e:
-            print("Error:", e)
-            QMessageBox.critical(self, "Error", "An error occurred. Please try again later.")
+    def on_login_succeeded(self, username):
+        """
+        Welcomes the user and announces the successful login.
+
+        Parameters:
+            username (str): The user who logged in.
+        """
+        self.login_button.setEnabled(True)
+        QMessageBox.information(self, "Login Successful", "Welcome, {}".format(username))
+        self.login_Successful.emit()
+
+    def on_login_rejected(self, username):
+        """
+        Tells the user the credentials were wrong, and that they should wait after too many attempts.
+
+        Parameters:
+            username (str): The username that was rejected.
+        """
+        self.login_button.setEnabled(True)
+        self.login_attempts += 1
+        if self.login_attempts >= 5:
+            QMessageBox.warning(self, "Login Failed", "You have exceeded the maximum number of login attempts. Please try again later.")
+        else:
+            QMessageBox.warning(self, "Login Failed", "Invalid username or password. Please try again.")
+
+    def on_login_failed(self, message):
+        """
+        Tells the user the login could not be checked.
+
+        Parameters:
+            message (str): The error raised while checking the login.
+        """
+        self.login_button.setEnabled(True)
+        print("Error:", message)
+        QMessageBox.critical(self, "Error", "An error occurred. Please try again later.")
     def register_here(self):
         self.register.emit()
             
@@ -1,17 +1,123 @@
 import sys
-import asyncio
-from PyQt5.QtWidgets import QApplication, QDialog, QTableWidget, QTableWidgetItem, QVBoxLayout, QPushButton, QHeaderView, QMessageBox, QSizePolicy
-from PyQt5.QtCore import Qt
-from shared import get_all_team_rosters_and_player_stats
+import time
+from PyQt5.QtWidgets import QApplication, QDialog, QTableView, QVBoxLayout, QPushButton, QHeaderView, QMessageBox, QSizePolicy, QProgressBar, QLineEdit
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from async_runtime import run_in_background, runtime
+from instrumentation import traced
+from player_table_model import PlayerStatsModel, PlayerStatsFilterProxy
+from refresh_scheduler import refresh_scheduler
+from stats_warehouse import stats_warehouse, warehouse_sync
+
+BATCH_SIZE = 50  # Maximum number of players appended to the table at once
+BATCH_INTERVAL = 0.1  # Maximum number of seconds a fetched player waits before being shown
+
+class PlayerStatsLoader(QObject):
+    """
+    Loads player statistics on the shared async runtime and hands them to the GUI thread in batches.
+
+    Players stored in the local stats warehouse are delivered at once, without any network request.
+    Only when the warehouse is empty are players streamed from the API as they are synced into it; they
+    are grouped into batches of at most `BATCH_SIZE` records, and a batch is flushed at least every
+    `BATCH_INTERVAL` seconds. Signals are emitted from the runtime thread and queued to the GUI thread.
+
+    Once players were delivered, the loader asks the app's refresh scheduler for a cycle. The warehouse is
+    then brought up to date by that cycle, which announces what changed through `players_updated`.
+
+    Signals:
+        rows_ready (list): Emitted with each batch of `PlayerStatLine` records.
+        progress (int, int): Emitted with the number of players fetched and the number expected so far.
+        failed (str): Emitted with an error message if no player data could be fetched.
+        finished: Emitted once loading has stopped, whether it succeeded or not.
+
+    Attributes:
+        running (bool): True while a stream is in progress.
+        completed (bool): True once a stream has delivered every player.
+    """
+    rows_ready = pyqtSignal(list)
+    progress = pyqtSignal(int, int)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.future = None
+        self.running = False
+        self.completed = False
+
+    def start(self):
+        """
+        Starts streaming players on the shared async runtime.
+        """
+        self.running = True
+        self.future = run_in_background(self.stream_batches(), self.on_stream_finished, self.on_stream_failed,
+                                        self).future
+
+    async def stream_batches(self):
+        """
+        Asynchronously emits the players stored in the warehouse, or streams them in batches while the
+        warehouse is first filled.
+
+        Returns:
+            int: The number of players received.
+        """
+        stored = stats_warehouse.player_stat_lines()
+        if stored:
+            self.progress.emit(len(stored), len(stored))
+            self.rows_ready.emit(stored)
+            return len(stored)
+
+        batch = []
+        last_flush = time.monotonic()
+        received = 0
+        async for player in warehouse_sync.stream(runtime.scheduler, progress=self.progress.emit):
+            batch.append(player)
+            received += 1
+            if len(batch) >= BATCH_SIZE or time.monotonic() - last_flush >= BATCH_INTERVAL:
+                self.rows_ready.emit(batch)
+                batch = []
+                last_flush = time.monotonic()
+        if batch:
+            self.rows_ready.emit(batch)
+        if received == 0:
+            # Another sync filled the warehouse while this one waited for it
+            stored = stats_warehouse.player_stat_lines()
+            if stored:
+                self.rows_ready.emit(stored)
+            received = len(stored)
+        return received
+
+    def on_stream_finished(self, received):
+        self.running = False
+        self.completed = received > 0
+        if received == 0:
+            self.failed.emit("No player data was returned.")
+        else:
+            refresh_scheduler().refresh_now()
+        self.finished.emit()
+
+    def on_stream_failed(self, error):
+        self.running = False
+        self.failed.emit(str(error))
+        self.finished.emit()
+
+    def stop(self):
+        """
+        Cancels the stream if it is still running.
+        """
+        if self.future is not None:
+            self.future.cancel()
+        self.running = False
 
 class PlayerStatsDialog(QDialog):
     def __init__(self, parent=None):
         """
         Initialize the PlayerStatsDialog window with a table and sorting buttons.
 
-        This method sets up the UI for the PlayerStatsDialog, including a table to display player stats
-        and buttons to sort these stats by goals, assists, and points. It also initiates the asynchronous
-        fetching and displaying of player data.
+        This method sets up the UI for the PlayerStatsDialog, including a filter box, a table to display player
+        stats, a progress bar, and buttons to sort these stats by goals, assists, and points. The table is a view
+        over a column-oriented `PlayerStatsModel`, so only visible cells are ever materialized. The dialog opens
+        immediately; player data is streamed in the background and appended to the model in batches, so
+        the table can be scrolled, sorted and filtered while loading continues.
 
         Parameters:
         - parent: The parent widget of this dialog. Defaults to None.
@@ -21,14 +127,36 @@ class PlayerStatsDialog(QDialog):
         """
         super().__init__(parent)
         self.setWindowTitle("Player Stats")
-        
+
         # Set up the layout for the dialog
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        # Create and add the table widget to the layout
-        self.table_widget = QTableWidget()
-        layout.addWidget(self.table_widget)
+        # Create and add the filter box to the layout
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by player or team")
+        layout.addWidget(self.filter_edit)
+
+        # Create the model, the filter proxy in front of it, and the table view showing them
+        self.model = PlayerStatsModel(self)
+        self.proxy_model = PlayerStatsFilterProxy(self)
+        self.proxy_model.setSourceModel(self.model)
+        self.filter_edit.textChanged.connect(self.proxy_model.set_filter_text)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.proxy_model)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table_view.horizontalHeader().setResizeContentsPrecision(50)  # Size columns from a sample of rows, not all of them
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        layout.addWidget(self.table_view)
+
+        # Create and add the progress bar shown while players are loading
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("Loaded %v of %m players")
+        self.progress_bar.setRange(0, 0)
+        layout.addWidget(self.progress_bar)
 
         # Create and add the "Sort by Goals" button to the layout
         self.sort_goals_button = QPushButton("Sort by Goals")
@@ -44,95 +172,86 @@ class PlayerStatsDialog(QDialog):
         self.sort_points_button = QPushButton("Sort by Points")
         layout.addWidget(self.sort_points_button)
         self.sort_points_button.clicked.connect(self.sort_by_points)
-        
-        # Asynchronously fetch and display player data
-        asyncio.run(self.fetch_and_display_player_data())
-        
-    async def fetch_player_data(self):
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(800, 600)  # Set a minimum size to prevent it from becoming too small
+
+        # Stream player data in the background
+        self.loader = PlayerStatsLoader(self)
+        self.loader.rows_ready.connect(self.append_rows)
+        self.loader.progress.connect(self.update_progress)
+        self.loader.failed.connect(self.show_fetch_error)
+        self.loader.finished.connect(self.progress_bar.hide)
+        self.loader.start()
+
+        # Apply background refreshes to the rows that changed
+        refresh_scheduler().players_updated.connect(self.apply_player_changes)
+
+    def update_progress(self, done, expected):
         """
-        Asynchronously fetches player data using the get_all_team_rosters_and_player_stats function.
+        Updates the progress bar with the number of players fetched so far.
 
-        This method attempts to retrieve player data asynchronously. If successful, it returns the fetched data.
-        In case of any exception, it returns None and expects the calling method to handle the error appropriately.
+        Parameters:
+        - done (int): The number of players fetched.
+        - expected (int): The number of players expected, which grows as team rosters arrive.
+        """
+        self.progress_bar.setRange(0, max(expected, done))
+        self.progress_bar.setValue(done)
 
-        Returns:
-            player_data (dict or None): The fetched player data as a dictionary if the fetch is successful, or None if an exception occurs.
+    def show_fetch_error(self, message):
         """
-        try:
-            player_data = await get_all_team_rosters_and_player_stats()
-            return player_data
-        except Exception as e:
-            # If an error occurs during fetching, return None and handle the error in fetch_and_display_player_data
-            return None
+        Displays an error message to the user when player data could not be fetched.
 
-    async def fetch_and_display_player_data(self):
+        Parameters:
+        - message (str): A description of what went wrong.
         """
-        Asynchronously fetches player data and displays it in the table widget.
+        QMessageBox.critical(self, "Error", f"Failed to fetch player data. {message}")
 
-        This method first attempts to fetch player data asynchronously. If the data is successfully retrieved,
-        it calls the populate_table method to display the data in the table widget. If the fetch operation fails,
-        it displays an error message to the user using a QMessageBox.
+    @traced("PlayerStatsDialog.populate_table", "ui")
+    def populate_table(self, player_data):
+        """
+        Populates the table with player data, replacing any rows already shown.
 
         Parameters:
-        None
+        - player_data (list of PlayerStatLine): The statistics of each player, one record per player.
 
         Returns:
         None
         """
-        player_data = await self.fetch_player_data()
-        if player_data is not None:
-            # Populate table with player data
-            self.populate_table(player_data)
-        else:
-            QMessageBox.critical(self, "Error", "Failed to fetch player data.")
+        self.model.set_rows(player_data)
 
-    def populate_table(self, player_data):
+    @traced("PlayerStatsDialog.append_rows", "ui")
+    def append_rows(self, player_data):
         """
-        Populates the table widget with player data.
+        Appends a batch of players to the table.
 
-        This method sets the table dimensions based on the number of players (rows) and the number of attributes
-        per player (columns). It then sets the table headers using the keys from the first player's dictionary.
-        Each player's data is inserted into the table, with special handling for numeric values in columns 3, 4, and 5
-        to ensure they are displayed correctly. Finally, it adjusts the table's appearance and sets a minimum size
-        for the dialog.
+        The model re-applies the active sort after the batch is inserted, so a column the user sorted by
+        stays sorted as new rows arrive. Players already in the table are updated instead of added twice.
 
         Parameters:
-        - player_data (list of dict): A list where each element is a dictionary representing a player's statistics.
+        - player_data (list of PlayerStatLine): The statistics of each player, one record per player.
 
         Returns:
         None
         """
-        # Set table dimensions
-        num_rows = len(player_data)
-        num_columns = len(player_data[0])
-
-        self.table_widget.setRowCount(num_rows)
-        self.table_widget.setColumnCount(num_columns)
-
-        # Set table headers
-        headers = list(player_data[0].keys())
-        self.table_widget.setHorizontalHeaderLabels(headers)
-
-        # Populate table with player data
-        for row, player in enumerate(player_data):
-            for col, (key, value) in enumerate(player.items()):
-                if col in [3, 4, 5]:  # Special handling for numeric values in specific columns
-                    item = QTableWidgetItem()
-                    item.setData(Qt.DisplayRole, float(value))
-                else: 
-                    item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() ^ Qt.ItemIsEditable)
-                self.table_widget.setItem(row, col, item)
-
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setMinimumSize(800, 600)  # Set a minimum size for the dialog  # Set a minimum size to prevent it from becoming too small
+        self.model.upsert_rows(player_data)
+
+    def apply_player_changes(self, changed, removed):
+        """
+        Applies a background refresh to the table, repainting only the rows that changed.
+
+        Parameters:
+        - changed (list of PlayerStatLine): The players that are new or whose statistics changed.
+        - removed (list): The key (see `PlayerStatLine.key`) of each player no longer on a roster.
+        """
+        self.model.upsert_rows(changed)
+        self.model.remove_players(removed)
 
     def sort_by_goals(self):
         """
         Sorts the table rows based on the 'Goals' column in descending order.
 
-        This method sorts the player data displayed in the table widget, arranging the players by their goal count
+        This method sorts the player data displayed in the table, arranging the players by their goal count
         from highest to lowest. It assumes that the 'Goals' data is located in the fourth column (index 3) of the table.
 
         Parameters:
@@ -141,14 +260,14 @@ class PlayerStatsDialog(QDialog):
         Returns:
         None
         """
-        self.table_widget.sortItems(3, Qt.DescendingOrder)  # Assuming 'Goals' column is at index 3  # Assuming 'Goals' column is at index 3
-        
+        self.table_view.sortByColumn(3, Qt.DescendingOrder)  # Assuming 'Goals' column is at index 3
+
 
     def sort_by_assists(self):
         """
         Sorts the table rows based on the 'Assists' column in descending order.
 
-        This method sorts the player data displayed in the table widget, arranging the players by their assist count
+        This method sorts the player data displayed in the table, arranging the players by their assist count
         from highest to lowest. It assumes that the 'Assists' data is located in the fifth column (index 4) of the table.
 
         Parameters:
@@ -157,13 +276,13 @@ class PlayerStatsDialog(QDialog):
         Returns:
         None
         """
-        self.table_widget.sortItems(4, Qt.DescendingOrder)  # Assuming 'Assists' column is at index 4  # Assuming 'Assists' column is at index 4
+        self.table_view.sortByColumn(4, Qt.DescendingOrder)  # Assuming 'Assists' column is at index 4
 
     def sort_by_points(self):
         """
         Sorts the table rows based on the 'Points' column in descending order.
 
-        This method sorts the player data displayed in the table widget, arranging the players by their points count
+        This method sorts the player data displayed in the table, arranging the players by their points count
         from highest to lowest. It assumes that the 'Points' data is located in the sixth column (index 5) of the table.
 
         Parameters:
@@ -172,9 +291,25 @@ class PlayerStatsDialog(QDialog):
         Returns:
         None
         """
-        self.table_widget.sortItems(5, Qt.DescendingOrder)  # Assuming 'Points' column is at index 5  # Assuming 'Points' column is at index 5
-            
-        
+        self.table_view.sortByColumn(5, Qt.DescendingOrder)  # Assuming 'Points' column is at index 5
+
+    def resume_loading(self):
+        """
+        Starts loading again if the dialog was closed before every player had arrived, so a dialog that is
+        kept and reopened ends up complete. The players already shown stay in the table.
+        """
+        if not self.loader.completed and not self.loader.running:
+            self.progress_bar.show()
+            self.loader.start()
+
+    def done(self, result):
+        """
+        Stops any loading still in progress before the dialog closes.
+        """
+        self.loader.stop()
+        super().done(result)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     dialog = PlayerStatsDialog()
@@ -1,13 +1,14 @@
 import sys
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QFormLayout, QMessageBox
-import pyodbc
-import bcrypt
+from auth_service import auth_service
 class RegistrationPage(QWidget):
-    def __init__(self):
+    def __init__(self, auth=None):
         """
         Initialize the main window.
 
+        Parameters:
+        - auth (AuthService, optional): The service that stores new users. Defaults to the app-wide one.
         """
         super().__init__()
 
@@ -16,6 +17,12 @@ class RegistrationPage(QWidget):
 
         self.init_ui()
 
+        # Passwords are hashed and stored on the auth service's worker threads
+        self.auth = auth or auth_service()
+        self.auth.registration_succeeded.connect(self.on_registration_succeeded)
+        self.auth.registration_rejected.connect(self.on_registration_rejected)
+        self.auth.registration_failed.connect(self.on_registration_failed)
+
     def init_ui(self):
         self.dark_mode = False
 
@@ -91,14 +98,9 @@ class RegistrationPage(QWidget):
         """
         Register a new user.
 
+        The fields are validated here; hashing the password and storing the user run on the auth
+        service's worker threads, and the register button is disabled until they are done.
         """
-        conn_str = (
-            r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
-            r"DBQ=C:\\Users\\domus\\OneDrive - Hillsborough Community College\\Desktop\\DB\\Database21.accdb"
-        )
-        self.conn = pyodbc.connect(conn_str)
-        self.cursor = self.conn.cursor()
-
         username = self.username_edit.text()
         email = self.email_edit.text()
         password = self.password_edit.text()
@@ -117,44 +119,46 @@ class RegistrationPage(QWidget):
             QMessageBox().warning(self, "Registration", "Password must be at least 8 characters long.")
             return
 
-        # Hash the password securely before storing it
-        hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-        try:
-            #check if the email already exists in the database
-            query = "SELECT * FROM Users WHERE Email = ?"
-            self.cursor.execute(query, (email,))
-            result = self.cursor.fetchone()
-            if result is not None and result[0] > 0:
-                QMessageBox().warning(self, "Registration", "Email already exists!")
-                return
-                
-            # Insert the user data into the database
-            query = "INSERT INTO Users (Username, Email, Password) VALUES (?,?,?)"
-            self.cursor.execute(query, (username, email, hashed_password))
-            self.conn.commit()
-
-            # Clear the input fields
-            self.username_edit.clear()
-            self.email_edit.clear()
-            self.password_edit.clear()
-            self.confirm_password_edit.clear()
-
-            # Display a success message
-            QMessageBox().information(self, "Registration", "User registered successfully!")
-        except pyodbc.Error as e:
-            QMessageBox().critical(self, "Registration Error", f"An error occurred: {str(e)}")
-        except Exception as e:
-            QMessageBox().critical(self, "Registration Error", f"An unexpected error occurred: {str(e)}")
-
-    def closeEvent(self, event):
+        self.register_button.setEnabled(False)
+        self.auth.register(username, email, password)
+
+    def on_registration_succeeded(self, username):
+        """
+        Clears the form and confirms the registration.
+
+        Parameters:
+        - username (str): The user who was registered.
+        """
+        self.register_button.setEnabled(True)
+
+        # Clear the input fields
+        self.username_edit.clear()
+        self.email_edit.clear()
+        self.password_edit.clear()
+        self.confirm_password_edit.clear()
+
+        # Display a success message
+        QMessageBox().information(self, "Registration", "User registered successfully!")
+
+    def on_registration_rejected(self, reason):
+        """
+        Tells the user why the registration was refused, e.g. because the email is taken.
+
+        Parameters:
+        - reason (str): The reason shown to the user.
+        """
+        self.register_button.setEnabled(True)
+        QMessageBox().warning(self, "Registration", reason)
+
+    def on_registration_failed(self, message):
         """
-        Close the database connection when the window is closed.
+        Tells the user the registration could not be stored.
 
+        Parameters:
+        - message (str): The error raised while storing the user.
         """
-        # Close the database connection when the window is closed
-        self.conn.close()           
-                # Load stylesheet from external file
+        self.register_button.setEnabled(True)
+        QMessageBox().critical(self, "Registration Error", f"An error occurred: {message}")
             
             
 
@@ -1,25 +1,32 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QHeaderView, QMessageBox, QSizePolicy, QApplication
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableView, QPushButton, QHeaderView, QMessageBox,
+                             QSizePolicy, QApplication, QComboBox, QLineEdit)
 from PyQt5.QtCore import Qt
-import asyncio
 import sys
 
-from team_stats import team_standings  # Import the function to fetch team data
+from async_runtime import run_in_background, runtime
+from instrumentation import traced
+from refresh_scheduler import refresh_scheduler
+from stats_warehouse import stats_warehouse
+from team_stats import TEAM_STAT_COLUMNS, standings_service
+from team_table_model import TeamStatsFilterProxy, TeamStatsModel
 
 class TeamStatsDialog(QDialog):
     def __init__(self, parent=None):
         """
-        Initializes the TeamStatsDialog window with a table widget and a sort button.
+        Initializes the TeamStatsDialog window with a filter, a table view and a sort button.
 
-        This method sets up the UI components for the TeamStatsDialog, including a table to display team statistics
-        and a button to sort these statistics by wins. It also triggers the asynchronous fetching and displaying of
-        team data upon initialization.
+        This method sets up the UI components for the TeamStatsDialog, including a filter on any column, a table
+        to display team statistics and a button to sort these statistics by wins. The table is a view over a
+        `TeamStatsModel`, which keeps the statistics as numbers and adds derived metrics such as the points
+        percentage and the points pace; clicking a column header sorts by that column. It also triggers the
+        asynchronous fetching and displaying of team data upon initialization. The data is fetched on the shared
+        async runtime, so the dialog opens immediately and the table is filled in when the standings arrive.
 
         Parameters:
         - parent: The parent widget of this dialog. Defaults to None.
 
-        The layout is a QVBoxLayout, which arranges the table widget and the sort button vertically.
-        The sort button is connected to the sort_by_wins method, which sorts the table's contents.
-        The fetch_and_display_team_data coroutine is called to asynchronously fetch and display the team data.
+        The fetch_team_data coroutine runs in the background and its result is delivered to populate_table on the
+        GUI thread.
         """
         super().__init__(parent)
         self.setWindowTitle("Team Stats")
@@ -27,77 +34,115 @@ class TeamStatsDialog(QDialog):
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        self.table_widget = QTableWidget()
-        layout.addWidget(self.table_widget)
+        # Create and add the filter: the column to look in and the text or comparison to look for
+        filter_layout = QHBoxLayout()
+        self.filter_column = QComboBox()
+        self.filter_column.addItems(["All columns"] + TEAM_STAT_COLUMNS)
+        filter_layout.addWidget(self.filter_column)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter, e.g. a team, or >= 90 on a numeric column")
+        filter_layout.addWidget(self.filter_edit)
+        layout.addLayout(filter_layout)
+
+        # Create the model, the filter proxy in front of it, and the table view showing them
+        self.model = TeamStatsModel(self)
+        self.proxy_model = TeamStatsFilterProxy(self)
+        self.proxy_model.setSourceModel(self.model)
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        self.filter_column.currentIndexChanged.connect(self.apply_filter)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.proxy_model)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        layout.addWidget(self.table_view)
 
         self.sort_button = QPushButton("Sort by Wins")
         layout.addWidget(self.sort_button)
         self.sort_button.clicked.connect(self.sort_by_wins)
 
-        # Fetch and display team data
-        asyncio.run(self.fetch_and_display_team_data())
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(800, 600)  # Set a minimum size to prevent it from becoming too small
+
+        # Fetch team data in the background and display it once it arrives
+        self.fetch_and_display_team_data()
+
+        # Apply background refreshes to the rows that changed
+        refresh_scheduler().standings_updated.connect(self.update_standings)
+
+    def fetch_and_display_team_data(self):
+        """
+        Fetches team data on the shared async runtime and populates the table with this data.
+
+        This method schedules the `fetch_team_data` coroutine on the app's event loop. Upon successful
+        retrieval of the data, `populate_table` is called on the GUI thread to display the data in the table.
+        If an error occurs during the fetch operation, `show_fetch_error` displays an error message dialog.
+        """
+        self.fetch = run_in_background(fetch_team_data(), self.populate_table, self.show_fetch_error, self).future
 
-    async def fetch_and_display_team_data(self):
+    def resume_loading(self):
+        """
+        Fetches the team data again if the last fetch ended without filling the table, so a dialog that is
+        kept and reopened after a failure tries once more.
         """
-        Asynchronously fetches team data and populates the table widget with this data.
+        if self.model.rowCount() == 0 and self.fetch.done():
+            self.fetch_and_display_team_data()
 
-        This method attempts to fetch team data using the `fetch_team_data` coroutine. Upon successful
-        retrieval of the data, it calls `populate_table` to display the data in the table widget. If an
-        error occurs during the fetch operation, it displays an error message dialog.
+    def show_fetch_error(self, error):
+        """
+        Displays an error message to the user when team data could not be fetched.
 
-        Exceptions:
-            Exception: Catches and handles any exception that occurs during the fetch operation, displaying
-                    an error message dialog to the user.
+        Parameters:
+        - error (Exception): The exception raised by the fetch.
         """
-        try:
-            # Fetch team data asynchronously
-            team_data = await fetch_team_data()
+        QMessageBox.critical(self, "Error", f"Failed to fetch team data: {str(error)}")
 
-            # Populate table with team data
-            self.populate_table(team_data)
-        except Exception as e:
-            # Handle exceptions by displaying an error message to the user
-            QMessageBox.critical(self, "Error", f"Failed to fetch team data: {str(e)}")
+    def apply_filter(self):
+        """
+        Filters the table on the chosen column with the text entered.
+        """
+        self.proxy_model.set_filter(self.filter_edit.text(), self.filter_column.currentIndex() - 1)
 
+    @traced("TeamStatsDialog.populate_table", "ui")
     def populate_table(self, team_data):
         """
-        Populates the table widget with team data.
+        Populates the table with team data.
 
-        This method sets the table dimensions based on the number of items in the team_data list and the number of keys in the first item of the list, which represent the columns. It then sets the table headers using the keys from the first item in the team_data list. Each item in the team_data list is a dictionary representing a team, with keys as column headers and values as the data for those columns. The method iterates over each team in the team_data list, creating a QTableWidgetItem for each piece of data and adding it to the table widget.
+        The derived columns are computed for every team at once when the data is handed to the model, so
+        repainting the table computes nothing.
 
         Parameters:
-        - team_data (list of dict): A list of dictionaries, where each dictionary contains data about a team.
+        - team_data (list of dict): A list of dictionaries, where each dictionary contains data about a team, shaped
+          like `StandingsSnapshot.teams`.
 
         Returns:
         - None
         """
-        # Set table dimensions
-        num_rows = len(team_data)
-        num_columns = len(team_data[0])
-
-        self.table_widget.setRowCount(num_rows)
-        self.table_widget.setColumnCount(num_columns)
-
-        # Set table headers
-        headers = list(team_data[0].keys())
-        self.table_widget.setHorizontalHeaderLabels(headers)
+        if not team_data:
+            self.show_fetch_error(ValueError("No standings were returned."))
+            return
+        self.model.set_teams(team_data)
+        # Newer standings arrive through `update_standings`
+        refresh_scheduler().refresh_now()
+
+    def update_standings(self, snapshot):
+        """
+        Updates the table from new standings, repainting only the rows whose values changed.
 
-        # Populate table with team data
-        for row, team in enumerate(team_data):
-            for col, (key, value) in enumerate(team.items()):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() ^ Qt.ItemIsEditable)
-                self.table_widget.setItem(row, col, item)
+        Teams are matched by abbreviation, so rows stay where they are unless the active sort moves them.
 
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.setMinimumSize(800, 600)  # Set a minimum size to prevent it from becoming too small  # Set a minimum size to prevent it from becoming too small
+        Parameters:
+        - snapshot (StandingsSnapshot): The current standings.
+        """
+        self.model.set_teams(snapshot.teams)
 
     def sort_by_wins(self):
         """
         Sorts the table rows based on the 'Wins' column in descending order.
 
-        This method sorts the entries in the table widget according to the number of wins, with the team having the highest number of wins appearing first. It assumes that the 'Wins' column is at index 2 of the table.
+        This method sorts the teams in the table according to the number of wins, with the team having the
+        highest number of wins appearing first.
 
         Parameters:
         - None
@@ -105,22 +150,35 @@ class TeamStatsDialog(QDialog):
         Returns:
         - None
         """
-        self.table_widget.sortItems(2, Qt.DescendingOrder)  # Assuming 'Wins' column is at index 2  # Assuming 'Wins' column is at index 2
+        self.table_view.sortByColumn(TEAM_STAT_COLUMNS.index("Wins"), Qt.DescendingOrder)
             
 async def fetch_team_data():
     """
-    Asynchronously fetches and returns team data using the team_standings function.
+    Asynchronously returns the team standings, from the local stats warehouse whenever it has them.
 
-    This function is an asynchronous wrapper around the `team_standings` function, which is assumed to fetch
-    team data from an external source asynchronously. It awaits the completion of `team_standings` and returns
-    the fetched data.
+    Standings stored in the warehouse are returned without any network request; `populate_table` then
+    asks the refresh scheduler for fresh ones. Only when the warehouse holds no standings yet are they
+    fetched before returning.
+
+    Returns:
+        list of dict: A list of dictionaries, where each dictionary contains data about a team, shaped like
+        `StandingsSnapshot.teams`.
+    """
+    snapshot = stats_warehouse.latest_standings()
+    if snapshot is not None:
+        return snapshot.teams
+    return (await refresh_standings()).teams
+
+async def refresh_standings():
+    """
+    Asynchronously fetches the current standings and stores them in the stats warehouse.
 
     Returns:
-        list of dict: A list of dictionaries, where each dictionary contains data about a team. The exact structure
-        of these dictionaries depends on the implementation of `team_standings`.
+        StandingsSnapshot: The current standings.
     """
-    team_data = await team_standings()  # Use the appropriate function to fetch team data
-    return team_data
+    snapshot = await standings_service.snapshot(runtime.scheduler)  # Share the runtime's connection pool
+    stats_warehouse.record_standings(snapshot)
+    return snapshot
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1,10 +1,13 @@
+from startup_trace import startup_trace  # First, so the startup trace also times the imports below
+import os
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QSizePolicy
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QSizePolicy, QShortcut
 from Login_Page import LoginApp as lp
-from RegistrationPage import RegistrationPage as rp
-from HomeScreen import HomeScreen as hs
-from TeamStatsDialog import TeamStatsDialog
-from PlayerStatsDialog import PlayerStatsDialog
+
+# The other pages, the dialogs and the network stack behind them are imported when first used, so the
+# login window only waits for what it shows
+startup_trace.mark("imports")
 
 class MyApp(QMainWindow):
     def __init__(self):
@@ -12,6 +15,9 @@ class MyApp(QMainWindow):
         Initializes the main window of the NHL Statistics App. This method sets up the window title,
         creates a stacked widget to manage the different application pages (login, registration, home screen),
         and connects signals to the appropriate slots to handle user interactions.
+
+        Only the login page is created here, so it shows as soon as the window does. The registration page
+        and the home screen are created on first navigation, and each stats dialog on first use.
         """
         super().__init__()
 
@@ -21,61 +27,148 @@ class MyApp(QMainWindow):
         self.stacked_widget = QStackedWidget(self)  # Create a stacked widget to manage different pages
         self.setCentralWidget(self.stacked_widget)  # Set the stacked widget as the central widget of the window
 
-        # Initialize the pages of the application
+        # Only the login page is built up front; the other pages are built the first time they are shown
         self.login_page = lp()
-        self.registration_page = rp()
-        self.home_screen = hs()
-
-        # Set the size policy for each page to Preferred, allowing them to expand and fill available space
-        self.login_page.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-        self.registration_page.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-        self.home_screen.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-
-        # Set a minimum size for each page to ensure they are displayed properly
-        self.login_page.setMinimumSize(1, 1)
-        self.registration_page.setMinimumSize(1, 1)
-        self.home_screen.setMinimumSize(1, 1)
-
-        # Add the pages to the stacked widget
-        self.stacked_widget.addWidget(self.login_page)
-        self.stacked_widget.addWidget(self.registration_page)
-        self.stacked_widget.addWidget(self.home_screen)
-
-        # Connect signals from the login and home screen pages to the appropriate slots
-        # to handle user actions like logging in, registering, and viewing statistics
+        self._add_page(self.login_page)
+        self._registration_page = None
+        self._home_screen = None
+
+        # Connect signals from the login page to the appropriate slots
         self.login_page.login_Successful.connect(self.show_home_screen)
         self.login_page.register.connect(self.show_registration_page)
-        self.home_screen.top_teams_button.clicked.connect(self.show_team_stats_dialog)
-        self.home_screen.view_all_players_button.clicked.connect(self.show_player_stats_dialog)
+
+        # Stats dialogs are created when first opened and kept, together with the data they loaded
+        self.dialogs = {}
 
         # Connect the signal for changing the current widget in the stacked widget
         # to adjust the window size accordingly
         self.stacked_widget.currentChanged.connect(self.resizeToCurrentWidget)
 
+        # F12 opens the timings panel, which also turns on request and UI tracing
+        self.debug_panel = None
+        QShortcut(QKeySequence("F12"), self, self.show_debug_panel)
+
         self.show_login_page()  # Show the login page initially
         
     
+    @property
+    def registration_page(self):
+        """
+        The registration page, created and added to the stacked widget on first use.
+        """
+        if self._registration_page is None:
+            from RegistrationPage import RegistrationPage as rp
+            self._registration_page = rp()
+            self._add_page(self._registration_page)
+        return self._registration_page
+
+    @property
+    def home_screen(self):
+        """
+        The home screen, created and added to the stacked widget on first use.
+
+        Creating it starts the fetch of the leaders it shows, so this waits until the user has logged in.
+        """
+        if self._home_screen is None:
+            from HomeScreen import HomeScreen as hs
+            self._home_screen = hs()
+            self._add_page(self._home_screen)
+            # Connect the home screen buttons to the dialogs showing the statistics
+            self._home_screen.top_teams_button.clicked.connect(self.show_team_stats_dialog)
+            self._home_screen.view_all_players_button.clicked.connect(self.show_player_stats_dialog)
+            self._home_screen.player_search_requested.connect(self.show_player_search_results)
+            self._home_screen.view_goalies_button.clicked.connect(self.show_goalie_stats_dialog)
+        return self._home_screen
+
+    def _add_page(self, page):
+        """
+        Adds a page to the stacked widget, letting it expand to fill the available space.
+
+        Parameters:
+        - page (QWidget): The page to add.
+        """
+        page.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
+        page.setMinimumSize(1, 1)  # Set a minimum size to ensure the page is displayed properly
+        self.stacked_widget.addWidget(page)
+
+    def _dialog(self, key, factory):
+        """
+        Returns the cached stats dialog for a key, creating it the first time.
+
+        A cached dialog is asked to resume loading, so one that was closed before its data arrived, or
+        whose fetch failed, fetches again, while one that finished is shown as it is.
+
+        Parameters:
+        - key (str): The name the dialog is cached under.
+        - factory (callable): Called with no arguments to create the dialog.
+
+        Returns:
+        - QDialog: The dialog.
+        """
+        dialog = self.dialogs.get(key)
+        if dialog is None:
+            dialog = self.dialogs[key] = factory()
+        else:
+            dialog.resume_loading()
+        return dialog
+
     def show_team_stats_dialog(self):
         """
         Displays the Team Stats dialog window.
 
-        This method creates an instance of the TeamStatsDialog class and displays it as a modal dialog,
-        pausing the execution of any further code in this method until the dialog is closed.
+        The TeamStatsDialog is created the first time and reused afterwards, and is displayed as a modal
+        dialog, pausing the execution of any further code in this method until the dialog is closed.
         """
-        dialog = TeamStatsDialog()
-        dialog.exec_()
+        from TeamStatsDialog import TeamStatsDialog
+        self._dialog("teams", TeamStatsDialog).exec_()
         
     def show_player_stats_dialog(self):
         """
-        Displays the Player Stats dialog window.
+        Displays the Player Stats dialog window, showing every player.
 
-        This method creates an instance of the PlayerStatsDialog class and displays it as a modal dialog,
-        pausing the execution of any further code in this method until the dialog is closed. This allows
+        The PlayerStatsDialog is created the first time and reused afterwards, and is displayed as a modal
+        dialog, pausing the execution of any further code in this method until the dialog is closed. This allows
         the user to interact with the player statistics dialog independently of the main application window.
         """
-        dialog = PlayerStatsDialog()
+        from PlayerStatsDialog import PlayerStatsDialog
+        dialog = self._dialog("players", PlayerStatsDialog)
+        dialog.filter_edit.clear()
+        dialog.exec_()
+
+    def show_goalie_stats_dialog(self):
+        """
+        Displays the Goalie Stats dialog window as a modal dialog, reusing it after the first time.
+        """
+        from GoalieStatsDialog import GoalieStatsDialog
+        self._dialog("goalies", GoalieStatsDialog).exec_()
+
+    def show_player_search_results(self, name):
+        """
+        Displays the Player Stats dialog filtered to the players matching a search from the home screen.
+
+        The search reuses the same dialog as "View all players", so players loaded for one are shown at
+        once by the other.
+
+        Parameters:
+        - name (str): The player name, or the text the user searched for.
+        """
+        from PlayerStatsDialog import PlayerStatsDialog
+        dialog = self._dialog("players", PlayerStatsDialog)
+        dialog.filter_edit.setText(name)
         dialog.exec_()
             
+    def show_debug_panel(self):
+        """
+        Displays the timings panel listing the p50/p95 latency of each API endpoint.
+
+        The panel is created on first use and kept, so closing and reopening it keeps its statistics.
+        """
+        if self.debug_panel is None:
+            from debug_panel import DebugPanel
+            self.debug_panel = DebugPanel(self)
+        self.debug_panel.show()
+        self.debug_panel.raise_()
+
     def show_login_page(self):
         """
         Displays the login page within the application.
@@ -129,8 +222,31 @@ class MyApp(QMainWindow):
         
     
 
+def start_background_work():
+    """
+    Starts the asyncio runtime and the refresh scheduler once the login window is on screen.
+
+    Run one asyncio loop alongside the Qt event loop for every network fetch in the app, and warm the
+    standings, leaders and player stats while the user is still on the login page.
+    """
+    from async_runtime import runtime
+    from refresh_scheduler import refresh_scheduler
+    runtime.start()
+    refresh_scheduler().start()
+    app = QApplication.instance()
+    app.aboutToQuit.connect(refresh_scheduler().stop)
+    app.aboutToQuit.connect(runtime.stop)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     my_app = MyApp()
+    # Time the launch up to the first paint of the login window, then start the background work.
+    # NHL_EXIT_AFTER_STARTUP quits at that point instead, for measuring the launch alone
+    startup_trace.watch(my_app)
+    if os.environ.get("NHL_EXIT_AFTER_STARTUP"):
+        startup_trace.finished.connect(app.quit)
+    else:
+        startup_trace.finished.connect(start_background_work)
     my_app.show()
     sys.exit(app.exec_())
@@ -0,0 +1,368 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import aiohttp
+import requests
+
+from instrumentation import tracer, url_template
+from json_fields import loads, top_level_fields
+
+DEFAULT_CACHE_PATH = os.environ.get("NHL_API_CACHE", "nhl_api_cache.sqlite")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB of response bodies before the oldest entries are evicted
+DEFAULT_TTL = 10 * 60
+ACCESS_FLUSH_INTERVAL = 60  # Seconds cache hits are kept in memory before their access times are written
+
+# Time-to-live in seconds for each family of NHL API endpoints. The first matching pattern wins.
+ENDPOINT_TTLS = [
+    (r"/v1/standings/", 5 * 60),                # Standings move after every game
+    (r"/v1/standings-season", 24 * 60 * 60),    # The list of seasons only grows once a year
+    (r"/v1/skater-stats-leaders/", 15 * 60),    # League leaders
+    (r"/v1/roster/", 6 * 60 * 60),              # Rosters only change on trades and call-ups
+    (r"/v1/player/\d+/landing", 6 * 60 * 60),   # Player landing pages
+    (r"/stats/rest/", 15 * 60),                 # League-wide stat reports
+]
+
+# `expires_at` of responses for completed seasons, which never change once the season is over
+IMMUTABLE = math.inf
+
+
+class CachedResponse:
+    """
+    A response served by the `ApiCache`, either from disk or from the network.
+
+    Attributes:
+        status (int): The HTTP status code of the response.
+        body (bytes): The raw response body.
+        from_cache (bool): True if the body was served from disk, including after a 304 revalidation.
+    """
+    __slots__ = ("status", "body", "from_cache")
+
+    def __init__(self, status, body, from_cache=False):
+        self.status = status
+        self.body = body
+        self.from_cache = from_cache
+
+    def json(self):
+        """
+        Decodes the response body as JSON.
+
+        Returns:
+            dict or list: The decoded JSON document.
+        """
+        return loads(self.body)
+
+    def fields(self, keys):
+        """
+        Decodes only the given top-level members of a JSON object body. See `json_fields.top_level_fields`.
+
+        Parameters:
+            keys (iterable of str): The members to decode.
+
+        Returns:
+            dict: The wanted members that are present, keyed by name.
+        """
+        return top_level_fields(self.body, keys)
+
+
+class ApiCache:
+    """
+    A persistent HTTP cache shared by the synchronous `requests` calls and the `aiohttp` calls.
+
+    Successful responses are stored in a SQLite table together with their ETag and Last-Modified
+    validators. Fresh entries are served without touching the network. Stale entries are revalidated with
+    a conditional request, so an unchanged resource costs a 304 instead of a full download. When the total
+    size of the stored bodies exceeds `max_bytes`, the least recently used entries are evicted. Cache hits
+    note their access time in memory; the times are written in one batch at most every
+    `ACCESS_FLUSH_INTERVAL` seconds, and always before an eviction, so a hit never costs a disk write.
+
+    Responses requested as immutable, such as those for completed seasons, never expire and are never
+    revalidated, so each is downloaded once. They form their own partition of the cache: they are only
+    evicted once every other entry has gone.
+
+    Parameters:
+        path (str): The SQLite database file. Defaults to `nhl_api_cache.sqlite` in the working directory.
+        max_bytes (int): The upper bound on the total size of the cached response bodies.
+        ttls (list of tuple): `(regex, seconds)` pairs giving the time-to-live of each endpoint family.
+        default_ttl (int): The time-to-live in seconds of URLs that match none of the `ttls` patterns.
+
+    Note:
+        The database connection is opened on first use, so creating an `ApiCache` never touches the disk.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ENDPOINT_TTLS if ttls is None else ttls)]
+        self.default_ttl = default_ttl
+        self._conn = None
+        self._lock = threading.Lock()
+        self._accessed = {}  # url -> last access not yet written to disk
+        self._flushed_at = time.time()
+        self._session = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS api_responses ("
+                " url TEXT PRIMARY KEY,"
+                " body BLOB NOT NULL,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS api_responses_access_idx ON api_responses(last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def ttl_for(self, url):
+        """
+        Returns the time-to-live in seconds for the given URL.
+
+        Parameters:
+            url (str): The requested URL.
+
+        Returns:
+            int: The number of seconds a response for this URL stays fresh.
+        """
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, url):
+        """
+        Returns the stored entry for a URL and marks it as recently used.
+
+        Parameters:
+            url (str): The requested URL.
+
+        Returns:
+            tuple or None: `(body, etag, last_modified, expires_at)`, or None if the URL is not cached.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM api_responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                self._accessed[url] = now
+                if now - self._flushed_at >= ACCESS_FLUSH_INTERVAL:
+                    self._flush_accesses(conn)
+                    conn.commit()
+            return row
+
+    def _flush_accesses(self, conn):
+        if self._accessed:
+            conn.executemany("UPDATE api_responses SET last_access = ? WHERE url = ?",
+                             [(accessed, url) for url, accessed in self._accessed.items()])
+            self._accessed.clear()
+        self._flushed_at = time.time()
+
+    def store(self, url, body, etag=None, last_modified=None, immutable=False):
+        """
+        Stores a successful response and evicts old entries if the cache has grown past its size limit.
+
+        Parameters:
+            url (str): The requested URL.
+            body (bytes): The raw response body.
+            etag (str, optional): The ETag header of the response.
+            last_modified (str, optional): The Last-Modified header of the response.
+            immutable (bool): If True, the entry never expires.
+        """
+        now = time.time()
+        expires_at = IMMUTABLE if immutable else now + self.ttl_for(url)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO api_responses (url, body, etag, last_modified, expires_at, last_access, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, expires_at, now, len(body)),
+            )
+            self._accessed.pop(url, None)
+            self._flush_accesses(conn)
+            self._evict(conn)
+            conn.commit()
+
+    def refresh(self, url, immutable=False):
+        """
+        Marks a stored entry as fresh again after the server answered a conditional request with 304.
+
+        Parameters:
+            url (str): The requested URL.
+            immutable (bool): If True, the entry never expires from now on.
+        """
+        now = time.time()
+        expires_at = IMMUTABLE if immutable else now + self.ttl_for(url)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE api_responses SET expires_at = ?, last_access = ? WHERE url = ?",
+                (expires_at, now, url),
+            )
+            conn.commit()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM api_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in conn.execute("SELECT url, size FROM api_responses ORDER BY expires_at = ?, last_access",
+                                     (IMMUTABLE,)).fetchall():
+            conn.execute("DELETE FROM api_responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """
+        Removes every cached response.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM api_responses")
+            conn.commit()
+            self._accessed.clear()
+
+    def close(self):
+        """
+        Closes the database connection and the pooled `requests` session.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._flush_accesses(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    @staticmethod
+    def _conditional_headers(etag, last_modified):
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def get(self, url, immutable=False):
+        """
+        Synchronously fetches a URL through the cache using `requests`.
+
+        Parameters:
+            url (str): The URL to fetch.
+            immutable (bool): If True, the response never changes, e.g. because it belongs to a completed
+                season, so once stored it is served from disk for good.
+
+        Returns:
+            CachedResponse: The cached or freshly downloaded response. If the network request fails and a
+            stale copy exists, the stale copy is returned instead of raising.
+        """
+        if not tracer.enabled:
+            return self._get(url, immutable)
+        with tracer.span("GET", "http", url=url, endpoint=url_template(url)) as span:
+            response = self._get(url, immutable)
+            span.set(status=response.status, bytes=len(response.body), cache="hit" if response.from_cache else "miss")
+            return response
+
+    def _get(self, url, immutable=False):
+        entry = self.lookup(url)
+        if entry is not None and entry[3] > time.time():
+            return CachedResponse(200, entry[0], from_cache=True)
+
+        headers = self._conditional_headers(entry[1], entry[2]) if entry is not None else {}
+        if self._session is None:
+            self._session = requests.Session()
+        try:
+            response = self._session.get(url, headers=headers)
+        except requests.RequestException:
+            if entry is not None:
+                return CachedResponse(200, entry[0], from_cache=True)
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            self.refresh(url, immutable)
+            return CachedResponse(200, entry[0], from_cache=True)
+        if response.status_code == 200:
+            self.store(url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                       immutable)
+        return CachedResponse(response.status_code, response.content)
+
+    def cached(self, url, revalidate=False):
+        """
+        Returns the stored response for a URL if it can be served without touching the network.
+
+        Parameters:
+            url (str): The requested URL.
+            revalidate (bool): If True, only immutable entries are served; others must be revalidated.
+
+        Returns:
+            CachedResponse or None: The stored response, or None if the URL is not cached or is stale.
+        """
+        entry = self.lookup(url)
+        if entry is None or not (entry[3] == IMMUTABLE or entry[3] > time.time() and not revalidate):
+            return None
+        response = CachedResponse(200, entry[0], from_cache=True)
+        if tracer.enabled:
+            with tracer.span("GET", "http", url=url, endpoint=url_template(url)) as span:
+                span.set(status=response.status, bytes=len(response.body), cache="hit")
+        return response
+
+    async def get_async(self, session, url, revalidate=False, immutable=False):
+        """
+        Asynchronously fetches a URL through the cache using an `aiohttp` session.
+
+        Parameters:
+            session (aiohttp.ClientSession): The session used to make the HTTP request on a cache miss.
+            url (str): The URL to fetch.
+            revalidate (bool): If True, a cached entry is revalidated with the server even if it is still
+                fresh. Use this when the resource is known to have changed since it was cached. Immutable
+                entries are never revalidated.
+            immutable (bool): If True, the response never changes, e.g. because it belongs to a completed
+                season, so once stored it is served from disk for good.
+
+        Returns:
+            CachedResponse: The cached or freshly downloaded response. If the network request fails and a
+            stale copy exists, the stale copy is returned instead of raising.
+        """
+        if not tracer.enabled:
+            return await self._get_async(session, url, revalidate, immutable)
+        with tracer.span("GET", "http", url=url, endpoint=url_template(url)) as span:
+            response = await self._get_async(session, url, revalidate, immutable)
+            span.set(status=response.status, bytes=len(response.body), cache="hit" if response.from_cache else "miss")
+            return response
+
+    async def _get_async(self, session, url, revalidate=False, immutable=False):
+        entry = self.lookup(url)
+        if entry is not None and (entry[3] == IMMUTABLE or entry[3] > time.time() and not revalidate):
+            return CachedResponse(200, entry[0], from_cache=True)
+
+        headers = self._conditional_headers(entry[1], entry[2]) if entry is not None else {}
+        try:
+            async with session.get(url, headers=headers) as response:
+                status = response.status
+                body = await response.read() if status != 304 else b""
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except aiohttp.ClientError:
+            if entry is not None:
+                return CachedResponse(200, entry[0], from_cache=True)
+            raise
+
+        if status == 304 and entry is not None:
+            self.refresh(url, immutable)
+            return CachedResponse(200, entry[0], from_cache=True)
+        if status == 200:
+            self.store(url, body, etag, last_modified, immutable)
+        return CachedResponse(status, body)
+
+
+# Shared cache used by every NHL API call in the app
+api_cache = ApiCache()
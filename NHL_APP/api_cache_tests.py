@@ -0,0 +1,109 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from api_cache import ApiCache
+
+
+def make_response(status, content=b"", headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+class TestApiCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ApiCache(os.path.join(self.tmpdir.name, "cache.sqlite"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_ttl_for_matches_endpoint_family(self):
+        self.assertEqual(self.cache.ttl_for("https://api-web.nhle.com/v1/standings/now"), 5 * 60)
+        self.assertEqual(self.cache.ttl_for("https://api-web.nhle.com/v1/player/8478402/landing"), 6 * 60 * 60)
+        self.assertEqual(self.cache.ttl_for("https://example.com/other"), self.cache.default_ttl)
+
+    @patch('api_cache.requests.Session.get')
+    def test_fresh_entry_is_served_without_network(self, mock_get):
+        mock_get.return_value = make_response(200, b'{"standings": []}', {"ETag": '"v1"'})
+        url = "https://api-web.nhle.com/v1/standings/now"
+
+        first = self.cache.get(url)
+        second = self.cache.get(url)
+
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.json(), {"standings": []})
+        mock_get.assert_called_once()
+
+    @patch('api_cache.requests.Session.get')
+    def test_stale_entry_is_revalidated_with_etag(self, mock_get):
+        url = "https://api-web.nhle.com/v1/standings/now"
+        self.cache.store(url, b'{"standings": [1]}', etag='"v1"')
+        self.cache._connection().execute("UPDATE api_responses SET expires_at = ?", (time.time() - 1,))
+        mock_get.return_value = make_response(304)
+
+        response = self.cache.get(url)
+
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.json(), {"standings": [1]})
+        self.assertEqual(mock_get.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.assertGreater(self.cache.lookup(url)[3], time.time())
+
+    def test_eviction_drops_least_recently_used(self):
+        self.cache.max_bytes = 10
+        self.cache.store("https://example.com/a", b"12345")
+        time.sleep(0.01)
+        self.cache.store("https://example.com/b", b"12345")
+        time.sleep(0.01)
+        self.cache.lookup("https://example.com/a")
+        self.cache.store("https://example.com/c", b"12345")
+
+        self.assertIsNotNone(self.cache.lookup("https://example.com/a"))
+        self.assertIsNone(self.cache.lookup("https://example.com/b"))
+        self.assertIsNotNone(self.cache.lookup("https://example.com/c"))
+
+    def test_cache_hits_are_written_in_one_batch(self):
+        self.cache.store("https://example.com/a", b"12345")
+        conn = self.cache._connection()
+        changes = conn.total_changes
+
+        for _ in range(5):
+            self.cache.lookup("https://example.com/a")
+        self.assertEqual(conn.total_changes, changes)
+
+        self.cache.store("https://example.com/b", b"12345")
+        self.assertEqual(conn.total_changes, changes + 2)  # The new entry and one access time
+
+    def test_immutable_entries_never_expire_and_are_evicted_last(self):
+        self.cache.max_bytes = 10
+        self.cache.store("https://example.com/2022", b"12345", immutable=True)
+        time.sleep(0.01)
+        self.cache.store("https://example.com/now", b"12345")
+        time.sleep(0.01)
+        self.cache.store("https://example.com/later", b"12345")
+
+        entry = self.cache.lookup("https://example.com/2022")
+        self.assertEqual(entry[3], float("inf"))
+        self.assertIsNone(self.cache.lookup("https://example.com/now"))
+
+    @patch('api_cache.requests.Session.get')
+    def test_revalidated_entry_becomes_immutable_once_its_season_is_over(self, mock_get):
+        url = "https://api-web.nhle.com/v1/skater-stats-leaders/20222023/2"
+        self.cache.store(url, b'{"points": []}', etag='"v1"')
+        self.cache._connection().execute("UPDATE api_responses SET expires_at = ?", (time.time() - 1,))
+        mock_get.return_value = make_response(304)
+
+        self.cache.get(url, immutable=True)
+
+        self.assertEqual(self.cache.lookup(url)[3], float("inf"))
+
+
+if __name__ == '__main__':
+    unittest.main()
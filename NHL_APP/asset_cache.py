@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QByteArray, QObject, QRectF, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap
+from PyQt5.QtSvg import QSvgRenderer
+
+from async_runtime import run_in_background, runtime
+
+DEFAULT_ASSET_DIR = os.environ.get("NHL_ASSET_CACHE", "nhl_asset_cache")
+PIXMAP_CACHE_SIZE = 64  # Number of pre-scaled pixmaps kept in memory
+PLACEHOLDER_COLOR = "#E6E6E6"
+
+
+class AssetStore:
+    """
+    A content-addressed on-disk store for downloaded images, keyed by URL.
+
+    Each image is written once under the SHA-256 digest of its bytes, and a small JSON index maps every
+    URL to the digest of its content. Team logos and headshots rarely change, so after the first launch
+    they are read from disk instead of being downloaded again.
+
+    Parameters:
+        directory (str): The directory holding the blobs and the index. Created on first write.
+    """
+    def __init__(self, directory=DEFAULT_ASSET_DIR):
+        self.directory = directory
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self._index_path(), "r") as file:
+                    self._index = json.load(file)
+            except (FileNotFoundError, ValueError):
+                self._index = {}
+        return self._index
+
+    def get(self, url):
+        """
+        Returns the stored bytes for a URL.
+
+        Parameters:
+            url (str): The URL the image was downloaded from.
+
+        Returns:
+            bytes or None: The image bytes, or None if the URL has not been stored.
+        """
+        with self._lock:
+            digest = self._load_index().get(url)
+        if digest is None:
+            return None
+        try:
+            with open(self._blob_path(digest), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url, data):
+        """
+        Stores the bytes downloaded from a URL.
+
+        Parameters:
+            url (str): The URL the image was downloaded from.
+            data (bytes): The image bytes.
+
+        Returns:
+            str: The SHA-256 digest the bytes are stored under.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as file:
+                file.write(data)
+            os.replace(path + ".tmp", path)
+        with self._lock:
+            index = self._load_index()
+            if index.get(url) != digest:
+                index[url] = digest
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._index_path() + ".tmp", "w") as file:
+                    json.dump(index, file)
+                os.replace(self._index_path() + ".tmp", self._index_path())
+        return digest
+
+
+async def fetch_asset(scheduler, store, url):
+    """
+    Asynchronously returns the bytes of an image, downloading it only if it is not stored on disk yet.
+
+    Parameters:
+        scheduler (FetchScheduler): An open scheduler that runs the download within its limits and retries.
+        store (AssetStore): The on-disk store checked first and updated after a download.
+        url (str): The image URL.
+
+    Returns:
+        bytes or None: The image bytes, or None if the download did not return 200.
+    """
+    data = store.get(url)
+    if data is not None:
+        return data
+    response = await scheduler.get_bytes(url)
+    if response.status != 200:
+        return None
+    store.put(url, response.body)
+    return response.body
+
+
+def render_pixmap(data, width, height):
+    """
+    Decodes image bytes and scales them to fit a box, keeping the aspect ratio.
+
+    SVG documents, such as team logos, are rendered directly at the target size so they stay sharp.
+
+    Parameters:
+        data (bytes): PNG, JPEG or SVG image bytes.
+        width (int): The width of the box.
+        height (int): The height of the box.
+
+    Returns:
+        QPixmap: The scaled image, or a null pixmap if the bytes could not be decoded.
+    """
+    head = data[:256].lstrip()
+    if head.startswith(b"<svg") or head.startswith(b"<?xml"):
+        renderer = QSvgRenderer(QByteArray(data))
+        if not renderer.isValid():
+            return QPixmap()
+        size = renderer.defaultSize()
+        size.scale(width, height, Qt.KeepAspectRatio)
+        pixmap = QPixmap(size)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        renderer.render(painter, QRectF(0, 0, size.width(), size.height()))
+        painter.end()
+        return pixmap
+    image = QImage()
+    if not image.loadFromData(data):
+        return QPixmap()
+    return QPixmap.fromImage(image).scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def placeholder_pixmap(width, height):
+    """
+    Returns a plain placeholder shown while an image is loading.
+
+    Parameters:
+        width (int): The placeholder width.
+        height (int): The placeholder height.
+
+    Returns:
+        QPixmap: A pixmap filled with `PLACEHOLDER_COLOR`.
+    """
+    pixmap = QPixmap(width, height)
+    pixmap.fill(QColor(PLACEHOLDER_COLOR))
+    return pixmap
+
+
+class AssetLoader(QObject):
+    """
+    Loads images concurrently on the shared async runtime and hands back pre-scaled pixmaps.
+
+    Bytes come from the on-disk `AssetStore` or, on a miss, from the network. Decoded pixmaps are kept in
+    an in-memory LRU keyed by URL and size, so rebuilding a screen reuses them without decoding again.
+
+    Signals:
+        pixmap_ready (str, QPixmap): Emitted on the GUI thread with each URL and its scaled pixmap.
+
+    Parameters:
+        store (AssetStore, optional): The on-disk store. Defaults to one in `DEFAULT_ASSET_DIR`.
+        capacity (int): The number of pixmaps kept in memory.
+        parent (QObject, optional): The owner of the loader.
+    """
+    pixmap_ready = pyqtSignal(str, QPixmap)
+
+    def __init__(self, store=None, capacity=PIXMAP_CACHE_SIZE, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else AssetStore()
+        self.capacity = capacity
+        self._pixmaps = OrderedDict()
+
+    def cached_pixmap(self, url, width, height):
+        """
+        Returns a pixmap from the in-memory LRU, marking it as recently used.
+
+        Parameters:
+            url (str): The image URL.
+            width (int): The width of the box the image was scaled to.
+            height (int): The height of the box the image was scaled to.
+
+        Returns:
+            QPixmap or None: The cached pixmap, or None if it is not in memory.
+        """
+        key = (url, width, height)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def _remember(self, url, width, height, pixmap):
+        self._pixmaps[(url, width, height)] = pixmap
+        self._pixmaps.move_to_end((url, width, height))
+        while len(self._pixmaps) > self.capacity:
+            self._pixmaps.popitem(last=False)
+
+    def load(self, url, width, height, callback):
+        """
+        Delivers the scaled pixmap for a URL to `callback` on the GUI thread.
+
+        The callback runs immediately if the pixmap is already in memory; otherwise the bytes are loaded in
+        the background, and the callback runs once they have been decoded. Nothing is delivered if the image
+        cannot be downloaded, so any placeholder stays in place.
+
+        Parameters:
+            url (str): The image URL.
+            width (int): The width of the box the image is scaled to fit.
+            height (int): The height of the box the image is scaled to fit.
+            callback (callable): Called with the scaled `QPixmap`.
+        """
+        pixmap = self.cached_pixmap(url, width, height)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+
+        def on_bytes(data):
+            if not data:
+                return
+            pixmap = render_pixmap(data, width, height)
+            if pixmap.isNull():
+                return
+            self._remember(url, width, height, pixmap)
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                pass  # The widget waiting for this image was destroyed before it arrived
+            self.pixmap_ready.emit(url, pixmap)
+
+        run_in_background(self._fetch(url), on_bytes, lambda error: None, self)
+
+    async def _fetch(self, url):
+        return await fetch_asset(runtime.scheduler, self.store, url)
+
+
+_asset_loader = None
+
+def asset_loader():
+    """
+    Returns the app-wide `AssetLoader`, creating it on first use.
+
+    Returns:
+        AssetLoader: The shared loader.
+    """
+    global _asset_loader
+    if _asset_loader is None:
+        _asset_loader = AssetLoader()
+    return _asset_loader
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from api_cache import CachedResponse
+from asset_cache import AssetStore, fetch_asset
+
+
+class TestAssetStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = AssetStore(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_survives_restart(self):
+        self.store.put("https://assets.nhle.com/logos/nhl/svg/TOR_light.svg", b"<svg/>")
+
+        reopened = AssetStore(self.tmpdir.name)
+
+        self.assertEqual(reopened.get("https://assets.nhle.com/logos/nhl/svg/TOR_light.svg"), b"<svg/>")
+        self.assertIsNone(reopened.get("https://assets.nhle.com/logos/nhl/svg/MTL_light.svg"))
+
+    def test_identical_content_is_stored_once(self):
+        first = self.store.put("https://example.com/a.png", b"same bytes")
+        second = self.store.put("https://example.com/b.png", b"same bytes")
+
+        self.assertEqual(first, second)
+        blobs = [name for _, _, files in os.walk(self.tmpdir.name) for name in files if name != "index.json"]
+        self.assertEqual(blobs, [first])
+
+
+class FakeScheduler:
+    def __init__(self, status=200):
+        self.status = status
+        self.urls = []
+
+    async def get_bytes(self, url):
+        self.urls.append(url)
+        return CachedResponse(self.status, b"<svg/>")
+
+
+class TestFetchAsset(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = AssetStore(self.tmpdir.name)
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_images_are_downloaded_through_the_scheduler_once(self):
+        scheduler = FakeScheduler()
+        url = "https://assets.nhle.com/logos/nhl/svg/TOR_light.svg"
+
+        first = await fetch_asset(scheduler, self.store, url)
+        again = await fetch_asset(scheduler, self.store, url)
+
+        self.assertEqual((first, again), (b"<svg/>", b"<svg/>"))
+        self.assertEqual(scheduler.urls, [url])
+
+    async def test_failed_downloads_are_not_stored(self):
+        url = "https://assets.nhle.com/logos/nhl/svg/MTL_light.svg"
+
+        self.assertIsNone(await fetch_asset(FakeScheduler(status=404), self.store, url))
+        self.assertIsNone(self.store.get(url))
+
+
+if __name__ == '__main__':
+    unittest.main()
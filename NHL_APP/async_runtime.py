@@ -0,0 +1,174 @@
+import asyncio
+import atexit
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class AsyncRuntime:
+    """
+    Runs one long-lived asyncio event loop on a background thread alongside the Qt event loop.
+
+    Every network fetch in the app is submitted to this loop, so the GUI thread never blocks on I/O and
+    all requests share the connection pool of a single `FetchScheduler`. Results are handed back to the
+    GUI thread through Qt signals (see `run_in_background`).
+
+    Parameters:
+        **scheduler_options: Keyword arguments passed to the `FetchScheduler` owned by the runtime.
+
+    Note:
+        The runtime starts itself on first use, so dialogs also work when they are run on their own.
+    """
+    def __init__(self, **scheduler_options):
+        self.scheduler_options = scheduler_options
+        self.loop = None
+        self.scheduler = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        """
+        bool: True while the event loop thread is running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts the event loop thread and opens the shared scheduler. Does nothing if already running.
+        """
+        with self._lock:
+            if self.running:
+                return
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name="nhl-async-runtime", daemon=True)
+            self._thread.start()
+            from fetch_scheduler import FetchScheduler  # Imports aiohttp, so it waits until the runtime is needed
+            self.scheduler = FetchScheduler(**self.scheduler_options)
+            asyncio.run_coroutine_threadsafe(self.scheduler.open(), self.loop).result()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        self.loop.close()
+
+    def stop(self):
+        """
+        Cancels outstanding work, closes the shared scheduler and stops the event loop thread.
+        """
+        with self._lock:
+            if not self.running:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._thread = None
+            self.scheduler = None
+
+    async def _shutdown(self):
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.scheduler.close()
+
+    def submit(self, coro):
+        """
+        Schedules a coroutine on the runtime's event loop from any thread.
+
+        Parameters:
+            coro (coroutine): The coroutine to run.
+
+        Returns:
+            concurrent.futures.Future: A future resolved with the coroutine's result.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_blocking(self, coro, timeout=None):
+        """
+        Runs a coroutine on the runtime's event loop and waits for its result.
+
+        Parameters:
+            coro (coroutine): The coroutine to run.
+            timeout (float, optional): The maximum number of seconds to wait.
+
+        Returns:
+            The coroutine's result.
+
+        Note:
+            This blocks the calling thread, so it must not be called from the runtime's own loop.
+        """
+        return self.submit(coro).result(timeout)
+
+
+class TaskRelay(QObject):
+    """
+    Carries the outcome of a background coroutine back to the GUI thread.
+
+    The relay lives in the thread that created it. Its signals are emitted from the runtime thread, so
+    Qt queues them and connected slots run on the GUI thread. Once the coroutine has finished, the relay
+    deletes itself after its signal has been delivered, so long-lived owners do not collect one relay per
+    call. Keep `future` rather than the relay to check on or cancel the coroutine later.
+
+    Attributes:
+        future (concurrent.futures.Future): The coroutine's future on the runtime.
+
+    Signals:
+        succeeded (object): Emitted with the coroutine's result.
+        failed (object): Emitted with the exception the coroutine raised.
+    """
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+    def __init__(self, future, parent=None):
+        super().__init__(parent)
+        self.future = future
+
+    def cancel(self):
+        """
+        Cancels the background coroutine if it has not finished yet.
+        """
+        self.future.cancel()
+
+    def _done(self, future):
+        try:
+            if future.cancelled():
+                pass
+            elif future.exception() is not None:
+                self.failed.emit(future.exception())
+            else:
+                self.succeeded.emit(future.result())
+            # Posted after the queued signal, so the relay outlives its delivery
+            self.deleteLater()
+        except RuntimeError:
+            pass  # The relay's owner was destroyed before the coroutine finished
+
+
+def run_in_background(coro, on_result=None, on_error=None, parent=None):
+    """
+    Runs a coroutine on the shared runtime and delivers its outcome to callbacks on the GUI thread.
+
+    Parameters:
+        coro (coroutine): The coroutine to run.
+        on_result (callable, optional): Called on the GUI thread with the coroutine's result.
+        on_error (callable, optional): Called on the GUI thread with the exception if the coroutine fails.
+        parent (QObject, optional): The owner of the returned relay, typically the calling widget.
+
+    Returns:
+        TaskRelay: The relay carrying the outcome. It deletes itself once the outcome is delivered, so keep
+        its `future` to check on or cancel the coroutine.
+    """
+    relay = TaskRelay(runtime.submit(coro), parent)
+    if on_result is not None:
+        relay.succeeded.connect(on_result)
+    if on_error is not None:
+        relay.failed.connect(on_error)
+    relay.future.add_done_callback(relay._done)
+    return relay
+
+
+# Shared runtime used by every view in the app
+runtime = AsyncRuntime()
+atexit.register(runtime.stop)
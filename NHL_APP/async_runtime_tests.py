@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent
+
+from async_runtime import AsyncRuntime, run_in_background, runtime
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    def test_run_blocking_runs_on_runtime_thread(self):
+        local_runtime = AsyncRuntime()
+        try:
+            async def thread_name():
+                await asyncio.sleep(0)
+                return threading.current_thread().name
+
+            self.assertEqual(local_runtime.run_blocking(thread_name(), timeout=5), "nhl-async-runtime")
+            self.assertIsNotNone(local_runtime.scheduler.session)
+        finally:
+            local_runtime.stop()
+        self.assertFalse(local_runtime.running)
+
+    def test_result_is_delivered_on_gui_thread(self):
+        app = QCoreApplication.instance() or QCoreApplication([])
+        delivered = []
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            return 42
+
+        relay = run_in_background(compute(), lambda result: delivered.append((result, threading.current_thread())))
+        deadline = time.monotonic() + 5
+        while not delivered and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.005)
+
+        self.assertEqual(delivered, [(42, threading.main_thread())])
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        self.assertTrue(sip.isdeleted(relay))
+        self.assertTrue(relay.future.done())
+
+    @classmethod
+    def tearDownClass(cls):
+        runtime.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
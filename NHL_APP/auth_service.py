@@ -0,0 +1,207 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import bcrypt
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from user_store import default_user_store
+
+POOL_SIZE = 2     # Database connections kept open for logins and registrations
+AUTH_WORKERS = 2  # Threads that hash passwords and query the database
+BCRYPT_ROUNDS = 12
+
+
+class ConnectionPool:
+    """
+    A small pool of database connections shared by the authentication workers.
+
+    Connections are opened on first use, at most `size` at a time, and handed back to the pool when the
+    caller is done, so repeated logins reuse the same connections instead of opening one per attempt.
+    A connection whose caller raised is closed rather than reused, since it may be broken.
+
+    Parameters:
+        connect (callable): Called with no arguments to open a DB-API connection.
+        size (int): The maximum number of connections open at once.
+    """
+    def __init__(self, connect, size=POOL_SIZE):
+        self._connect = connect
+        self.size = size
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends a connection for the duration of a `with` block, waiting if every connection is in use.
+
+        Yields:
+            A DB-API connection.
+        """
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self.opened += 1
+            try:
+                yield conn
+            except BaseException:
+                self._discard(conn)
+                raise
+            with self._lock:
+                if not self._closed:
+                    self._idle.put(conn)
+                    return
+            self._discard(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass  # The connection is already unusable
+        with self._lock:
+            self.opened -= 1
+
+    def close(self):
+        """
+        Closes every idle connection. Connections still lent out are closed when they are handed back.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class AuthService(QObject):
+    """
+    Checks logins and registers users without blocking the GUI thread.
+
+    bcrypt is deliberately slow, and the database may sit on a network drive, so both run on a small
+    thread pool and share a `ConnectionPool` of connections to the `UserStore`. The outcome of each request is reported through the
+    signals below. They are emitted from a worker thread, so Qt queues them and slots of widgets run on
+    the GUI thread.
+
+    Signals:
+        login_succeeded (str): Emitted with the username when the password matches.
+        login_rejected (str): Emitted with the username when the user is unknown or the password is wrong.
+        login_failed (str): Emitted with an error message when the login could not be checked.
+        registration_succeeded (str): Emitted with the username once the user is stored.
+        registration_rejected (str): Emitted with the reason the registration was refused.
+        registration_failed (str): Emitted with an error message when the user could not be stored.
+
+    Parameters:
+        store (UserStore, optional): Where the users are kept. Defaults to `default_user_store()`.
+        pool_size (int): The maximum number of database connections open at once.
+        workers (int): The number of worker threads.
+        rounds (int): The bcrypt work factor of newly hashed passwords.
+        parent (QObject, optional): The owner of the service.
+    """
+    login_succeeded = pyqtSignal(str)
+    login_rejected = pyqtSignal(str)
+    login_failed = pyqtSignal(str)
+    registration_succeeded = pyqtSignal(str)
+    registration_rejected = pyqtSignal(str)
+    registration_failed = pyqtSignal(str)
+
+    def __init__(self, store=None, pool_size=POOL_SIZE, workers=AUTH_WORKERS, rounds=BCRYPT_ROUNDS, parent=None):
+        super().__init__(parent)
+        self.store = store or default_user_store()
+        self.pool = ConnectionPool(self.store.connect, pool_size)
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nhl-auth")
+        self._decoy_hash = None
+
+    def login(self, username, password):
+        """
+        Starts checking a username and password. The outcome is reported by the login signals.
+
+        Parameters:
+            username (str): The username entered.
+            password (str): The password entered.
+
+        Returns:
+            concurrent.futures.Future: Resolved once the outcome has been emitted.
+        """
+        return self._executor.submit(self._login, username, password)
+
+    def _login(self, username, password):
+        try:
+            with self.pool.connection() as conn:
+                stored_hash = self.store.password_hash(conn, username)
+            matches = bcrypt.checkpw(password.encode(), stored_hash.encode() if stored_hash else self._decoy())
+        except Exception as e:
+            self.login_failed.emit(str(e))
+            return
+        if stored_hash and matches:
+            self.login_succeeded.emit(username)
+        else:
+            self.login_rejected.emit(username)
+
+    def _decoy(self):
+        # Unknown users are checked against this hash so they take as long to reject as a wrong password
+        if self._decoy_hash is None:
+            self._decoy_hash = bcrypt.hashpw(b"decoy", bcrypt.gensalt(self.rounds))
+        return self._decoy_hash
+
+    def register(self, username, email, password):
+        """
+        Starts registering a user. The outcome is reported by the registration signals.
+
+        The fields are expected to have been validated already; only the checks that need the database
+        are made here.
+
+        Parameters:
+            username (str): The new user's username.
+            email (str): The new user's email address.
+            password (str): The new user's password, which is stored hashed.
+
+        Returns:
+            concurrent.futures.Future: Resolved once the outcome has been emitted.
+        """
+        return self._executor.submit(self._register, username, email, password)
+
+    def _register(self, username, email, password):
+        try:
+            hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)).decode()
+            with self.pool.connection() as conn:
+                refusal = self.store.add_user(conn, username, email, hashed_password)
+        except Exception as e:
+            self.registration_failed.emit(str(e))
+            return
+        if refusal is not None:
+            self.registration_rejected.emit(refusal)
+        else:
+            self.registration_succeeded.emit(username)
+
+    def close(self):
+        """
+        Stops the worker threads once queued requests are done and closes the database connections.
+        """
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+
+_auth_service = None
+
+def auth_service():
+    """
+    Returns the app-wide `AuthService`, creating it on first use.
+
+    Returns:
+        AuthService: The shared service, on the `default_user_store()`.
+    """
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService()
+        atexit.register(_auth_service.close)
+    return _auth_service
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtTest import QSignalSpy
+
+from auth_service import AuthService
+from user_store import SQLiteUserStore
+
+
+class TestAuthService(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "users.sqlite")
+        self.service = AuthService(SQLiteUserStore(self.path), rounds=4)
+
+    def tearDown(self):
+        self.service.close()
+        self.tmpdir.cleanup()
+
+    def outcome(self, start, *signals):
+        spies = [QSignalSpy(signal) for signal in signals]
+        start().result(10)
+        deadline = time.monotonic() + 5
+        while not any(len(spy) for spy in spies) and time.monotonic() < deadline:
+            self.app.processEvents()
+        return [list(spy) for spy in spies]
+
+    def login(self, username, password):
+        service = self.service
+        return self.outcome(lambda: service.login(username, password),
+                            service.login_succeeded, service.login_rejected, service.login_failed)
+
+    def register(self, username, email, password):
+        service = self.service
+        return self.outcome(lambda: service.register(username, email, password),
+                            service.registration_succeeded, service.registration_rejected, service.registration_failed)
+
+    def test_registered_users_can_log_in(self):
+        self.assertEqual(self.register("dom", "dom@example.com", "goal-scorer"), [[["dom"]], [], []])
+        self.assertEqual(self.login("dom", "goal-scorer"), [[["dom"]], [], []])
+        self.assertEqual(self.login("dom", "wrong-password"), [[], [["dom"]], []])
+        self.assertEqual(self.login("nobody", "goal-scorer"), [[], [["nobody"]], []])
+
+    def test_taken_emails_are_rejected(self):
+        self.register("dom", "dom@example.com", "goal-scorer")
+        self.assertEqual(self.register("other", "dom@example.com", "goal-scorer"),
+                         [[], [["Email already exists!"]], []])
+
+    def test_repeated_logins_reuse_pooled_connections(self):
+        self.register("dom", "dom@example.com", "goal-scorer")
+        futures = [self.service.login("dom", "wrong-password") for _ in range(20)]
+        for future in futures:
+            future.result(10)
+
+        self.assertLessEqual(self.service.pool.opened, self.service.pool.size)
+        self.service.close()
+        self.assertEqual(self.service.pool.opened, 0)
+
+    def test_database_errors_are_reported_and_their_connection_dropped(self):
+        self.login("dom", "goal-scorer")
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("DROP TABLE Users")
+
+        self.assertEqual(self.login("dom", "goal-scorer")[2], [["no such table: Users"]])
+        self.assertEqual(self.service.pool.opened, 0)
+
+    def test_hashing_does_not_block_the_caller(self):
+        service = AuthService(SQLiteUserStore(self.path), rounds=14)
+        start = time.perf_counter()
+        future = service.register("dom", "dom@example.com", "goal-scorer")
+        elapsed = time.perf_counter() - start
+        self.assertFalse(future.done())
+        service.close()
+        self.assertLess(elapsed, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,468 @@
+import argparse
+import asyncio
+import gc
+import glob
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(APP_DIR)
+DEFAULT_RESULTS_DIR = os.environ.get("NHL_BENCH_RESULTS", os.path.join(REPO_ROOT, "bench_results"))
+DEFAULT_REPEAT = 5
+REGRESSION_THRESHOLD = 0.10  # Relative slowdown of the median that counts as a regression
+
+BENCHMARKS = []
+
+
+def benchmark(name, params=(None,), repeat=None):
+    """
+    Registers a benchmark.
+
+    The decorated function is called once per parameter with the shared `BenchEnvironment` and the
+    parameter. It returns the callable to time, or a `(setup, run)` pair when some untimed work has to
+    happen before every run.
+
+    Parameters:
+        name (str): The name results are stored under, followed by the parameter in brackets.
+        params (iterable): The parameters the benchmark is run with.
+        repeat (int, optional): The number of timed runs, overriding the command line for slow benchmarks.
+    """
+    def register(function):
+        BENCHMARKS.append((name, tuple(params), repeat, function))
+        return function
+    return register
+
+
+def summarize(times):
+    """
+    Reduces a list of run times to the statistics stored in the results file.
+
+    Parameters:
+        times (list of float): The duration of each timed run, in seconds.
+
+    Returns:
+        dict: The number of runs and the min, median, mean, standard deviation and max, in seconds.
+    """
+    return {
+        "runs": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "max": max(times),
+    }
+
+
+def measure(case, repeat=DEFAULT_REPEAT, warmup=1):
+    """
+    Times a benchmark case after a number of untimed warm-up runs.
+
+    Parameters:
+        case (callable or tuple): The callable to time, or a `(setup, run)` pair.
+        repeat (int): The number of timed runs.
+        warmup (int): The number of untimed runs made first.
+
+    Returns:
+        dict: The statistics from `summarize`.
+    """
+    setup, run = case if isinstance(case, tuple) else (None, case)
+    times = []
+    for index in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if index >= warmup:
+            times.append(elapsed)
+    return summarize(times)
+
+
+def case_key(name, param):
+    if param is None:
+        return name
+    if isinstance(param, tuple):
+        param = ",".join(str(value) for value in param)
+    return f"{name}[{param}]"
+
+
+def git_revision():
+    """
+    Returns the short hash of the checked-out commit, marked dirty if the tree has uncommitted changes.
+
+    Returns:
+        str: The revision, or 'unknown' outside a git checkout.
+    """
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return revision + ("-dirty" if dirty else "")
+
+
+def save_results(results, directory=DEFAULT_RESULTS_DIR):
+    """
+    Writes benchmark results to a JSON file named after the revision and the time of the run.
+
+    Parameters:
+        results (dict): The results from `run_benchmarks`.
+        directory (str): The directory the file is written to. Created if needed.
+
+    Returns:
+        str: The path of the file written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(results["created"]))
+    path = os.path.join(directory, f"{stamp}-{results['revision']}.json")
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+    return path
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares the medians of two result sets.
+
+    Parameters:
+        baseline (dict): The results to compare against.
+        current (dict): The newer results.
+        threshold (float): The relative slowdown beyond which a benchmark counts as a regression.
+
+    Returns:
+        list of tuple: `(key, baseline_median, current_median, ratio, regressed)` for every benchmark
+        present in both result sets.
+    """
+    rows = []
+    for key, stats in sorted(current["benchmarks"].items()):
+        before = baseline["benchmarks"].get(key)
+        if before is None:
+            continue
+        ratio = stats["median"] / before["median"] if before["median"] else float("inf")
+        rows.append((key, before["median"], stats["median"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def latest_results(directory=DEFAULT_RESULTS_DIR, count=2):
+    """
+    Returns the paths of the most recent results files, oldest first.
+    """
+    return sorted(glob.glob(os.path.join(directory, "*.json")))[-count:]
+
+
+class BenchEnvironment:
+    """
+    The state shared by the benchmarks: a scratch directory, the Qt application and a local API stand-in.
+
+    The API and image caches are redirected into the scratch directory before any app module is
+    imported, so benchmarks never read or overwrite the caches of a real install. The stand-in runs on
+    the app's shared async runtime, and every API URL points at it. Like `WholeApp`, the benchmarks run
+    from the repository root, where the screens find their stylesheets.
+    """
+    def __init__(self):
+        self.workdir = tempfile.mkdtemp(prefix="nhl-bench-")
+        os.chdir(REPO_ROOT)
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        os.environ["NHL_API_CACHE"] = os.path.join(self.workdir, "api_cache.sqlite")
+        os.environ["NHL_ASSET_CACHE"] = os.path.join(self.workdir, "assets")
+        os.environ["NHL_USERS"] = os.path.join(self.workdir, "users.sqlite")
+        self._app = None
+        self._standin = None
+
+    @property
+    def app(self):
+        if self._app is None:
+            from PyQt5.QtWidgets import QApplication
+            self._app = QApplication.instance() or QApplication(sys.argv[:1])
+        return self._app
+
+    @property
+    def standin(self):
+        if self._standin is None:
+            from async_runtime import runtime
+            from nhl_api_standin import NHLApiStandin
+            from shared import set_api_base_url
+            self._standin = NHLApiStandin(fixture_dir=os.path.join(self.workdir, "fixtures"))
+            set_api_base_url(runtime.run_blocking(self._standin.start()))
+        return self._standin
+
+    def configure(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        """
+        Sets the latency and error rate injected by the stand-in.
+        """
+        config = self.standin.config
+        config.latency, config.jitter, config.error_rate = latency, jitter, error_rate
+
+    def close(self):
+        if self._standin is not None:
+            from async_runtime import runtime
+            runtime.run_blocking(self._standin.stop())
+            runtime.stop()
+
+
+def synthetic_players(count, seed=7):
+    """
+    Returns `count` random but plausible player records for the table benchmarks.
+    """
+    from shared import PlayerStatLine, nhl_team_abbreviations
+    rng = random.Random(seed)
+    players = []
+    for index in range(count):
+        goals = rng.randint(0, 60)
+        assists = rng.randint(0, 80)
+        shots = rng.randint(goals, goals + 300) or 1
+        players.append(PlayerStatLine(f"Player {index}", rng.choice(nhl_team_abbreviations), rng.randint(1, 82),
+                                      goals, assists, goals + assists, rng.randint(-30, 40), rng.randint(0, 120),
+                                      goals // 8, goals // 20, shots, goals / shots))
+    return players
+
+
+def landing_payloads(env, count):
+    """
+    Returns `count` encoded landing documents, from recorded fixtures if there are any, else synthesized.
+    """
+    from nhl_api_standin import DEFAULT_FIXTURE_DIR, Synthesizer
+    bodies = []
+    for path in glob.glob(os.path.join(DEFAULT_FIXTURE_DIR, "player", "*.json")):
+        with open(path, "rb") as file:
+            bodies.append(file.read())
+    if not bodies:
+        synthesizer = Synthesizer()
+        bodies = [json.dumps(synthesizer.landing(player_id)).encode()
+                  for player_id, (_, player, _) in synthesizer.players.items() if player["positionCode"] != "G"]
+    return [bodies[index % len(bodies)] for index in range(count)]
+
+
+@benchmark("fan_out", params=[(latency, limit) for latency in (0.0, 0.02, 0.05) for limit in (8, 32)], repeat=3)
+def bench_fan_out(env, param):
+    from api_cache import ApiCache
+    from fetch_scheduler import FetchScheduler
+    from shared import fetch_league_player_stats
+    latency, limit = param
+    env.configure(latency=latency)
+    caches = []
+
+    def setup():
+        # Start every run from an empty cache so each request reaches the stand-in
+        if caches:
+            caches.pop().close()
+        caches.append(ApiCache(os.path.join(env.workdir, f"fan_out-{time.monotonic_ns()}.sqlite")))
+
+    async def fetch():
+        async with FetchScheduler(max_in_flight=limit, per_host_limit=limit, cache=caches[-1]) as scheduler:
+            return await fetch_league_player_stats(scheduler)
+
+    return setup, lambda: asyncio.run(fetch())
+
+
+@benchmark("bulk_league_stats", params=(0.0, 0.02, 0.05), repeat=3)
+def bench_bulk_league_stats(env, latency):
+    from api_cache import ApiCache
+    from fetch_scheduler import FetchScheduler
+    from shared import get_all_team_rosters_and_player_stats
+    env.configure(latency=latency)
+    caches = []
+
+    def setup():
+        if caches:
+            caches.pop().close()
+        caches.append(ApiCache(os.path.join(env.workdir, f"bulk-{time.monotonic_ns()}.sqlite")))
+
+    async def fetch():
+        async with FetchScheduler(cache=caches[-1]) as scheduler:
+            return await get_all_team_rosters_and_player_stats(scheduler)
+
+    return setup, lambda: asyncio.run(fetch())
+
+
+@benchmark("extract_player_stats", params=(5000,))
+def bench_extract_player_stats(env, count):
+    from shared import extract_player_stats
+    payloads = [json.loads(body) for body in landing_payloads(env, count)]
+    return lambda: [extract_player_stats(payload) for payload in payloads]
+
+
+@benchmark("parse_and_extract_player_stats", params=(5000,))
+def bench_parse_and_extract(env, count):
+    from json_fields import top_level_fields
+    from shared import LANDING_FIELDS, extract_player_stats
+    bodies = landing_payloads(env, count)
+    return lambda: [extract_player_stats(top_level_fields(body, LANDING_FIELDS)) for body in bodies]
+
+
+def player_stats_dialog(env):
+    from PlayerStatsDialog import PlayerStatsDialog
+    env.app
+    env.configure()
+    dialog = PlayerStatsDialog()
+    # Only the rows the benchmark supplies should reach the table
+    dialog.loader.stop()
+    dialog.loader.rows_ready.disconnect()
+    dialog.show()
+    env.app.processEvents()
+    return dialog
+
+
+@benchmark("populate_table", params=(1000, 10000, 100000))
+def bench_populate_table(env, count):
+    from PyQt5.QtCore import Qt
+    dialog = player_stats_dialog(env)
+    players = synthetic_players(count)
+
+    def setup():
+        dialog.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        dialog.populate_table([])
+        env.app.processEvents()
+
+    def run():
+        dialog.populate_table(players)
+        env.app.processEvents()
+
+    return setup, run
+
+
+@benchmark("sort_table", params=(1000, 10000, 100000))
+def bench_sort_table(env, count):
+    from PyQt5.QtCore import Qt
+    dialog = player_stats_dialog(env)
+    dialog.populate_table(synthetic_players(count))
+
+    def setup():
+        dialog.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        env.app.processEvents()
+
+    def run():
+        dialog.sort_by_points()
+        env.app.processEvents()
+
+    return setup, run
+
+
+@benchmark("player_search", params=(1000, 10000))
+def bench_player_search(env, count):
+    from player_search import PlayerSearchIndex
+    index = PlayerSearchIndex.from_players(synthetic_players(count))
+    # What the index is asked as someone types a name, including a typo that falls back to trigrams
+    queries = ["p", "pl", "pla", "play", "player", "player 1", "player 12", "plyer 123"]
+    return lambda: [index.search(query) for query in queries]
+
+
+@benchmark("concurrent_logins", params=(1, 4))
+def bench_concurrent_logins(env, workers):
+    from auth_service import AuthService
+    from user_store import SQLiteUserStore
+    # A low bcrypt work factor keeps the database and the pool, not the hashing, in the measurement
+    service = AuthService(SQLiteUserStore(os.path.join(env.workdir, f"users-{workers}.sqlite")),
+                          pool_size=workers, workers=workers, rounds=4)
+    for user in range(100):
+        service.register(f"user{user}", f"user{user}@example.com", "password").result()
+    return lambda: [future.result() for future in [service.login(f"user{attempt % 100}", "password")
+                                                   for attempt in range(200)]]
+
+
+@benchmark("home_screen", params=("cold", "warm"))
+def bench_home_screen(env, state):
+    from HomeScreen import HomeScreen
+    from api_cache import api_cache
+    from asset_cache import asset_loader
+    from team_stats import standings_service
+    env.app
+    env.configure()
+    screens = []
+
+    def setup():
+        while screens:
+            screens.pop().deleteLater()
+        env.app.processEvents()
+        if state == "cold":
+            api_cache.clear()
+            standings_service.invalidate()
+            asset_loader()._pixmaps.clear()
+
+    def run():
+        screens.append(HomeScreen())
+        env.app.processEvents()
+
+    return setup, run
+
+
+def run_benchmarks(selected=None, repeat=DEFAULT_REPEAT):
+    """
+    Runs the registered benchmarks and collects their results.
+
+    Parameters:
+        selected (list of str, optional): Substrings of the benchmark names to run. Defaults to all.
+        repeat (int): The number of timed runs of each case, unless the benchmark sets its own.
+
+    Returns:
+        dict: The revision, the run time, the platform and the statistics of every case.
+    """
+    env = BenchEnvironment()
+    results = {
+        "revision": git_revision(),
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+    try:
+        for name, params, own_repeat, function in BENCHMARKS:
+            if selected and not any(part in name for part in selected):
+                continue
+            for param in params:
+                key = case_key(name, param)
+                stats = measure(function(env, param), own_repeat or repeat)
+                results["benchmarks"][key] = stats
+                print(f"{key:45} median {stats['median'] * 1000:10.2f} ms  (min {stats['min'] * 1000:.2f} ms)")
+    finally:
+        env.close()
+    return results
+
+
+def print_comparison(baseline_path, current_path, threshold):
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    with open(current_path) as file:
+        current = json.load(file)
+    print(f"{baseline['revision']} -> {current['revision']}")
+    regressions = 0
+    for key, before, after, ratio, regressed in compare(baseline, current, threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:45} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NHL data pipeline and table rendering.")
+    parser.add_argument("names", nargs="*", help="run only benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per case")
+    parser.add_argument("--output-dir", default=DEFAULT_RESULTS_DIR, help="directory of the JSON results")
+    parser.add_argument("--compare", nargs="*", metavar="RESULTS",
+                        help="compare two results files (defaults to the two most recent) instead of running")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="relative slowdown of the median reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        paths = args.compare or latest_results(args.output_dir)
+        if len(paths) != 2:
+            parser.error("--compare needs two results files")
+        sys.exit(1 if print_comparison(paths[0], paths[1], args.threshold) else 0)
+
+    results = run_benchmarks(args.names, args.repeat)
+    print(f"Results written to {save_results(results, args.output_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks import case_key, compare, measure
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_measure_runs_setup_before_every_run_and_skips_warmup(self):
+        calls = []
+        stats = measure((lambda: calls.append("setup"), lambda: calls.append("run")), repeat=3, warmup=1)
+
+        self.assertEqual(calls, ["setup", "run"] * 4)
+        self.assertEqual(stats["runs"], 3)
+        self.assertLessEqual(stats["min"], stats["median"])
+
+    def test_compare_flags_slower_medians(self):
+        baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}, "gone": {"median": 1.0}}}
+        current = {"benchmarks": {"a": {"median": 1.05}, "b": {"median": 1.5}, "new": {"median": 1.0}}}
+
+        rows = compare(baseline, current, threshold=0.1)
+
+        self.assertEqual([(key, regressed) for key, _, _, _, regressed in rows], [("a", False), ("b", True)])
+
+    def test_case_key_includes_parameters(self):
+        self.assertEqual(case_key("fan_out", (0.02, 8)), "fan_out[0.02,8]")
+        self.assertEqual(case_key("home_screen", None), "home_screen")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton, QTableWidget,
+                             QTableWidgetItem, QVBoxLayout, QWidget)
+
+from instrumentation import tracer
+
+REFRESH_INTERVAL_MS = 1000
+PANEL_COLUMNS = ["Endpoint", "Requests", "Cache Hits", "Errors", "KB", "p50 (ms)", "p95 (ms)"]
+
+
+class DebugPanel(QWidget):
+    """
+    A small window listing the request count, cache hit count and p50/p95 latency of each API endpoint.
+
+    Opening the panel turns tracing on if it was off, so timings are collected from then on. The table
+    refreshes every `REFRESH_INTERVAL_MS` milliseconds, and the recorded spans can be saved as a Chrome
+    trace file.
+
+    Parameters:
+        parent (QWidget, optional): The owner of the panel.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Timings")
+        self.setMinimumSize(640, 240)
+        tracer.enable()
+
+        layout = QVBoxLayout(self)
+        self.table_widget = QTableWidget(0, len(PANEL_COLUMNS))
+        self.table_widget.setHorizontalHeaderLabels(PANEL_COLUMNS)
+        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table_widget.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table_widget)
+
+        buttons = QHBoxLayout()
+        self.status_label = QLabel()
+        buttons.addWidget(self.status_label, 1)
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.clicked.connect(self.clear)
+        buttons.addWidget(self.clear_button)
+        self.export_button = QPushButton("Export Trace...")
+        self.export_button.clicked.connect(self.export_trace)
+        buttons.addWidget(self.export_button)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_INTERVAL_MS)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Redraws the table from the tracer's current endpoint statistics.
+        """
+        summary = tracer.endpoint_summary()
+        self.table_widget.setRowCount(len(summary))
+        for row, (endpoint, stats) in enumerate(summary.items()):
+            values = [endpoint, stats["count"], stats["hits"], stats["errors"], f"{stats['bytes'] / 1024:.0f}",
+                      f"{stats['p50_ms']:.1f}", f"{stats['p95_ms']:.1f}"]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table_widget.setItem(row, column, item)
+
+    def clear(self):
+        """
+        Drops the recorded spans and statistics.
+        """
+        tracer.clear()
+        self.refresh()
+
+    def export_trace(self):
+        """
+        Asks for a file name and saves the recorded spans there as a Chrome trace.
+        """
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "nhl_trace.json", "Chrome Trace (*.json)")
+        if path:
+            self.status_label.setText(f"Wrote {tracer.export(path)} events to {path}")
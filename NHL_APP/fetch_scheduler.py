@@ -0,0 +1,214 @@
+import asyncio
+import random
+
+import aiohttp
+
+from api_cache import CachedResponse, api_cache
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchReport:
+    """
+    The outcome of a batch of fetches run by `FetchScheduler.gather_partial`.
+
+    Attributes:
+        results (list): The results of the fetches that completed, in submission order.
+        failures (list of Exception): The exceptions raised by fetches that failed after all retries.
+        timed_out (int): The number of fetches cancelled because the batch deadline passed.
+    """
+    def __init__(self, results=None, failures=None, timed_out=0):
+        self.results = results if results is not None else []
+        self.failures = failures if failures is not None else []
+        self.timed_out = timed_out
+
+    @property
+    def complete(self):
+        """
+        bool: True if every fetch in the batch completed successfully.
+        """
+        return not self.failures and not self.timed_out
+
+    def __repr__(self):
+        return f"FetchReport(results={len(self.results)}, failures={len(self.failures)}, timed_out={self.timed_out})"
+
+
+class FetchScheduler:
+    """
+    Runs NHL API requests with bounded concurrency, per-request timeouts and retries.
+
+    The scheduler owns one `aiohttp.ClientSession` whose connector limits the total number of open
+    connections and the number per host. A semaphore caps the number of requests in flight, so large
+    fan-outs queue up instead of bursting the API. Requests that time out, fail to connect, or return
+    429/5xx are retried with jittered exponential backoff. Every request goes through the shared
+    `api_cache`. Fresh cached responses are served before a slot is taken, and a request waiting out its
+    backoff gives its slot up, so only requests actually on the network count against the limit.
+
+    Parameters:
+        max_in_flight (int): The maximum number of requests running at once.
+        per_host_limit (int): The maximum number of open connections to a single host.
+        request_timeout (float): The timeout in seconds of a single request attempt.
+        total_deadline (float): The time in seconds a whole batch may take before the unfinished
+            fetches are cancelled and reported as timed out.
+        max_retries (int): The number of retries after the first attempt.
+        backoff_base (float): The base delay in seconds of the exponential backoff.
+        backoff_cap (float): The maximum backoff delay in seconds.
+        cache (ApiCache): The cache every request goes through. Defaults to the shared `api_cache`.
+
+    Note:
+        The scheduler must be entered with `async with` before use; that opens its session.
+    """
+    def __init__(self, max_in_flight=16, per_host_limit=8, request_timeout=10.0, total_deadline=120.0,
+                 max_retries=3, backoff_base=0.5, backoff_cap=8.0, cache=None):
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.request_timeout = request_timeout
+        self.total_deadline = total_deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.cache = cache if cache is not None else api_cache
+        self.session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Opens the scheduler's HTTP session and connection pool.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.per_host_limit)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self):
+        """
+        Closes the scheduler's HTTP session.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def backoff_delay(self, attempt):
+        """
+        Returns the delay before retry number `attempt`, using exponential backoff with full jitter.
+
+        Parameters:
+            attempt (int): The zero-based retry number.
+
+        Returns:
+            float: A random delay between 0 and `min(backoff_cap, backoff_base * 2 ** attempt)` seconds.
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def get(self, url, revalidate=False, immutable=False):
+        """
+        Fetches a URL through the cache, retrying timeouts, connection errors and 429/5xx responses.
+
+        Parameters:
+            url (str): The URL to fetch.
+            revalidate (bool): If True, a fresh cached copy is revalidated with the server instead of
+                being served as is.
+            immutable (bool): If True, the response never changes, e.g. because it belongs to a completed
+                season, so once cached it is served from disk for good and never revalidated.
+
+        Returns:
+            CachedResponse: The response. After the last retry a 429/5xx response is returned as is so
+            callers can treat it like any other non-200 status.
+
+        Raises:
+            asyncio.TimeoutError or aiohttp.ClientError: If the last attempt timed out or failed to connect.
+        """
+        response = self.cache.cached(url, revalidate)
+        if response is not None:
+            return response
+        return await self._with_retries(lambda: self.cache.get_async(self.session, url, revalidate, immutable))
+
+    async def get_bytes(self, url):
+        """
+        Downloads a URL without going through the API cache, with the same limits, timeout and retries as `get`.
+
+        This is meant for resources kept in their own store, such as the images in the asset cache.
+
+        Parameters:
+            url (str): The URL to download.
+
+        Returns:
+            CachedResponse: The response, whose `from_cache` is always False. After the last retry a 429/5xx
+            response is returned as is.
+
+        Raises:
+            asyncio.TimeoutError or aiohttp.ClientError: If the last attempt timed out or failed to connect.
+        """
+        return await self._with_retries(lambda: self._download(url))
+
+    async def _download(self, url):
+        async with self.session.get(url) as response:
+            return CachedResponse(response.status, await response.read())
+
+    async def _with_retries(self, request):
+        # Each attempt holds a slot only while it is on the network, so cache hits and requests waiting
+        # out a backoff never keep other requests from running
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    response = await asyncio.wait_for(request(), self.request_timeout)
+                    if response.status not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                        return response
+                except (asyncio.TimeoutError, aiohttp.ClientError):
+                    if attempt >= self.max_retries:
+                        raise
+            await asyncio.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def deadline(self):
+        """
+        Returns the absolute event loop time at which a batch started now must finish.
+
+        Returns:
+            float: `loop.time() + total_deadline`.
+        """
+        return asyncio.get_running_loop().time() + self.total_deadline
+
+    async def gather_partial(self, coros, deadline=None):
+        """
+        Runs a batch of coroutines and reports whatever finished instead of failing all-or-nothing.
+
+        Parameters:
+            coros (iterable of coroutine): The fetches to run.
+            deadline (float, optional): The absolute event loop time by which the batch must finish.
+                Defaults to `total_deadline` seconds from now.
+
+        Returns:
+            FetchReport: The successful results in submission order, the failures, and the number of
+            fetches cancelled at the deadline.
+        """
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = self.deadline()
+        tasks = [loop.create_task(coro) for coro in coros]
+        if not tasks:
+            return FetchReport()
+        done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        report = FetchReport(timed_out=len(pending))
+        for task in tasks:
+            if task in pending:
+                continue
+            if task.exception() is not None:
+                report.failures.append(task.exception())
+            else:
+                report.results.append(task.result())
+        return report
@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+
+from api_cache import CachedResponse
+from fetch_scheduler import FetchScheduler
+
+
+class FakeCache:
+    """
+    Stands in for `ApiCache`, answering each URL with a scripted sequence of statuses.
+    """
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = statuses or {}
+        self.delay = delay
+        self.calls = []
+
+    def cached(self, url, revalidate=False):
+        return None
+
+    async def get_async(self, session, url, revalidate=False, immutable=False):
+        self.calls.append(url)
+        await asyncio.sleep(self.delay)
+        script = self.statuses.get(url, [200])
+        status = script.pop(0) if len(script) > 1 else script[0]
+        return CachedResponse(status, b"{}")
+
+
+class TestFetchScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_rate_limited_requests(self):
+        cache = FakeCache({"a": [429, 503, 200]})
+        async with FetchScheduler(cache=cache, backoff_base=0.001) as scheduler:
+            response = await scheduler.get("a")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(cache.calls), 3)
+
+    async def test_returns_last_response_when_retries_run_out(self):
+        cache = FakeCache({"a": [503]})
+        async with FetchScheduler(cache=cache, max_retries=2, backoff_base=0.001) as scheduler:
+            response = await scheduler.get("a")
+
+        self.assertEqual(response.status, 503)
+        self.assertEqual(len(cache.calls), 3)
+
+    async def test_gather_partial_reports_timeouts_and_failures(self):
+        async def ok(value):
+            return value
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        async def broken():
+            raise ValueError("bad payload")
+
+        async with FetchScheduler(cache=FakeCache(), total_deadline=0.05) as scheduler:
+            report = await scheduler.gather_partial([ok(1), slow(), broken(), ok(2)])
+
+        self.assertEqual(report.results, [1, 2])
+        self.assertEqual(report.timed_out, 1)
+        self.assertEqual(len(report.failures), 1)
+        self.assertFalse(report.complete)
+
+    async def test_limits_requests_in_flight(self):
+        in_flight = 0
+        peak = 0
+
+        class CountingCache(FakeCache):
+            async def get_async(self, session, url, revalidate=False, immutable=False):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return CachedResponse(200, b"{}")
+
+        async with FetchScheduler(cache=CountingCache(), max_in_flight=3) as scheduler:
+            report = await scheduler.gather_partial(scheduler.get(str(i)) for i in range(12))
+
+        self.assertEqual(len(report.results), 12)
+        self.assertLessEqual(peak, 3)
+
+    async def test_backoff_and_cache_hits_do_not_hold_a_slot(self):
+        class CachingCache(FakeCache):
+            def cached(self, url, revalidate=False):
+                return CachedResponse(200, b"{}", from_cache=True) if url == "cached" else None
+
+        cache = CachingCache({"limited": [429, 200], "other": [200]})
+        async with FetchScheduler(cache=cache, max_in_flight=1) as scheduler:
+            scheduler.backoff_delay = lambda attempt: 0.2
+            loop = asyncio.get_running_loop()
+            limited = loop.create_task(scheduler.get("limited"))
+            await asyncio.sleep(0.05)  # The first attempt was rate limited and is backing off
+            started = loop.time()
+            cached, other = await asyncio.gather(scheduler.get("cached"), scheduler.get("other"))
+            elapsed = loop.time() - started
+            await limited
+
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(other.status, 200)
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(cache.calls, ["limited", "other", "limited"])
+
+    def test_backoff_delay_is_capped(self):
+        scheduler = FetchScheduler(backoff_base=1.0, backoff_cap=4.0)
+        for attempt in range(10):
+            self.assertLessEqual(scheduler.backoff_delay(attempt), 4.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
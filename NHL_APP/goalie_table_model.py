@@ -0,0 +1,133 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from shared import GOALIE_STAT_COLUMNS
+
+
+class GoalieStatsModel(QAbstractTableModel):
+    """
+    A read-only, sortable table model over a list of `GoalieStatLine` records.
+
+    A league has only a few dozen goalies, so the records are kept as they are instead of packed into
+    columns. Sorting uses the raw values, so the save percentage and goals against average sort as
+    numbers; goalies with unknown quality starts always sort last. The active sort is re-applied when
+    goalies are updated or added.
+
+    Goalies are identified by `GoalieStatLine.key`. `upsert_rows` overwrites the records of goalies already
+    shown and signals a change for those rows only, unless the active sort order is affected.
+
+    Parameters:
+        parent (QObject, optional): The owner of the model.
+    """
+    TEXT_COLUMNS = (0, 1)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.goalies = []
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.goalies)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(GOALIE_STAT_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.goalies[index.row()].display_values()[index.column()]
+        if role == Qt.TextAlignmentRole and index.column() not in self.TEXT_COLUMNS:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return GOALIE_STAT_COLUMNS[section]
+        return section + 1
+
+    def set_rows(self, goalies):
+        """
+        Replaces every row of the model with the given goalie records.
+
+        Parameters:
+            goalies (iterable of GoalieStatLine): The goalies to show.
+        """
+        self.beginResetModel()
+        self.goalies = list(goalies)
+        self.endResetModel()
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def upsert_rows(self, goalies):
+        """
+        Updates the goalies already in the model and appends the others.
+
+        Parameters:
+            goalies (list of GoalieStatLine): The goalies' current statistics.
+        """
+        rows = {goalie.key: row for row, goalie in enumerate(self.goalies)}
+        changed = []
+        new = []
+        for goalie in goalies:
+            row = rows.get(goalie.key)
+            if row is None:
+                new.append(goalie)
+            elif self.goalies[row] != goalie:
+                self.goalies[row] = goalie
+                changed.append(row)
+        if new:
+            first = len(self.goalies)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            self.goalies.extend(new)
+            self.endInsertRows()
+        if self._sort_column >= 0 and (changed or new):
+            self.sort(self._sort_column, self._sort_order)
+        else:
+            last_column = self.columnCount() - 1
+            for row in changed:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+    def remove_goalies(self, keys):
+        """
+        Removes goalies from the model.
+
+        Parameters:
+            keys (iterable): The `GoalieStatLine.key` of each goalie to remove.
+        """
+        keys = set(keys)
+        for row in reversed(range(len(self.goalies))):
+            if self.goalies[row].key in keys:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.goalies[row]
+                self.endRemoveRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts the model by one column using the raw values.
+
+        Parameters:
+            column (int): The column index to sort by.
+            order (Qt.SortOrder): The sort direction.
+        """
+        if column < 0:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_goalies = self.goalies
+        rows = range(len(old_goalies))
+        known = [row for row in rows if old_goalies[row][column] is not None]
+        known.sort(key=lambda row: old_goalies[row][column], reverse=order == Qt.DescendingOrder)
+        new_order = known + [row for row in rows if old_goalies[row][column] is None]
+        self.goalies = [old_goalies[row] for row in new_order]
+        self._sort_column = column
+        self._sort_order = order
+
+        # Keep selections and the current index on the same goalies after the rows move
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_rows = {old_row: row for row, old_row in enumerate(new_order)}
+            self.changePersistentIndexList(
+                persistent, [self.index(new_rows[index.row()], index.column()) for index in persistent])
+        self.layoutChanged.emit()
@@ -0,0 +1,51 @@
+import unittest
+
+from PyQt5.QtCore import QPersistentModelIndex, Qt
+
+from goalie_table_model import GoalieStatsModel
+from shared import GoalieStatLine
+
+
+def goalies():
+    return [GoalieStatLine("A", "TOR", 30, 15, 10, 5, 2, 2.8, 0.905, None),
+            GoalieStatLine("B", "MTL", 40, 20, 15, 5, 3, 3.1, 0.899, 18),
+            GoalieStatLine("C", "BOS", 50, 30, 15, 5, 4, 2.4, 0.918, 30)]
+
+
+class TestGoalieStatsModel(unittest.TestCase):
+    def test_goalies_with_unknown_quality_starts_sort_last(self):
+        model = GoalieStatsModel()
+        model.set_rows(goalies())
+
+        model.sort(9, Qt.DescendingOrder)
+        self.assertEqual([model.index(row, 0).data() for row in range(3)], ["C", "B", "A"])
+        model.sort(7, Qt.AscendingOrder)
+        self.assertEqual([model.index(row, 0).data() for row in range(3)], ["C", "A", "B"])
+        self.assertEqual(model.index(0, 8).data(), ".918")
+
+    def test_selection_stays_on_the_same_goalie_after_sorting(self):
+        model = GoalieStatsModel()
+        model.set_rows(goalies())
+        selected = QPersistentModelIndex(model.index(1, 0))
+
+        model.sort(8, Qt.DescendingOrder)
+
+        self.assertEqual(selected.row(), 2)
+        self.assertEqual(selected.data(), "B")
+
+
+    def test_refreshed_goalies_keep_the_active_sort(self):
+        model = GoalieStatsModel()
+        model.set_rows(goalies())
+        model.sort(3, Qt.DescendingOrder)
+        selected = QPersistentModelIndex(model.index(2, 0))
+
+        model.upsert_rows([goalies()[0]._replace(wins=35), GoalieStatLine("D", "NYR", 20, 18, 2, 0, 1, 2.0, 0.930, 9)])
+        model.remove_goalies([("B", "MTL")])
+
+        self.assertEqual([model.index(row, 0).data() for row in range(3)], ["A", "C", "D"])
+        self.assertEqual(selected.data(), "A")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+import atexit
+import functools
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+TRACE_PATH = os.environ.get("NHL_TRACE")  # Set to a file path to record a trace of the session
+MAX_EVENTS = 200_000  # Completed spans kept for export; the oldest are dropped first
+ENDPOINT_SAMPLES = 1000  # Latencies kept per endpoint for the percentiles
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+_TEAM_SEGMENT = re.compile(r"/[A-Z]{3}(?=/|$)")
+
+
+def url_template(url):
+    """
+    Reduces a URL to the endpoint it belongs to, so timings of e.g. every player landing page are grouped.
+
+    Parameters:
+        url (str): The requested URL.
+
+    Returns:
+        str: The path with player IDs, seasons and team abbreviations replaced by placeholders, and
+        without the query string.
+    """
+    path = re.sub(r"^[a-z]+://[^/]+", "", url).split("?", 1)[0]
+    path = _NUMERIC_SEGMENT.sub("/{id}", path)
+    return _TEAM_SEGMENT.sub("/{team}", path)
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a list of numbers.
+
+    Parameters:
+        values (list of float): The samples. Need not be sorted.
+        fraction (float): The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The sample at that rank, or 0.0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class Span:
+    """
+    A timed section of code, recorded by the `Tracer` when the `with` block exits.
+
+    Attributes:
+        args (dict): Details shown with the span in the trace viewer. Add to them with `set`.
+    """
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self, time.perf_counter_ns())
+        return False
+
+
+class _NullSpan:
+    """
+    The span handed out while tracing is off. It records nothing.
+    """
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def _in_task():
+    asyncio = sys.modules.get("asyncio")  # Not imported by the tracer itself, which loads at startup
+    if asyncio is None:
+        return False
+    try:
+        return asyncio.current_task() is not None
+    except RuntimeError:
+        return False
+
+
+class Tracer:
+    """
+    Collects timed spans from every thread and exports them in the Chrome trace event format.
+
+    Tracing is off unless `enable` is called or the `NHL_TRACE` environment variable names a file, in
+    which case the trace is written there when the app exits. While off, `span` returns a shared no-op
+    object, so instrumented hot paths cost one attribute check. HTTP spans are also aggregated per
+    endpoint for the latency percentiles shown in the debug panel.
+
+    The exported file can be opened in chrome://tracing or https://ui.perfetto.dev.
+
+    Parameters:
+        max_events (int): The number of completed spans kept for export.
+    """
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        self._endpoints = defaultdict(lambda: {"latencies": deque(maxlen=ENDPOINT_SAMPLES), "count": 0,
+                                               "hits": 0, "errors": 0, "bytes": 0})
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        """
+        Drops every recorded span and endpoint statistic.
+        """
+        with self._lock:
+            self._events.clear()
+            self._endpoints.clear()
+
+    def span(self, name, category="app", **args):
+        """
+        Returns a context manager timing the code in its `with` block.
+
+        Parameters:
+            name (str): The name shown in the trace.
+            category (str): The span category. Spans in the 'http' category that carry an 'endpoint' argument
+                also feed the per-endpoint statistics.
+            **args: Details recorded with the span.
+
+        Returns:
+            Span: The span, or a no-op stand-in while tracing is off.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def record(self, span, end):
+        thread = threading.current_thread()
+        ts = (span.start - self._origin) / 1000
+        duration = (end - span.start) / 1000
+        event = {"name": span.name, "cat": span.category, "pid": os.getpid(), "tid": thread.ident, "ts": ts}
+        if _in_task():
+            # Spans of concurrent tasks overlap on the loop's thread, so record them as async events,
+            # which the trace viewers lay out side by side instead of nesting
+            events = (dict(event, ph="b", id=id(span), args=span.args),
+                      dict(event, ph="e", id=id(span), ts=ts + duration))
+        else:
+            events = (dict(event, ph="X", dur=duration, args=span.args),)
+        with self._lock:
+            self._events.extend(events)
+            self._threads[thread.ident] = thread.name
+            endpoint = span.args.get("endpoint")
+            if span.category == "http" and endpoint is not None:
+                stats = self._endpoints[endpoint]
+                stats["latencies"].append(duration / 1000)
+                stats["count"] += 1
+                stats["hits"] += span.args.get("cache") == "hit"
+                stats["errors"] += span.args.get("status", 200) != 200
+                stats["bytes"] += span.args.get("bytes", 0)
+
+    def endpoint_summary(self):
+        """
+        Summarizes the HTTP requests seen so far, per endpoint.
+
+        Returns:
+            dict: For each URL template, the number of requests, cache hits, non-200 responses and bytes
+            received, and the p50 and p95 latencies in milliseconds over the most recent requests.
+        """
+        with self._lock:
+            endpoints = {endpoint: dict(stats, latencies=list(stats["latencies"]))
+                         for endpoint, stats in self._endpoints.items()}
+        return {endpoint: {
+            "count": stats["count"], "hits": stats["hits"], "errors": stats["errors"], "bytes": stats["bytes"],
+            "p50_ms": percentile(stats["latencies"], 0.50), "p95_ms": percentile(stats["latencies"], 0.95),
+        } for endpoint, stats in sorted(endpoints.items())}
+
+    def export(self, path):
+        """
+        Writes the recorded spans to a Chrome trace event file.
+
+        Parameters:
+            path (str): The file to write.
+
+        Returns:
+            int: The number of trace events written, not counting thread names.
+        """
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        pid = os.getpid()
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in threads.items()]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, file)
+        return len(events)
+
+
+def traced(name, category="app"):
+    """
+    Decorates a function so each call is recorded as a span while tracing is on.
+
+    Parameters:
+        name (str): The name shown in the trace.
+        category (str): The span category.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Shared tracer used by every instrumented call in the app
+tracer = Tracer()
+span = tracer.span
+
+if TRACE_PATH:
+    tracer.enable()
+    atexit.register(tracer.export, TRACE_PATH)
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from instrumentation import NULL_SPAN, Tracer, percentile, url_template
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_tracer_hands_out_the_null_span(self):
+        tracer = Tracer()
+
+        with tracer.span("GET", "http", endpoint="/v1/standings/now") as span:
+            span.set(status=200)
+
+        self.assertIs(span, NULL_SPAN)
+        self.assertEqual(tracer.endpoint_summary(), {})
+
+    def test_http_spans_feed_endpoint_percentiles(self):
+        tracer = Tracer()
+        tracer.enable()
+        for cache in ("miss", "hit", "hit"):
+            with tracer.span("GET", "http", endpoint="/v1/player/{id}/landing") as span:
+                span.set(status=200, bytes=1024, cache=cache)
+
+        stats = tracer.endpoint_summary()["/v1/player/{id}/landing"]
+        self.assertEqual((stats["count"], stats["hits"], stats["errors"], stats["bytes"]), (3, 2, 0, 3072))
+        self.assertLessEqual(stats["p50_ms"], stats["p95_ms"])
+
+    def test_export_writes_chrome_trace_events(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("HomeScreen.init_ui", "ui"):
+            pass
+
+        async def request():
+            with tracer.span("GET", "http", endpoint="/v1/standings/now"):
+                await asyncio.sleep(0)
+        asyncio.run(request())
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.json")
+            self.assertEqual(tracer.export(path), 3)
+            with open(path) as file:
+                events = json.load(file)["traceEvents"]
+
+        phases = {(event["name"], event["ph"]) for event in events}
+        self.assertIn(("HomeScreen.init_ui", "X"), phases)
+        self.assertIn(("GET", "b"), phases)
+        self.assertIn(("GET", "e"), phases)
+        self.assertIn(("thread_name", "M"), phases)
+
+
+class TestHelpers(unittest.TestCase):
+    def test_url_template_groups_ids_and_teams(self):
+        self.assertEqual(url_template("https://api-web.nhle.com/v1/player/8478402/landing"), "/v1/player/{id}/landing")
+        self.assertEqual(url_template("http://127.0.0.1:8765/v1/roster/TOR/current"), "/v1/roster/{team}/current")
+        self.assertEqual(url_template("https://api-web.nhle.com/v1/skater-stats-leaders/20232024/2?limit=3"),
+                         "/v1/skater-stats-leaders/{id}/{id}")
+
+    def test_percentile_uses_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.95), 95)
+        self.assertEqual(percentile([], 0.95), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
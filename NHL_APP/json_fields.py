@@ -0,0 +1,85 @@
+import json
+import re
+from json.decoder import scanstring
+from json.scanner import make_scanner
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library decoder is used without it
+    orjson = None
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_scan_value = make_scanner(json.JSONDecoder())
+
+
+def loads(data):
+    """
+    Decodes a whole JSON document, with orjson when it is installed.
+
+    Parameters:
+        data (bytes or str): The JSON document.
+
+    Returns:
+        dict or list: The decoded document.
+
+    Raises:
+        ValueError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def top_level_fields(data, keys):
+    """
+    Decodes only some of the top-level members of a JSON object.
+
+    The object is walked member by member and the walk stops as soon as every key has been seen, so
+    the large members that follow the wanted ones (season totals, game logs, rosters and so on) are
+    never decoded or even scanned. Members before the last wanted key are still decoded, so a key
+    missing from the document costs as much as decoding all of it.
+
+    Parameters:
+        data (bytes or str): A JSON document whose top level is an object.
+        keys (iterable of str): The members to decode.
+
+    Returns:
+        dict: The wanted members that are present, keyed by name.
+
+    Raises:
+        ValueError: If the document is not a valid JSON object up to the last wanted member.
+    """
+    text = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
+    skip = _WHITESPACE.match
+    remaining = set(keys)
+    fields = {}
+    pos = skip(text).end()
+    if not text.startswith("{", pos):
+        raise json.JSONDecodeError("Expecting object", text, pos)
+    pos = skip(text, pos + 1).end()
+    if text.startswith("}", pos):
+        return fields
+    try:
+        while remaining:
+            if text[pos] != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = skip(text, pos).end()
+            if text[pos] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+            try:
+                value, pos = _scan_value(text, skip(text, pos + 1).end())
+            except StopIteration as error:
+                raise json.JSONDecodeError("Expecting value", text, error.value) from None
+            if key in remaining:
+                fields[key] = value
+                remaining.discard(key)
+            pos = skip(text, pos).end()
+            if text[pos] == "}":
+                break
+            if text[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos = skip(text, pos + 1).end()
+    except IndexError:
+        raise json.JSONDecodeError("Unterminated object", text, len(text)) from None
+    return fields
@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from json_fields import loads, top_level_fields
+from nhl_api_standin import Synthesizer
+from shared import LANDING_FIELDS, extract_player_stats
+
+
+class TestJsonFields(unittest.TestCase):
+    def test_only_top_level_members_are_returned(self):
+        # The nested playerId and firstName belong to a teammate and must not be picked up
+        body = b'{ "roster" : [{"playerId": 2, "firstName": "B"}], "playerId" : 1,\n "firstName": {"default": "A"} }'
+        self.assertEqual(top_level_fields(body, ('playerId', 'firstName', 'missing')),
+                         {'playerId': 1, 'firstName': {'default': 'A'}})
+        self.assertEqual(top_level_fields('{}', ('playerId',)), {})
+
+    def test_members_after_the_last_wanted_key_are_not_scanned(self):
+        self.assertEqual(top_level_fields('{"a": 1, "b": [1, 2', ('a',)), {'a': 1})
+
+    def test_malformed_documents_raise_value_errors(self):
+        for document in ('[1, 2]', '{"a" 1}', '{"a": 1 "b": 2}', '{"a": }', '{"a": 1,', '{"a": "é'):
+            with self.subTest(document=document), self.assertRaises(ValueError):
+                top_level_fields(document, ('a', 'b'))
+
+    def test_landing_page_extraction_matches_a_full_decode(self):
+        synthesizer = Synthesizer()
+        for player_id in list(synthesizer.players)[:50]:
+            body = json.dumps(synthesizer.landing(player_id), ensure_ascii=False).encode()
+            self.assertEqual(extract_player_stats(top_level_fields(body, LANDING_FIELDS)),
+                             extract_player_stats(loads(body)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,471 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import time
+
+import aiohttp
+from aiohttp import web
+
+from shared import CURRENT_SEASON, count_quality_starts, nhl_team_abbreviations, season_for_date
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LIVE_API_BASE_URL = "https://api-web.nhle.com"
+
+FIRST_NAMES = ["Auston", "Connor", "Nathan", "Nikita", "David", "Leon", "Cale", "Mitch", "Jack", "Quinn",
+               "Elias", "Kirill", "Brady", "Sidney", "Alex", "Matthew", "Jason", "Mikko", "Artemi", "Sebastian"]
+LAST_NAMES = ["Matthews", "McDavid", "MacKinnon", "Kucherov", "Pastrnak", "Draisaitl", "Makar", "Marner",
+              "Hughes", "Pettersson", "Kaprizov", "Tkachuk", "Crosby", "Ovechkin", "Robertson", "Aho",
+              "Panarin", "Rantanen", "Point", "Eichel"]
+
+
+class Synthesizer:
+    """
+    Generates deterministic stand-ins for the NHL API payloads the app reads.
+
+    Every team gets 14 forwards, 8 defensemen and 2 goalies with stable player IDs, and each landing page
+    carries career totals, season totals and recent games so its size and shape resemble the real
+    document. Goalies also get a regular season game log. The same seed always produces the same league.
+
+    Parameters:
+        seed (int): The seed of the random generator.
+        base_url (str): The URL the stand-in is served from, used for asset links in the payloads.
+    """
+    POSITIONS = (("forwards", "C", 14), ("defensemen", "D", 8), ("goalies", "G", 2))
+
+    def __init__(self, seed=2024, base_url=""):
+        self.seed = seed
+        self.base_url = base_url
+        self.players = {}
+        self.rosters = {}
+        self._reports = {}
+        rng = random.Random(seed)
+        for team_index, abbreviation in enumerate(nhl_team_abbreviations):
+            roster = {}
+            number = 0
+            for group, position, count in self.POSITIONS:
+                roster[group] = []
+                for _ in range(count):
+                    player_id = 8470000 + team_index * 100 + number
+                    number += 1
+                    player = {
+                        "id": player_id,
+                        "headshot": f"{base_url}/assets/mugs/{player_id}.png",
+                        "firstName": {"default": rng.choice(FIRST_NAMES)},
+                        "lastName": {"default": rng.choice(LAST_NAMES)},
+                        "sweaterNumber": number,
+                        "positionCode": position,
+                    }
+                    roster[group].append(player)
+                    self.players[player_id] = (abbreviation, player, rng.random())
+            self.rosters[abbreviation] = roster
+
+    def roster(self, abbreviation):
+        return self.rosters.get(abbreviation)
+
+    def landing(self, player_id):
+        if player_id not in self.players:
+            return None
+        abbreviation, player, talent = self.players[player_id]
+        rng = random.Random(self.seed * 100003 + player_id)
+        games = rng.randint(20, 82)
+        if player["positionCode"] == "G":
+            wins = int(games * (0.3 + 0.4 * talent))
+            shots_against = games * rng.randint(25, 33)
+            goals_against = int(shots_against * (0.08 + 0.04 * (1 - talent)))
+            sub_season = {
+                "gamesPlayed": games, "wins": wins, "losses": games - wins - 3, "otLosses": 3,
+                "shutouts": rng.randint(0, 8), "goalsAgainstAvg": round(goals_against / games, 3),
+                "savePctg": round(1 - goals_against / shots_against, 3),
+            }
+        else:
+            goals = int(games * talent * 0.6)
+            assists = int(games * talent * 0.8)
+            shots = max(goals, int(games * (1 + 3 * talent)))
+            sub_season = {
+                "gamesPlayed": games, "goals": goals, "assists": assists, "points": goals + assists,
+                "plusMinus": rng.randint(-25, 40), "pim": rng.randint(0, 90),
+                "gameWinningGoals": goals // 8, "otGoals": goals // 20, "shots": shots,
+                "shootingPctg": round(goals / shots, 4) if shots else 0,
+                "powerPlayGoals": goals // 4, "powerPlayPoints": (goals + assists) // 3,
+                "shorthandedGoals": 0, "shorthandedPoints": 0,
+            }
+        season_totals = [dict(sub_season, season=20002001 + 10001 * year, gameTypeId=2, leagueAbbrev="NHL",
+                              teamName={"default": abbreviation}, sequence=year)
+                         for year in range(rng.randint(1, 15))]
+        return {
+            "playerId": player_id,
+            "isActive": True,
+            "currentTeamId": nhl_team_abbreviations.index(abbreviation) + 1,
+            "currentTeamAbbrev": abbreviation,
+            "teamLogo": f"{self.base_url}/assets/logos/{abbreviation}.svg",
+            "sweaterNumber": player["sweaterNumber"],
+            "position": player["positionCode"],
+            "headshot": player["headshot"],
+            "firstName": player["firstName"],
+            "lastName": player["lastName"],
+            "featuredStats": {"season": CURRENT_SEASON, "regularSeason": {"subSeason": sub_season, "career": sub_season}},
+            "careerTotals": {"regularSeason": sub_season, "playoffs": sub_season},
+            "last5Games": [dict(gameDate=f"2024-04-0{day}", goals=rng.randint(0, 2), assists=rng.randint(0, 2),
+                                toi="18:32", opponentAbbrev=rng.choice(nhl_team_abbreviations))
+                           for day in range(1, 6)],
+            "seasonTotals": season_totals,
+            "awards": [],
+            "currentTeamRoster": [dict(playerId=other["id"], firstName=other["firstName"], lastName=other["lastName"])
+                                  for group in self.rosters[abbreviation].values() for other in group],
+        }
+
+    def game_log(self, player_id):
+        if player_id not in self.players or self.players[player_id][1]["positionCode"] != "G":
+            return None
+        rng = random.Random(self.seed * 100019 + player_id)
+        games = []
+        for game in range(self.landing(player_id)["featuredStats"]["regularSeason"]["subSeason"]["gamesPlayed"]):
+            shots_against = rng.randint(15, 40)
+            goals_against = min(shots_against, int(rng.expovariate(1 / 2.8)))
+            games.append({
+                "gameId": 2023020001 + game, "gameDate": f"2024-01-{game % 28 + 1:02d}",
+                "gamesStarted": int(rng.random() < 0.92), "shotsAgainst": shots_against,
+                "goalsAgainst": goals_against, "savePctg": round(1 - goals_against / shots_against, 6),
+            })
+        return {"seasonId": CURRENT_SEASON, "gameTypeId": 2, "gameLog": games}
+
+    def stats_report(self, report, start, limit):
+        """
+        Returns one page of a stats REST API report, with the rows ordered by player ID.
+        """
+        if report not in self._reports:
+            rows = (self._report_row(report, player_id) for player_id in sorted(self.players))
+            self._reports[report] = [row for row in rows if row is not None]
+        rows = self._reports[report]
+        return {"data": rows[start:] if limit < 0 else rows[start:start + limit], "total": len(rows)}
+
+    def _report_row(self, report, player_id):
+        landing = self.landing(player_id)
+        sub_season = landing["featuredStats"]["regularSeason"]["subSeason"]
+        name = f"{landing['firstName']['default']} {landing['lastName']['default']}"
+        row = {"playerId": player_id, "teamAbbrevs": landing["currentTeamAbbrev"], "seasonId": CURRENT_SEASON,
+               "gamesPlayed": sub_season["gamesPlayed"]}
+        if report == "skater/summary" and landing["position"] != "G":
+            return dict(row, skaterFullName=name, positionCode=landing["position"], goals=sub_season["goals"],
+                        assists=sub_season["assists"], points=sub_season["points"],
+                        plusMinus=sub_season["plusMinus"], penaltyMinutes=sub_season["pim"],
+                        gameWinningGoals=sub_season["gameWinningGoals"], otGoals=sub_season["otGoals"],
+                        shots=sub_season["shots"], shootingPct=sub_season["shootingPctg"],
+                        ppGoals=sub_season["powerPlayGoals"], ppPoints=sub_season["powerPlayPoints"])
+        if report == "goalie/summary" and landing["position"] == "G":
+            return dict(row, goalieFullName=name, wins=sub_season["wins"], losses=sub_season["losses"],
+                        otLosses=sub_season["otLosses"], shutouts=sub_season["shutouts"],
+                        goalsAgainstAverage=sub_season["goalsAgainstAvg"], savePct=sub_season["savePctg"])
+        if report == "goalie/advanced" and landing["position"] == "G":
+            return dict(row, goalieFullName=name,
+                        qualityStart=count_quality_starts(self.game_log(player_id)["gameLog"]))
+        return None
+
+    def standings(self, date="now"):
+        # Standings on a past date are those of another season, so they get their own teams' records
+        salt = 0 if date == "now" else int(date.replace("-", "")) * 131
+        teams = []
+        for abbreviation in nhl_team_abbreviations:
+            rng = random.Random(self.seed * 7 + nhl_team_abbreviations.index(abbreviation) + salt)
+            wins = rng.randint(25, 55)
+            ot_losses = rng.randint(3, 12)
+            losses = 82 - wins - ot_losses
+            goal_for = rng.randint(200, 300)
+            goal_against = rng.randint(200, 300)
+            teams.append({
+                "teamName": {"default": abbreviation},
+                "teamAbbrev": {"default": abbreviation},
+                "teamLogo": f"{self.base_url}/assets/logos/{abbreviation}.svg",
+                "gamesPlayed": 82, "wins": wins, "losses": losses, "otLosses": ot_losses,
+                "points": 2 * wins + ot_losses, "regulationWins": wins - rng.randint(0, 8),
+                "goalFor": goal_for, "goalAgainst": goal_against, "goalDifferential": goal_for - goal_against,
+                "goalDifferentialPctg": round((goal_for - goal_against) / 82, 3),
+                "goalsForPctg": round(goal_for / 82, 3),
+            })
+        teams.sort(key=lambda team: team["points"], reverse=True)
+        return {"standings": teams}
+
+    @staticmethod
+    def standings_seasons():
+        return {"seasons": [{"id": year * 10001 + 1, "standingsStart": f"{year}-10-10",
+                             "standingsEnd": f"{year + 1}-04-14"} for year in range(2000, CURRENT_SEASON // 10000 + 1)]}
+
+    def leaders(self, category, limit):
+        skaters = [self.landing(player_id) for player_id, (_, player, _) in self.players.items()
+                   if player["positionCode"] != "G"]
+        key = {"points": "points", "goals": "goals", "assists": "assists"}.get(category, "points")
+        skaters.sort(key=lambda landing: landing["featuredStats"]["regularSeason"]["subSeason"][key], reverse=True)
+        return {category: [{
+            "id": landing["playerId"], "firstName": landing["firstName"], "lastName": landing["lastName"],
+            "headshot": landing["headshot"], "teamAbbrev": landing["currentTeamAbbrev"],
+            "value": landing["featuredStats"]["regularSeason"]["subSeason"][key],
+        } for landing in skaters[:limit]]}
+
+
+class StandinConfig:
+    """
+    The behaviour of the stand-in server.
+
+    Parameters:
+        latency (float): The mean delay in seconds added to every response.
+        jitter (float): The maximum random delay in seconds added on top of `latency`.
+        error_rate (float): The fraction of requests answered with 503.
+        rate_limit (float): The sustained number of requests per second allowed before answering 429,
+            or 0 for no limit.
+        burst (int): The number of requests allowed at once before the rate limit applies.
+        seed (int): The seed of the synthetic league and of the injected latency and errors.
+    """
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=0.0, burst=50, seed=2024):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.seed = seed
+
+
+class NHLApiStandin:
+    """
+    A local aiohttp server answering the NHL API endpoints the app uses.
+
+    Recorded payloads in `fixture_dir` are served as-is (see `record_fixtures`); any payload without a
+    recording is generated by a `Synthesizer`. Latency, errors and rate limiting are injected according to
+    the `StandinConfig`, so the fetch pipeline can be benchmarked and load-tested without a network.
+
+    Parameters:
+        config (StandinConfig, optional): The injected latency, errors and rate limiting.
+        fixture_dir (str): The directory holding recorded payloads.
+
+    Attributes:
+        request_count (int): The number of requests received, including rejected ones.
+    """
+    def __init__(self, config=None, fixture_dir=DEFAULT_FIXTURE_DIR):
+        self.config = config or StandinConfig()
+        self.fixture_dir = fixture_dir
+        self.synthesizer = None
+        self.request_count = 0
+        self.base_url = None
+        self._runner = None
+        self._rng = random.Random(self.config.seed)
+        self._tokens = float(self.config.burst)
+        self._last_refill = time.monotonic()
+
+    def app(self):
+        """
+        Builds the aiohttp application serving the stand-in routes.
+
+        Returns:
+            aiohttp.web.Application: The application.
+        """
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_get("/v1/roster/{team}/{season}", self.handle_roster)
+        app.router.add_get("/v1/player/{player_id}/landing", self.handle_landing)
+        app.router.add_get("/v1/player/{player_id}/game-log/{season}/{game_type}", self.handle_game_log)
+        app.router.add_get("/v1/standings/{date}", self.handle_standings)
+        app.router.add_get("/v1/standings-season", self.handle_standings_seasons)
+        app.router.add_get("/v1/skater-stats-leaders/{season}/{game_type}", self.handle_leaders)
+        app.router.add_get("/stats/rest/en/{group}/{report}", self.handle_stats_report)
+        app.router.add_get("/assets/{kind}/{name}", self.handle_asset)
+        return app
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Starts serving in the running event loop.
+
+        Parameters:
+            host (str): The interface to listen on.
+            port (int): The port to listen on, or 0 to pick a free one.
+
+        Returns:
+            str: The base URL of the stand-in, suitable for `shared.set_api_base_url`.
+        """
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        self.synthesizer = Synthesizer(self.config.seed, self.base_url)
+        return self.base_url
+
+    async def stop(self):
+        """
+        Stops serving.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _take_token(self):
+        if not self.config.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.config.burst, self._tokens + (now - self._last_refill) * self.config.rate_limit)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    @web.middleware
+    async def _faults(self, request, handler):
+        self.request_count += 1
+        if not self._take_token():
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        delay = self.config.latency + self._rng.uniform(0, self.config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            return web.Response(status=503)
+        return await handler(request)
+
+    def _recorded(self, *parts):
+        path = os.path.join(self.fixture_dir, *parts)
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _respond(self, recorded, payload_factory):
+        if recorded is not None:
+            return web.Response(body=recorded, content_type="application/json")
+        payload = payload_factory()
+        if payload is None:
+            return web.Response(status=404)
+        return web.json_response(payload)
+
+    async def handle_roster(self, request):
+        team = request.match_info["team"]
+        return self._respond(self._recorded("roster", f"{team}.json"), lambda: self.synthesizer.roster(team))
+
+    async def handle_landing(self, request):
+        player_id = request.match_info["player_id"]
+        if not player_id.isdigit():
+            return web.Response(status=404)
+        return self._respond(self._recorded("player", f"{player_id}.json"),
+                             lambda: self.synthesizer.landing(int(player_id)))
+
+    async def handle_game_log(self, request):
+        player_id = request.match_info["player_id"]
+        if not player_id.isdigit():
+            return web.Response(status=404)
+        return self._respond(self._recorded("game-log", f"{player_id}.json"),
+                             lambda: self.synthesizer.game_log(int(player_id)))
+
+    async def handle_standings(self, request):
+        date = request.match_info["date"]
+        if date == "now" or season_for_date(datetime.date.fromisoformat(date)) == CURRENT_SEASON:
+            return self._respond(self._recorded("standings.json"), self.synthesizer.standings)
+        return self._respond(None, lambda: self.synthesizer.standings(date))
+
+    async def handle_standings_seasons(self, request):
+        return self._respond(None, self.synthesizer.standings_seasons)
+
+    async def handle_leaders(self, request):
+        category = request.query.get("categories", "points")
+        limit = int(request.query.get("limit", 5))
+        return self._respond(self._recorded("leaders", f"{category}.json"),
+                             lambda: self.synthesizer.leaders(category, limit))
+
+    async def handle_stats_report(self, request):
+        report = f"{request.match_info['group']}/{request.match_info['report']}"
+        if report not in ("skater/summary", "goalie/summary", "goalie/advanced"):
+            return web.Response(status=404)
+        start = int(request.query.get("start", 0))
+        limit = int(request.query.get("limit", 50))
+        return web.json_response(self.synthesizer.stats_report(report, start, limit))
+
+    async def handle_asset(self, request):
+        if request.match_info["kind"] == "logos":
+            svg = ('<svg xmlns="http://www.w3.org/2000/svg" width="150" height="100">'
+                   '<rect width="150" height="100" fill="#003E7E"/></svg>')
+            return web.Response(text=svg, content_type="image/svg+xml")
+        return web.Response(status=404)
+
+
+async def record_fixtures(fixture_dir=DEFAULT_FIXTURE_DIR, base_url=LIVE_API_BASE_URL, teams=None):
+    """
+    Asynchronously downloads live NHL API payloads into `fixture_dir` for the stand-in to replay.
+
+    Parameters:
+        fixture_dir (str): The directory the payloads are written to.
+        base_url (str): The API to record from.
+        teams (list of str, optional): The team abbreviations to record. Defaults to every team.
+
+    Returns:
+        int: The number of payloads written.
+    """
+    written = 0
+
+    async def save(session, path, *parts):
+        nonlocal written
+        async with session.get(base_url + path) as response:
+            if response.status != 200:
+                return None
+            body = await response.read()
+        target = os.path.join(fixture_dir, *parts)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as file:
+            file.write(body)
+        written += 1
+        return json.loads(body)
+
+    async with aiohttp.ClientSession() as session:
+        await save(session, "/v1/standings/now", "standings.json")
+        await save(session, f"/v1/skater-stats-leaders/{CURRENT_SEASON}/2?categories=points&limit=3", "leaders", "points.json")
+        for team in teams or nhl_team_abbreviations:
+            roster = await save(session, f"/v1/roster/{team}/current", "roster", f"{team}.json")
+            if roster is None:
+                continue
+            player_ids = [player["id"] for group in ("forwards", "defensemen", "goalies") for player in roster.get(group, [])]
+            goalie_ids = [player["id"] for player in roster.get("goalies", [])]
+            await asyncio.gather(*(save(session, f"/v1/player/{player_id}/landing", "player", f"{player_id}.json")
+                                   for player_id in player_ids),
+                                 *(save(session, f"/v1/player/{player_id}/game-log/{CURRENT_SEASON}/2", "game-log",
+                                        f"{player_id}.json") for player_id in goalie_ids))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the NHL API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean delay per response, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay per response, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before answering 429")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="directory of recorded payloads")
+    parser.add_argument("--record", action="store_true", help="record live payloads into --fixtures and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"Recorded {asyncio.run(record_fixtures(args.fixtures))} payloads into {args.fixtures}")
+        return
+
+    standin = NHLApiStandin(StandinConfig(args.latency, args.jitter, args.error_rate, args.rate_limit),
+                            args.fixtures)
+
+    async def serve():
+        base_url = await standin.start(args.host, args.port)
+        print(f"Serving the NHL API stand-in at {base_url} (set NHL_API_BASE_URL={base_url})")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+import shared
+from api_cache import ApiCache
+from fetch_scheduler import FetchScheduler
+from nhl_api_standin import NHLApiStandin, StandinConfig
+
+
+class TestNHLApiStandin(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ApiCache(os.path.join(self.tmpdir.name, "cache.sqlite"))
+        self.previous_base_url = shared.API_BASE_URL
+
+    async def asyncTearDown(self):
+        shared.set_api_base_url(self.previous_base_url)
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    async def test_league_fetch_runs_against_the_standin(self):
+        async with NHLApiStandin(fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url)
+            async with FetchScheduler(cache=self.cache) as scheduler:
+                report = await shared.fetch_league_player_stats(scheduler)
+
+        self.assertTrue(report.complete)
+        # 22 skaters for each team; goalies are on the roster but not fetched
+        self.assertEqual(len(report.results), 22 * len(shared.nhl_team_abbreviations))
+        self.assertTrue(all(0 <= line.shooting_pctg <= 1 for line in report.results))
+
+    async def test_league_table_comes_from_bulk_reports(self):
+        async with NHLApiStandin(fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url)
+            async with FetchScheduler(cache=self.cache) as scheduler:
+                players = await shared.get_all_team_rosters_and_player_stats(scheduler)
+
+        self.assertEqual(len(players), 22 * len(shared.nhl_team_abbreviations))
+        # One roster per team plus the report pages, instead of one landing page per player
+        self.assertLessEqual(standin.request_count, len(shared.nhl_team_abbreviations) + 10)
+
+    async def test_landing_pages_are_the_fallback_without_reports(self):
+        async with NHLApiStandin(fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url, standin.base_url + "/unavailable")
+            async with FetchScheduler(cache=self.cache) as scheduler:
+                players = await shared.get_all_team_rosters_and_player_stats(scheduler)
+
+        self.assertEqual(len(players), 22 * len(shared.nhl_team_abbreviations))
+        self.assertGreater(standin.request_count, len(players))
+
+    async def test_completed_seasons_are_downloaded_once(self):
+        # Every ordinary response expires at once, so only immutable ones are served from the cache
+        cache = ApiCache(os.path.join(self.tmpdir.name, "seasons.sqlite"), ttls=[], default_ttl=0)
+        async with NHLApiStandin(fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url)
+            async with FetchScheduler(cache=cache) as scheduler:
+                players = await shared.get_all_team_rosters_and_player_stats(scheduler, season=20222023)
+                first_requests = standin.request_count
+                again = await shared.get_all_team_rosters_and_player_stats(scheduler, season=20222023)
+                self.assertEqual(standin.request_count, first_requests)
+                await shared.get_all_team_rosters_and_player_stats(scheduler)
+                self.assertGreater(standin.request_count, first_requests)
+        cache.close()
+
+        self.assertEqual(len(players), 22 * len(shared.nhl_team_abbreviations))
+        self.assertEqual(players, again)
+
+    async def test_rate_limited_requests_are_retried(self):
+        config = StandinConfig(rate_limit=20, burst=1)
+        async with NHLApiStandin(config, fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url)
+            async with FetchScheduler(cache=self.cache, max_retries=10, backoff_base=0.05) as scheduler:
+                rosters = [await shared.fetch_team_rosters(scheduler, team) for team in ('TOR', 'MTL', 'BOS')]
+
+        self.assertEqual([len(roster) for roster in rosters], [22, 22, 22])
+        self.assertGreater(standin.request_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+import heapq
+import json
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+from api_cache import DEFAULT_CACHE_PATH
+from stats_warehouse import stats_warehouse
+
+# The index is kept next to the API cache so it is ready at startup without fetching any roster
+DEFAULT_INDEX_PATH = os.environ.get(
+    "NHL_PLAYER_INDEX", os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "nhl_player_index.json"))
+INDEX_VERSION = 1
+MIN_SIMILARITY = 0.5  # Share of a misspelt query's trigrams a player's name must contain to match it
+
+# Points awarded to a player for each query word, by how the word matched
+EXACT_MATCH = 3
+PREFIX_MATCH = 2
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def fold(text):
+    """
+    Folds text for matching: accents are stripped and case is ignored, so "Stützle" matches "stutzle".
+
+    Parameters:
+        text (str): The text to fold.
+
+    Returns:
+        str: The folded text.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def words(text):
+    """
+    Splits text into folded words, dropping punctuation such as hyphens and apostrophes.
+    """
+    return _WORD.findall(fold(text))
+
+
+def trigrams(text):
+    """
+    Returns the set of three-letter sequences of each folded word, padded so word starts weigh more.
+    """
+    grams = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+SearchEntry = namedtuple('SearchEntry', ['player_id', 'name', 'team', 'points'])
+
+
+class PlayerSearchIndex:
+    """
+    An in-memory search index over the league's players.
+
+    Every player's name words and team abbreviation are kept in one sorted list of folded terms, so each
+    word the user has typed is looked up by prefix with a binary search. Players matching every word are
+    ranked by how well the words matched, then by points. When that finds fewer players than asked for,
+    misspelt queries are matched by the trigrams they share with the players' names.
+
+    Parameters:
+        entries (list of SearchEntry): The players to search.
+    """
+    def __init__(self, entries=()):
+        self.entries = [SearchEntry._make(entry) for entry in entries]
+        self.terms = sorted((term, position) for position, entry in enumerate(self.entries)
+                            for term in set(words(entry.name)) | {entry.team.casefold()})
+        self.grams = {}
+        self.gram_counts = []
+        for position, entry in enumerate(self.entries):
+            grams = trigrams(entry.name)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(position)
+
+    @classmethod
+    def from_players(cls, players):
+        """
+        Builds an index from player statistics.
+
+        Parameters:
+            players (iterable of PlayerStatLine): The players to index.
+
+        Returns:
+            PlayerSearchIndex: The index.
+        """
+        return cls(SearchEntry(player.player_id, player.name, player.team, player.points) for player in players)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix_matches(self, word):
+        matches = {}
+        terms = self.terms
+        for row in range(bisect_left(terms, (word,)), len(terms)):
+            term, position = terms[row]
+            if not term.startswith(word):
+                break
+            score = EXACT_MATCH if term == word else PREFIX_MATCH
+            if score > matches.get(position, 0):
+                matches[position] = score
+        return matches
+
+    def _fuzzy_matches(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return {}
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        # Rank by how much of the query the name contains, then by how little of the name is left over
+        return {position: (count / len(grams), count / (len(grams) + self.gram_counts[position] - count))
+                for position, count in shared.items() if count / len(grams) >= MIN_SIMILARITY}
+
+    def search(self, query, limit=10):
+        """
+        Finds the players best matching a query.
+
+        Parameters:
+            query (str): Part of a player's first or last name and/or a team abbreviation, in any case and
+                with or without accents, e.g. "mcd", "con mcdavid" or "tor mat".
+            limit (int): The maximum number of players returned.
+
+        Returns:
+            list of SearchEntry: The matching players, best match first.
+        """
+        query_words = words(query)
+        if not query_words or limit <= 0:
+            return []
+        scores = self._prefix_matches(query_words[0])
+        for word in query_words[1:]:
+            matches = self._prefix_matches(word)
+            scores = {position: score + matches[position] for position, score in scores.items() if position in matches}
+        ranked = heapq.nsmallest(limit, scores, key=lambda position: (
+            -scores[position], -self.entries[position].points, self.entries[position].name))
+        if len(ranked) < limit:
+            similarities = self._fuzzy_matches(query)
+            ranked += sorted((position for position in similarities if position not in scores),
+                             key=lambda position: (-similarities[position][0], -similarities[position][1],
+                                                   -self.entries[position].points))
+        return [self.entries[position] for position in ranked[:limit]]
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """
+        Writes the index to a JSON file, replacing the previous file atomically.
+
+        Parameters:
+            path (str): The file to write.
+        """
+        document = {
+            "version": INDEX_VERSION,
+            "entries": self.entries,
+            "terms": self.terms,
+            "grams": self.grams,
+            "gram_counts": self.gram_counts,
+        }
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(document, file, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        """
+        Reads an index written by `save` without rebuilding it.
+
+        Parameters:
+            path (str): The file to read.
+
+        Returns:
+            PlayerSearchIndex or None: The index, or None if the file is missing, unreadable or was written
+            by an incompatible version.
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                document = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if document.get("version") != INDEX_VERSION:
+            return None
+        index = cls.__new__(cls)
+        index.entries = [SearchEntry._make(entry) for entry in document["entries"]]
+        index.terms = [tuple(term) for term in document["terms"]]
+        index.grams = document["grams"]
+        index.gram_counts = document["gram_counts"]
+        return index
+
+
+class PlayerSearch:
+    """
+    Holds the app's player search index and keeps it and its file in step with the stats warehouse.
+
+    The index is loaded from disk on first use. If there is no file yet, it is built from the players in
+    the stats warehouse, so it is only empty until the first roster sync. `rebuild` replaces the index in
+    one assignment, so searches on the GUI thread never see a half-built index.
+
+    Parameters:
+        path (str): The file the index is persisted to.
+    """
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._index = None
+        self._lock = threading.Lock()
+
+    def index(self):
+        """
+        Returns the current index, loading or building it on first use.
+        """
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    index = PlayerSearchIndex.load(self.path)
+                    if index is None:
+                        index = self._build(stats_warehouse.player_stat_lines())
+                    self._index = index
+        return self._index
+
+    def search(self, query, limit=10):
+        """
+        Finds the players best matching a query. See `PlayerSearchIndex.search`.
+        """
+        return self.index().search(query, limit)
+
+    def rebuild(self, players):
+        """
+        Replaces the index with one over the given players and saves it.
+
+        Parameters:
+            players (iterable of PlayerStatLine): Every player currently on a roster.
+        """
+        index = self._build(players)
+        with self._lock:
+            self._index = index
+
+    def _build(self, players):
+        index = PlayerSearchIndex.from_players(players)
+        if len(index):
+            try:
+                index.save(self.path)
+            except OSError:
+                pass  # The index still works for this session; it is rebuilt from the warehouse next time
+        return index
+
+
+# Shared search index used by the home screen
+player_search = PlayerSearch()
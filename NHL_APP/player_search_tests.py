@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+import unittest
+
+from player_search import PlayerSearch, PlayerSearchIndex, fold
+from shared import PlayerStatLine
+
+
+def player(player_id, name, team, points):
+    return PlayerStatLine(name, team, 82, 0, points, points, 0, 0, 0, 0, 100, 0.0, player_id)
+
+
+PLAYERS = [
+    player(1, "Connor McDavid", "EDM", 132),
+    player(2, "Connor Bedard", "CHI", 61),
+    player(3, "Tim Stützle", "OTT", 54),
+    player(4, "Auston Matthews", "TOR", 107),
+    player(5, "Mitch Marner", "TOR", 85),
+    player(6, "Ryan McDonagh", "TBL", 24),
+    player(7, "Jean-Gabriel Pageau", "NYI", 26),
+]
+
+
+class TestPlayerSearch(unittest.TestCase):
+    def setUp(self):
+        self.index = PlayerSearchIndex.from_players(PLAYERS)
+
+    def names(self, query, limit=10):
+        return [entry.name for entry in self.index.search(query, limit)]
+
+    def test_fold_strips_accents_and_case(self):
+        self.assertEqual(fold("Tim STÜTZLE"), "tim stutzle")
+
+    def test_prefixes_of_first_and_last_names_match_without_accents(self):
+        self.assertEqual(self.names("stut"), ["Tim Stützle"])
+        self.assertEqual(self.names("stützle"), ["Tim Stützle"])
+        self.assertEqual(self.names("gabriel"), ["Jean-Gabriel Pageau"])
+
+    def test_every_word_must_match_and_more_points_rank_first(self):
+        self.assertEqual(self.names("connor", 2), ["Connor McDavid", "Connor Bedard"])
+        self.assertEqual(self.names("con mcd", 1), ["Connor McDavid"])
+        self.assertEqual(self.names("mc", 2), ["Connor McDavid", "Ryan McDonagh"])
+
+    def test_team_abbreviations_match(self):
+        self.assertEqual(self.names("tor", 2), ["Auston Matthews", "Mitch Marner"])
+        self.assertEqual(self.names("tor mar", 1), ["Mitch Marner"])
+
+    def test_misspelt_names_are_matched_by_trigrams(self):
+        self.assertEqual(self.names("mcdavd", 1), ["Connor McDavid"])
+        self.assertEqual(self.names("austin mathews", 1), ["Auston Matthews"])
+        self.assertEqual(self.names("xyz"), [])
+
+    def test_saved_index_loads_without_rebuilding(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "index.json")
+            self.index.save(path)
+            loaded = PlayerSearchIndex.load(path)
+            self.assertEqual(loaded.search("stut"), self.index.search("stut"))
+            self.assertEqual(loaded.search("mcdavd", 1), self.index.search("mcdavd", 1))
+
+            search = PlayerSearch(path)
+            self.assertEqual(search.search("mitch", 1)[0].player_id, 5)
+            search.rebuild(PLAYERS[:1])
+            self.assertEqual(PlayerSearchIndex.load(path).search("mitch"), [])
+
+    def test_league_sized_index_answers_a_keystroke_in_milliseconds(self):
+        players = [player(index, f"First{index % 97} Last{index}", "TOR", index % 120) for index in range(1000)]
+        index = PlayerSearchIndex.from_players(players)
+        start = time.perf_counter()
+        for query in ("f", "fi", "first1", "first1 last1", "lsat12"):
+            index.search(query)
+        self.assertLess((time.perf_counter() - start) / 5, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
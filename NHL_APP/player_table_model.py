@@ -0,0 +1,202 @@
+from array import array
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+from shared import PLAYER_STAT_COLUMNS, PlayerStatTable
+
+
+class PlayerStatsModel(QAbstractTableModel):
+    """
+    A read-only table model over a packed `PlayerStatTable`.
+
+    Cells are produced on demand in `data`, so painting costs work only for the visible rows, and the
+    shooting percentage is only formatted for the cells being painted. The model keeps a permutation of
+    storage rows as its view order; sorting recomputes that permutation from the raw numeric or string
+    column and never moves the stored values. The active sort is re-applied when rows are appended, so a
+    sorted view stays sorted while players stream in.
+
+    Players are identified by `PlayerStatLine.key`: their NHL player ID, or their name and team when the ID
+    is not known. `upsert_rows` overwrites the stored statistics of players already shown and signals a
+    change for those rows only, so a refresh repaints just the rows that moved.
+
+    Parameters:
+        parent (QObject, optional): The owner of the model.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = PlayerStatTable()
+        self._keys = {}  # PlayerStatLine.key -> storage row
+        self._order = array('l')
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(PLAYER_STAT_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.store.display_value(self._order[index.row()], index.column())
+        if role == Qt.TextAlignmentRole and index.column() not in PlayerStatTable.TEXT_COLUMNS:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return PLAYER_STAT_COLUMNS[section]
+        return section + 1
+
+    def storage_row(self, row):
+        """
+        Returns the storage row shown at a given view row.
+
+        Parameters:
+            row (int): The row in the model.
+
+        Returns:
+            int: The row in `store`.
+        """
+        return self._order[row]
+
+    def append_rows(self, players):
+        """
+        Appends a batch of player records, keeping the current sort order.
+
+        Parameters:
+            players (list of PlayerStatLine): The players to append.
+        """
+        if not players:
+            return
+        first = len(self._order)
+        self.beginInsertRows(QModelIndex(), first, first + len(players) - 1)
+        for storage_row, player in enumerate(players, first):
+            self._keys[player.key] = storage_row
+        self.store.extend(players)
+        self._order.extend(range(first, first + len(players)))
+        self.endInsertRows()
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def set_rows(self, players):
+        """
+        Replaces every row of the model with the given player records.
+
+        Parameters:
+            players (iterable of PlayerStatLine): The players to show.
+        """
+        self.beginResetModel()
+        self.store.clear()
+        self.store.extend(players)
+        self._keys = {player.key: row for row, player in enumerate(self.store)}
+        self._order = array('l', range(len(self.store)))
+        self.endResetModel()
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def upsert_rows(self, players):
+        """
+        Updates the players already in the model and appends the others.
+
+        Only rows whose values actually changed are reported through `dataChanged`. If the active sort
+        order is affected, the rows are re-sorted instead, keeping selections on the same players.
+
+        Parameters:
+            players (list of PlayerStatLine): The players' current statistics.
+        """
+        changed = []
+        new = []
+        for player in players:
+            storage_row = self._keys.get(player.key)
+            if storage_row is None:
+                new.append(player)
+            elif self.store[storage_row] != player:
+                self.store.set_row(storage_row, player)
+                changed.append(storage_row)
+        if changed:
+            if self._sort_column >= 0 and self.store.sorted_rows(self._sort_column,
+                                                                self._sort_order == Qt.DescendingOrder) != self._order:
+                self.sort(self._sort_column, self._sort_order)
+            else:
+                view_rows = {storage_row: row for row, storage_row in enumerate(self._order)}
+                last_column = self.columnCount() - 1
+                for storage_row in changed:
+                    row = view_rows[storage_row]
+                    self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+        self.append_rows(new)
+
+    def remove_players(self, keys):
+        """
+        Removes players from the model.
+
+        Parameters:
+            keys (iterable): The `PlayerStatLine.key` of each player to remove.
+        """
+        keys = set(keys) & self._keys.keys()
+        if keys:
+            self.set_rows([player for player in self.store if player.key not in keys])
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts the model by one column using the raw stored values.
+
+        Parameters:
+            column (int): The column index to sort by, or -1 to restore storage order.
+            order (Qt.SortOrder): The sort direction.
+        """
+        self.layoutAboutToBeChanged.emit()
+        old_order = self._order
+        if column < 0:
+            self._order = array('l', range(len(self.store)))
+        else:
+            self._order = self.store.sorted_rows(column, order == Qt.DescendingOrder)
+        self._sort_column = column
+        self._sort_order = order
+
+        # Keep selections and the current index on the same players after the rows move
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_rows = {storage_row: row for row, storage_row in enumerate(self._order)}
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(new_rows[old_order[index.row()]], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+
+class PlayerStatsFilterProxy(QSortFilterProxyModel):
+    """
+    Filters a `PlayerStatsModel` by player name or team and forwards sorting to the source model.
+
+    Sorting is delegated so it runs once on the source's raw columns instead of through Qt's generic
+    per-comparison `lessThan`.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+
+    def set_filter_text(self, text):
+        """
+        Shows only players whose name or team contains the given text, ignoring case.
+
+        Parameters:
+            text (str): The text to look for. An empty string shows every player.
+        """
+        self._needle = text.strip().casefold()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._needle:
+            return True
+        model = self.sourceModel()
+        storage_row = model.storage_row(source_row)
+        name = model.store.value(storage_row, 0)
+        team = model.store.value(storage_row, 1)
+        return self._needle in name.casefold() or self._needle in team.casefold()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
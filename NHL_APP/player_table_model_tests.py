@@ -0,0 +1,71 @@
+import unittest
+
+from PyQt5.QtCore import Qt
+
+from player_table_model import PlayerStatsFilterProxy, PlayerStatsModel
+from shared import PlayerStatLine
+
+
+def player(name, team, goals, points, shooting_pctg=0.0):
+    return PlayerStatLine(name, team, 82, goals, points - goals, points, 0, 0, 0, 0, 100, shooting_pctg)
+
+
+class TestPlayerStatsModel(unittest.TestCase):
+    def test_sort_is_kept_while_rows_stream_in(self):
+        model = PlayerStatsModel()
+        model.append_rows([player("A", "TOR", 5, 10), player("B", "MTL", 30, 40)])
+        model.sort(3, Qt.DescendingOrder)
+        model.append_rows([player("C", "BOS", 12, 20)])
+
+        self.assertEqual([model.index(row, 0).data() for row in range(3)], ["B", "C", "A"])
+        self.assertEqual(model.index(0, 3).data(), 30)
+
+    def test_shooting_percentage_is_formatted_only_for_display(self):
+        model = PlayerStatsModel()
+        model.append_rows([player("A", "TOR", 9, 10, 0.09), player("B", "MTL", 10, 10, 0.10)])
+        model.sort(11, Qt.DescendingOrder)
+
+        self.assertEqual(model.index(0, 11).data(), "10.00%")
+        self.assertEqual(model.store.value(model.storage_row(0), 11), 0.10)
+
+    def test_upsert_updates_existing_players_and_reports_only_changed_rows(self):
+        model = PlayerStatsModel()
+        model.append_rows([player("A", "TOR", 5, 10), player("B", "MTL", 30, 40), player("C", "BOS", 12, 20)])
+        changed_rows = []
+        model.dataChanged.connect(lambda top_left, bottom_right: changed_rows.append(top_left.row()))
+
+        model.upsert_rows([player("A", "TOR", 6, 11), player("C", "BOS", 12, 20), player("D", "NYR", 1, 2)])
+
+        self.assertEqual(changed_rows, [0])
+        self.assertEqual(model.rowCount(), 4)
+        self.assertEqual(model.index(0, 3).data(), 6)
+
+        model.remove_players([("B", "MTL")])
+        self.assertEqual([model.index(row, 0).data() for row in range(3)], ["A", "C", "D"])
+
+    def test_upsert_resorts_when_the_order_changes(self):
+        model = PlayerStatsModel()
+        model.append_rows([player("A", "TOR", 5, 10), player("B", "MTL", 30, 40)])
+        model.sort(5, Qt.DescendingOrder)
+
+        model.upsert_rows([player("A", "TOR", 40, 50)])
+
+        self.assertEqual([model.index(row, 0).data() for row in range(2)], ["A", "B"])
+
+    def test_proxy_filters_on_name_or_team(self):
+        model = PlayerStatsModel()
+        proxy = PlayerStatsFilterProxy()
+        proxy.setSourceModel(model)
+        model.append_rows([player("Auston Matthews", "TOR", 69, 107), player("Cole Caufield", "MTL", 28, 65)])
+
+        proxy.set_filter_text("mtl")
+        self.assertEqual(proxy.rowCount(), 1)
+        self.assertEqual(proxy.index(0, 0).data(), "Cole Caufield")
+
+        proxy.set_filter_text("")
+        proxy.sort(3, Qt.AscendingOrder)
+        self.assertEqual(proxy.index(0, 0).data(), "Cole Caufield")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import os
+from datetime import datetime, timezone
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from async_runtime import run_in_background, runtime
+from player_search import player_search
+from shared import fetch_top_players
+from stats_warehouse import stats_warehouse, warehouse_sync
+from team_stats import standings_service
+
+# Seconds between refreshes while games are being played, and outside those hours
+GAME_HOURS_INTERVAL = int(os.environ.get("NHL_GAME_REFRESH_INTERVAL", 5 * 60))
+IDLE_INTERVAL = int(os.environ.get("NHL_REFRESH_INTERVAL", 60 * 60))
+# Hours in UTC during which NHL games are usually on: from the first matinee to the last west coast game
+GAME_HOURS_UTC = (16, 7)
+
+
+def in_game_hours(now=None, game_hours=GAME_HOURS_UTC):
+    """
+    Returns True if the given time falls inside the game hours.
+
+    Parameters:
+        now (datetime, optional): The time to check. Defaults to the current time.
+        game_hours (tuple of int): The first and the end hour in UTC. The range may wrap past midnight.
+
+    Returns:
+        bool: Whether games are likely being played.
+    """
+    hour = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).hour
+    start, end = game_hours
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def player_changes(before, after):
+    """
+    Compares two lists of player statistics, either skaters or goalies.
+
+    Parameters:
+        before (list of PlayerStatLine or GoalieStatLine): The players as they were.
+        after (list of PlayerStatLine or GoalieStatLine): The players as they are now.
+
+    Returns:
+        tuple: The players that are new or whose statistics changed, and the keys (see
+        `PlayerStatLine.key`) of the players that are gone.
+    """
+    old = {player.key: player for player in before}
+    new = {player.key: player for player in after}
+    changed = [player for key, player in new.items() if old.get(key) != player]
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+class RefreshScheduler(QObject):
+    """
+    Warms and periodically refreshes the data behind the home screen and the stats dialogs.
+
+    Each refresh cycle runs on the shared async runtime: it fetches the standings and the points leaders
+    and brings the stats warehouse up to date, which only fetches the players of teams that played, and
+    rebuilds the player search index when players changed. The first cycle starts as soon as `start` is
+    called, so the data is usually cached by the time the user has logged in. Cycles repeat every
+    `game_hours_interval` seconds during game hours and every `idle_interval` seconds otherwise.
+
+    Views subscribe to the signals, which are emitted on the GUI thread and only when something changed.
+
+    Signals:
+        standings_updated (object): Emitted with the new `StandingsSnapshot`.
+        leaders_updated (list): Emitted with the new top players, shaped like `top_3_players`.
+        players_updated (list, list): Emitted with the players that are new or changed, and the
+            keys of the players no longer on a roster.
+        goalies_updated (list, list): Emitted with the goalies that are new or changed, and the keys
+            of the goalies no longer on a roster.
+        failed (str): Emitted with an error message when part of a cycle fails.
+
+    Parameters:
+        game_hours_interval (int): Seconds between cycles during game hours.
+        idle_interval (int): Seconds between cycles outside game hours.
+        parent (QObject, optional): The owner of the scheduler.
+    """
+    standings_updated = pyqtSignal(object)
+    leaders_updated = pyqtSignal(list)
+    players_updated = pyqtSignal(list, list)
+    goalies_updated = pyqtSignal(list, list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, game_hours_interval=GAME_HOURS_INTERVAL, idle_interval=IDLE_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.game_hours_interval = game_hours_interval
+        self.idle_interval = idle_interval
+        self.standings = None
+        self.leaders = None
+        self.cycle = None  # The future of the cycle in progress
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.refresh_now)
+
+    def current_interval(self):
+        """
+        Returns the number of seconds until the next cycle.
+        """
+        return self.game_hours_interval if in_game_hours() else self.idle_interval
+
+    def start(self):
+        """
+        Starts the first cycle right away and keeps refreshing until `stop` is called.
+        """
+        self.refresh_now()
+
+    def stop(self):
+        """
+        Stops refreshing and cancels a cycle in progress.
+        """
+        self.timer.stop()
+        if self.cycle is not None:
+            self.cycle.cancel()
+            self.cycle = None
+
+    def refresh_now(self):
+        """
+        Starts a cycle immediately, unless one is already running.
+        """
+        if self.cycle is not None:
+            return
+        self.timer.stop()
+        self.cycle = run_in_background(self.refresh_cycle(), self._on_cycle_done, self._on_cycle_failed, self).future
+
+    async def refresh_cycle(self):
+        """
+        Asynchronously refreshes the standings, the leaders and the stats warehouse.
+
+        Returns:
+            dict: The new standings snapshot, top players, player changes and goalie changes, under the keys
+            'standings', 'leaders', 'players' and 'goalies'. A part that failed is left out, and its error is
+            listed under 'errors'.
+        """
+        scheduler = runtime.scheduler
+        results = {'errors': []}
+        try:
+            standings_service.invalidate()
+            snapshot = await standings_service.snapshot(scheduler)
+            stats_warehouse.record_standings(snapshot)
+            results['standings'] = snapshot
+        except Exception as error:
+            results['errors'].append(f"Standings: {error}")
+        try:
+            results['leaders'] = await fetch_top_players(scheduler)
+        except Exception as error:
+            results['errors'].append(f"Leaders: {error}")
+        try:
+            before = stats_warehouse.player_stat_lines()
+            goalies_before = stats_warehouse.goalie_stat_lines()
+            report = await warehouse_sync.sync(scheduler)
+            if report.results:
+                after = stats_warehouse.player_stat_lines()
+                changed, removed = results['players'] = player_changes(before, after)
+                if changed or removed:
+                    player_search.rebuild(after)
+                results['goalies'] = player_changes(goalies_before, stats_warehouse.goalie_stat_lines())
+            if report.failures:
+                results['errors'].append(f"Players: {len(report.failures)} requests failed")
+        except Exception as error:
+            results['errors'].append(f"Players: {error}")
+        return results
+
+    def _on_cycle_done(self, results):
+        self.cycle = None
+        snapshot = results.get('standings')
+        if snapshot is not None and (self.standings is None or snapshot.rows() != self.standings.rows()):
+            self.standings = snapshot
+            self.standings_updated.emit(snapshot)
+        leaders = results.get('leaders')
+        if leaders and leaders != self.leaders:
+            self.leaders = leaders
+            self.leaders_updated.emit(leaders)
+        changed, removed = results.get('players', ([], []))
+        if changed or removed:
+            self.players_updated.emit(changed, removed)
+        changed, removed = results.get('goalies', ([], []))
+        if changed or removed:
+            self.goalies_updated.emit(changed, removed)
+        for message in results['errors']:
+            self.failed.emit(message)
+        self.timer.start(self.current_interval() * 1000)
+
+    def _on_cycle_failed(self, error):
+        self.cycle = None
+        self.failed.emit(str(error))
+        self.timer.start(self.current_interval() * 1000)
+
+
+_refresh_scheduler = None
+
+def refresh_scheduler():
+    """
+    Returns the app-wide `RefreshScheduler`, creating it on first use.
+
+    Returns:
+        RefreshScheduler: The shared scheduler. It is not started until `start` is called.
+    """
+    global _refresh_scheduler
+    if _refresh_scheduler is None:
+        _refresh_scheduler = RefreshScheduler()
+    return _refresh_scheduler
@@ -0,0 +1,41 @@
+import unittest
+from datetime import datetime, timezone
+
+from refresh_scheduler import in_game_hours, player_changes
+from shared import PlayerStatLine
+
+
+def player(name, team, points):
+    return PlayerStatLine(name, team, 82, points, 0, points, 0, 0, 0, 0, 100, 0.1)
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    def test_game_hours_wrap_past_midnight(self):
+        at = lambda hour: datetime(2024, 1, 15, hour, tzinfo=timezone.utc)
+
+        self.assertTrue(in_game_hours(at(23), (16, 7)))
+        self.assertTrue(in_game_hours(at(3), (16, 7)))
+        self.assertFalse(in_game_hours(at(12), (16, 7)))
+        self.assertTrue(in_game_hours(at(12), (9, 17)))
+
+    def test_player_changes_lists_only_changed_new_and_removed_players(self):
+        before = [player("A", "TOR", 10), player("B", "MTL", 20), player("C", "BOS", 30)]
+        after = [player("A", "TOR", 11), player("B", "MTL", 20), player("C", "NYR", 30)]
+
+        changed, removed = player_changes(before, after)
+
+        self.assertEqual(changed, [player("A", "TOR", 11), player("C", "NYR", 30)])
+        self.assertEqual(removed, [("C", "BOS")])
+
+    def test_player_changes_tells_namesakes_apart_by_player_id(self):
+        first = player("Elias Pettersson", "VAN", 60)._replace(player_id=8480012)
+        second = player("Elias Pettersson", "VAN", 5)._replace(player_id=8483678)
+
+        changed, removed = player_changes([first], [first, second._replace(points=6)])
+
+        self.assertEqual(changed, [second._replace(points=6)])
+        self.assertEqual(removed, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,121 @@
-import requests
 from datetime import date
+from array import array
+from collections import namedtuple
 import asyncio
+import os
+import sys
+from urllib.parse import urlencode
 import aiohttp
+from api_cache import api_cache
+from fetch_scheduler import FetchScheduler, FetchReport
+from instrumentation import span
 
-today = date.today()
+SEASON_START_MONTH = 10  # Regular seasons start in October; until then the previous season is the latest
 
-def top_3_players():
+def season_for_date(day):
     """
-    Fetches and returns the top 3 NHL players based on points for the current season.
+    Returns the ID of the latest season that had started by a given date.
+
+    Parameters:
+        day (date): The date.
+
+    Returns:
+        int: The eight-digit season ID, e.g. 20232024 for both 2024-03-01 and 2024-08-01.
+    """
+    year = day.year if day.month >= SEASON_START_MONTH else day.year - 1
+    return year * 10000 + year + 1
+
+# Season whose statistics are shown, as the API's eight-digit season ID. NHL_SEASON overrides it.
+CURRENT_SEASON = int(os.environ.get("NHL_SEASON") or season_for_date(date.today()))
+
+# A goalie's start is a quality start at this save percentage, or at the lower one on a light workload
+QUALITY_START_SAVE_PCTG = 0.913
+QUALITY_START_LIGHT_SAVE_PCTG = 0.885
+QUALITY_START_LIGHT_SHOTS = 20
+
+# The only members of a player landing page the statistics are read from; the rest of the page
+# (career totals, last five games, season-by-season totals, the team's roster) is never decoded
+LANDING_FIELDS = ('playerId', 'firstName', 'lastName', 'currentTeamAbbrev', 'featuredStats')
+
+# Root of every NHL API request. Point it at a local stand-in (see nhl_api_standin.py) to run offline.
+DEFAULT_API_BASE_URL = "https://api-web.nhle.com"
+API_BASE_URL = os.environ.get("NHL_API_BASE_URL", DEFAULT_API_BASE_URL)
+
+# Root of the NHL stats REST API, which serves league-wide, paginated stat reports. A stand-in serves it
+# from the same host as the web API, under /stats/rest/en.
+DEFAULT_STATS_API_BASE_URL = "https://api.nhle.com/stats/rest/en"
+
+def default_stats_api_base_url(base_url):
+    """
+    Returns the stats REST API root that goes with a web API root.
+    """
+    return DEFAULT_STATS_API_BASE_URL if base_url == DEFAULT_API_BASE_URL else base_url + "/stats/rest/en"
+
+STATS_API_BASE_URL = os.environ.get("NHL_STATS_API_BASE_URL", default_stats_api_base_url(API_BASE_URL))
+BULK_PAGE_SIZE = 100  # Rows requested per page of a stats report
+
+def set_api_base_url(base_url, stats_base_url=None):
+    """
+    Changes the root URLs used for every NHL API request made after this call.
+
+    Parameters:
+        base_url (str): The scheme and host of the API, e.g. 'http://127.0.0.1:8765'.
+        stats_base_url (str, optional): The root of the stats REST API. Defaults to the live stats API for
+            the live web API, and to `base_url` + '/stats/rest/en' for anything else.
+    """
+    global API_BASE_URL, STATS_API_BASE_URL
+    API_BASE_URL = base_url.rstrip('/')
+    STATS_API_BASE_URL = (stats_base_url or default_stats_api_base_url(API_BASE_URL)).rstrip('/')
+
+def api_url(path):
+    """
+    Builds the full URL of an NHL API endpoint from its path.
+
+    Parameters:
+        path (str): The endpoint path, starting with '/v1/'.
+
+    Returns:
+        str: The URL under the configured `API_BASE_URL`.
+    """
+    return API_BASE_URL + path
+
+def stats_api_url(path, query):
+    """
+    Builds the full URL of an NHL stats REST API report.
+
+    Parameters:
+        path (str): The report path, e.g. '/skater/summary'.
+        query (dict): The query parameters.
+
+    Returns:
+        str: The URL under the configured `STATS_API_BASE_URL`.
+    """
+    return f"{STATS_API_BASE_URL}{path}?{urlencode(query)}"
+
+def is_completed_season(season):
+    """
+    Returns True if a season is over, so its statistics will never change again.
+
+    Responses for completed seasons are requested as immutable: they are downloaded once and then served
+    from the cache for good.
+    """
+    return season < CURRENT_SEASON
+
+def previous_season(season):
+    """
+    Returns the ID of the season before the given one, e.g. 20222023 for 20232024.
+    """
+    return season - 10001
+
+def season_label(season):
+    """
+    Returns a season ID in the form shown to users, e.g. '2023-24' for 20232024.
+    """
+    return f"{season // 10000}-{season % 100:02d}"
+
+def top_3_players(season=CURRENT_SEASON):
+    """
+    Fetches and returns the top 3 NHL players based on points for a season, the current one by default.
 
     This function makes a GET request to the NHL API to retrieve the top 3 players in terms of points.
     It parses the JSON response to extract each player's first name, last name, total points, and picture URL.
@@ -20,12 +128,55 @@ def top_3_players():
             'Points' is a string representing the total points scored by the player.
             'Picture' is a URL to the player's headshot image.
 
+    Parameters:
+        season (int): The season ID.
+
     Note:
         This function assumes that the NHL API's response structure for the endpoint used remains consistent.
         It does not handle API errors or unexpected response structures gracefully.
     """
-    url = 'https://api-web.nhle.com/v1/skater-stats-leaders/20232024/2?categories=points&limit=3'
-    r= requests.get(url).json()
+    response = api_cache.get(leaders_url(season=season), immutable=is_completed_season(season))
+    return parse_top_players(response.json())
+
+def leaders_url(limit=3, season=CURRENT_SEASON):
+    """
+    Returns the URL of a season's regular season points leaders.
+
+    Parameters:
+        limit (int): The number of leaders requested.
+        season (int): The season ID.
+
+    Returns:
+        str: The leaders endpoint URL.
+    """
+    return api_url(f'/v1/skater-stats-leaders/{season}/2?categories=points&limit={limit}')
+
+async def fetch_top_players(scheduler, season=CURRENT_SEASON):
+    """
+    Asynchronously fetches the top 3 NHL players based on points, in the shape returned by `top_3_players`.
+
+    Parameters:
+        scheduler (FetchScheduler): The scheduler used to make the HTTP request.
+        season (int): The season ID.
+
+    Returns:
+        list of dict: The players, or an empty list if the request fails.
+    """
+    response = await scheduler.get(leaders_url(season=season), immutable=is_completed_season(season))
+    if response.status != 200:
+        return []
+    return parse_top_players(response.json())
+
+def parse_top_players(r):
+    """
+    Extracts each leader's name, points and picture from a decoded leaders response.
+
+    Parameters:
+        r (dict): The decoded `/v1/skater-stats-leaders` response.
+
+    Returns:
+        list of dict: One dictionary per player with the 'Player', 'Points' and 'Picture' keys.
+    """
     top_3_playersl = []
     if 'points' in r:
         for player in r['points']:
@@ -80,89 +231,447 @@ nhl_team_abbreviations = [
 
 
 
-async def fetch_team_rosters(session, abbreviation):
+async def fetch_team_rosters(scheduler, abbreviation, revalidate=False):
     """
     Asynchronously fetches the roster for a given NHL team using its abbreviation.
 
-    This function makes an asynchronous GET request to the NHL API to retrieve the current roster
-    of a specified team. It extracts and returns the player IDs for all forwards on the team.
+    This function makes an asynchronous GET request to the NHL API, through the fetch scheduler and the
+    shared on-disk cache, to retrieve the current roster of a specified team. It extracts and returns the player IDs for all skaters on the team.
 
     Parameters:
-        session (aiohttp.ClientSession): The session used to make the HTTP request.
+        scheduler (FetchScheduler): The scheduler used to make the HTTP request.
         abbreviation (str): The abbreviation of the NHL team for which the roster is requested.
+        revalidate (bool): If True, a cached roster is revalidated with the API even if it is still fresh.
 
     Returns:
-        list: A list of player IDs for the forwards on the team's current roster. Returns an empty
-        list if the request fails or if the team has no forwards listed in the response.
+        list: A list of player IDs for the forwards and defensemen on the team's current roster. Returns an
+        empty list if the request fails or if the team has no skaters listed in the response.
 
     Note:
-        This function specifically targets the 'forwards' section of the roster in the API response.
-        It does not return information about defensemen or goaltenders.
-    """
-    url = f"https://api-web.nhle.com/v1/roster/{abbreviation}/current"
-    async with session.get(url) as response:
-        if response.status == 200:
-            roster_data = await response.json()
-            forwards = [player.get("id") for player in roster_data.get('forwards', [])]
-            defensemen = [player.get("id") for player in roster_data.get('defensemen', [])]
-            return forwards + defensemen
-        else:
-            return [], []
+        Goaltenders are left out; use `fetch_team_roster_groups` to get them from the same request.
+    """
+    skaters, _ = await fetch_team_roster_groups(scheduler, abbreviation, revalidate)
+    return skaters
+
+
+async def fetch_team_roster_groups(scheduler, abbreviation, revalidate=False):
+    """
+    Asynchronously fetches a team's roster and splits its player IDs into skaters and goalies.
+
+    One roster request serves both groups, so the skater and goalie pipelines can start from the same
+    response.
 
+    Parameters:
+        scheduler (FetchScheduler): The scheduler used to make the HTTP request.
+        abbreviation (str): The abbreviation of the NHL team.
+        revalidate (bool): If True, a cached roster is revalidated with the API even if it is still fresh.
 
-async def fetch_player_stats(session, player_id):
+    Returns:
+        tuple: The IDs of the forwards and defensemen, and the IDs of the goalies. Both lists are empty if
+        the request fails.
+    """
+    url = api_url(f"/v1/roster/{abbreviation}/current")
+    response = await scheduler.get(url, revalidate=revalidate)
+    if response.status == 200:
+        roster_data = response.json()
+        forwards = [player.get("id") for player in roster_data.get('forwards', [])]
+        defensemen = [player.get("id") for player in roster_data.get('defensemen', [])]
+        goalies = [player.get("id") for player in roster_data.get('goalies', [])]
+        return forwards + defensemen, goalies
+    else:
+        return [], []
+
+
+async def fetch_player_stats(scheduler, player_id, revalidate=False):
     """
     Asynchronously fetches and processes the statistics for a specific NHL player by their ID.
 
-    This function makes an asynchronous GET request to the NHL API to retrieve detailed statistics
-    for a player specified by their unique player ID. It then extracts and formats these statistics
-    using the `extract_player_stats` function.
+    This function makes an asynchronous GET request to the NHL API, through the fetch scheduler and the
+    shared on-disk cache, to retrieve detailed statistics for a player specified by their unique player ID. It then extracts and formats these statistics
+    using the `extract_player_stats` function. Only the `LANDING_FIELDS` of the landing page are decoded.
 
     Parameters:
-        session (aiohttp.ClientSession): The session used to make the HTTP request.
+        scheduler (FetchScheduler): The scheduler used to make the HTTP request.
         player_id (str): The unique identifier for the player whose statistics are being requested.
+        revalidate (bool): If True, a cached landing page is revalidated with the API even if it is still fresh.
 
     Returns:
-        dict: A dictionary containing the formatted player statistics if the request is successful.
-              If the request fails or the player is not found, it returns a dictionary with the
-              player's name set to "No player found" and an empty "Stats" dictionary.
+        PlayerStatLine or None: The player's statistics if the request is successful, or None if the
+        request fails or the player is not found.
 
     Note:
-        The function returns immediately with a default response if the HTTP status code of the
-        response is not 200, indicating a successful request.
+        The function returns immediately with None if the HTTP status code of the response is not 200,
+        indicating a successful request.
     """
-    url = f"https://api-web.nhle.com/v1/player/{player_id}/landing"
-    async with session.get(url) as r:
-        if r.status == 200:
-            player_data = await r.json()
+    url = api_url(f"/v1/player/{player_id}/landing")
+    r = await scheduler.get(url, revalidate=revalidate)
+    if r.status == 200:
+        with span("extract_player_stats", "parse", player_id=player_id, bytes=len(r.body)):
+            player_data = r.fields(LANDING_FIELDS)
             return extract_player_stats(player_data)
-        else:
-            return {"Name": "No player found", "Stats": {}}
+    else:
+        return None
+
+
+async def fetch_goalie_stats(scheduler, player_id, revalidate=False, season=CURRENT_SEASON):
+    """
+    Asynchronously fetches and processes the statistics for a specific NHL goalie by their ID.
+
+    The landing page and the regular season game log are requested concurrently: the landing page holds
+    the season totals, and the game log is needed to count quality starts. A goalie therefore costs two
+    requests but no extra round trip.
+
+    Parameters:
+        scheduler (FetchScheduler): The scheduler used to make the HTTP requests.
+        player_id (int): The unique identifier of the goalie.
+        revalidate (bool): If True, cached copies are revalidated with the API even if they are still fresh.
+        season (int): The season ID of the game log.
+
+    Returns:
+        GoalieStatLine or None: The goalie's statistics, or None if the landing page could not be fetched.
+        If only the game log failed, the quality starts are None.
+    """
+    landing, game_log = await asyncio.gather(
+        scheduler.get(api_url(f"/v1/player/{player_id}/landing"), revalidate=revalidate),
+        scheduler.get(api_url(f"/v1/player/{player_id}/game-log/{season}/2"), revalidate=revalidate,
+                      immutable=is_completed_season(season)),
+        return_exceptions=True)
+    if isinstance(landing, BaseException):
+        raise landing
+    if landing.status != 200:
+        return None
+    with span("extract_goalie_stats", "parse", player_id=player_id, bytes=len(landing.body)):
+        line = extract_goalie_stats(landing.fields(LANDING_FIELDS))
+        if not isinstance(game_log, BaseException) and game_log.status == 200:
+            line = line._replace(quality_starts=count_quality_starts(game_log.json().get('gameLog', [])))
+        return line
+
+
+async def fetch_stats_report(scheduler, report, season=CURRENT_SEASON, revalidate=False):
+    """
+    Asynchronously fetches every row of a league-wide stats REST API report for a regular season.
+
+    The first page tells how many rows there are; the remaining pages are then requested concurrently.
+    Rows are ordered by player ID so the pages neither overlap nor skip players. The pages of a completed
+    season are cached for good.
+
+    Parameters:
+        scheduler (FetchScheduler): The scheduler used to make the HTTP requests.
+        report (str): The report path, e.g. '/skater/summary' or '/goalie/advanced'.
+        season (int): The season ID.
+        revalidate (bool): If True, cached pages are revalidated with the API even if they are still fresh.
+
+    Returns:
+        list of dict or None: The rows of the report, or None if any page could not be fetched.
+    """
+    def page(start):
+        return stats_api_url(report, {
+            "isAggregate": "false", "isGame": "false", "start": start, "limit": BULK_PAGE_SIZE,
+            "sort": '[{"property":"playerId","direction":"ASC"}]',
+            "cayenneExp": f"gameTypeId=2 and seasonId={season}",
+        })
+
+    immutable = is_completed_season(season)
+    first = await scheduler.get(page(0), revalidate=revalidate, immutable=immutable)
+    if first.status != 200:
+        return None
+    with span("parse_stats_report", "parse", report=report, bytes=len(first.body)):
+        document = first.json()
+    rows = document.get('data', [])
+    total = document.get('total', len(rows))
+    responses = await asyncio.gather(*(scheduler.get(page(start), revalidate=revalidate, immutable=immutable)
+                                       for start in range(BULK_PAGE_SIZE, total, BULK_PAGE_SIZE)))
+    for response in responses:
+        if response.status != 200:
+            return None
+        with span("parse_stats_report", "parse", report=report, bytes=len(response.body)):
+            rows.extend(response.json().get('data', []))
+    return rows
+
+
+async def fetch_bulk_skater_stats(scheduler, season=CURRENT_SEASON, revalidate=False):
+    """
+    Asynchronously fetches the season statistics of every skater in the league from the skater summary report.
+
+    This replaces one landing page request per skater with a handful of paginated requests.
+
+    Parameters:
+        scheduler (FetchScheduler): The scheduler used to make the HTTP requests.
+        season (int): The season ID.
+        revalidate (bool): If True, cached pages are revalidated with the API even if they are still fresh.
+
+    Returns:
+        dict or None: `PlayerStatLine` records keyed by player ID, or None if the report could not be fetched.
+        Skaters who have not played this season are not in the report.
+    """
+    rows = await fetch_stats_report(scheduler, '/skater/summary', season, revalidate)
+    if rows is None:
+        return None
+    return {row['playerId']: skater_line_from_summary(row) for row in rows}
+
+
+async def fetch_bulk_goalie_stats(scheduler, season=CURRENT_SEASON, revalidate=False):
+    """
+    Asynchronously fetches the season statistics of every goalie in the league from the goalie reports.
+
+    The summary report holds the record, goals against average and save percentage, and the advanced
+    report holds the quality starts; both are fetched concurrently.
+
+    Parameters:
+        scheduler (FetchScheduler): The scheduler used to make the HTTP requests.
+        season (int): The season ID.
+        revalidate (bool): If True, cached pages are revalidated with the API even if they are still fresh.
+
+    Returns:
+        dict or None: `GoalieStatLine` records keyed by player ID, or None if the summary report could not
+        be fetched. If only the advanced report failed, the quality starts are None.
+    """
+    summary, advanced = await asyncio.gather(
+        fetch_stats_report(scheduler, '/goalie/summary', season, revalidate),
+        fetch_stats_report(scheduler, '/goalie/advanced', season, revalidate),
+        return_exceptions=True)
+    if isinstance(summary, BaseException):
+        raise summary
+    if summary is None:
+        return None
+    quality_starts = {} if isinstance(advanced, BaseException) or advanced is None else {
+        row['playerId']: row.get('qualityStart') for row in advanced}
+    return {row['playerId']: goalie_line_from_summary(row, quality_starts.get(row['playerId'])) for row in summary}
+
+# Column headers shown for a player, in the order of the `PlayerStatLine` fields
+PLAYER_STAT_COLUMNS = [
+    "Name", "Team", "Games Played", "Goals", "Assists", "Points", "Plus Minus", "Pim",
+    "Game Winning Goals", "OT Goals", "Shots", "Shooting Percentage",
+]
+
+class PlayerStatLine(namedtuple('PlayerStatLine', [
+        'name', 'team', 'games_played', 'goals', 'assists', 'points', 'plus_minus', 'pim',
+        'game_winning_goals', 'ot_goals', 'shots', 'shooting_pctg', 'player_id'], defaults=(None,))):
+    """
+    One player's regular season statistics, with every stat kept as a number.
+
+    The shooting percentage is stored as a fraction (0.1333 for 13.33%) so it can be sorted and
+    aggregated; it is only formatted as text for display, by `display_values` or `as_dict`. The
+    player's NHL ID is not displayed; it identifies the player when statistics are refreshed.
+    """
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """
+        The player's NHL ID, or their name and team when the ID is not known.
+        """
+        return self.player_id if self.player_id is not None else (self.name, self.team)
+
+    def display_values(self):
+        """
+        Returns the values to show for this player, in `PLAYER_STAT_COLUMNS` order.
+
+        Returns:
+            list: The stats, with the shooting percentage formatted by `format_shooting_percentage`.
+        """
+        return list(self[:11]) + [format_shooting_percentage(self.shooting_pctg)]
+
+    def as_dict(self):
+        """
+        Returns this player's statistics as a dictionary keyed by the `PLAYER_STAT_COLUMNS` headers.
+
+        Returns:
+            dict: The display values keyed by column header.
+        """
+        return dict(zip(PLAYER_STAT_COLUMNS, self.display_values()))
+
+# Column headers shown for a goalie, in the order of the `GoalieStatLine` fields
+GOALIE_STAT_COLUMNS = [
+    "Name", "Team", "Games Played", "Wins", "Losses", "OT Losses", "Shutouts", "Goals Against Average",
+    "Save Percentage", "Quality Starts",
+]
+
+class GoalieStatLine(namedtuple('GoalieStatLine', [
+        'name', 'team', 'games_played', 'wins', 'losses', 'ot_losses', 'shutouts', 'goals_against_avg',
+        'save_pctg', 'quality_starts', 'player_id'], defaults=(None, None))):
+    """
+    One goalie's regular season statistics, with every stat kept as a number.
+
+    The save percentage is stored as a fraction (0.915) and the goals against average as goals per
+    game; both are only formatted for display. The quality starts are None when the goalie's game log
+    could not be fetched.
+    """
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """
+        The goalie's NHL ID, or their name and team when the ID is not known.
+        """
+        return self.player_id if self.player_id is not None else (self.name, self.team)
+
+    def display_values(self):
+        """
+        Returns the values to show for this goalie, in `GOALIE_STAT_COLUMNS` order.
+
+        Returns:
+            list: The stats, with the goals against average to two decimals, the save percentage in the
+            usual .915 form and unknown quality starts as a dash.
+        """
+        return list(self[:7]) + [
+            "{:.2f}".format(self.goals_against_avg),
+            "{:.3f}".format(self.save_pctg).lstrip("0"),
+            "-" if self.quality_starts is None else self.quality_starts,
+        ]
+
+    def as_dict(self):
+        """
+        Returns this goalie's statistics as a dictionary keyed by the `GOALIE_STAT_COLUMNS` headers.
+        """
+        return dict(zip(GOALIE_STAT_COLUMNS, self.display_values()))
+
+class PlayerStatTable:
+    """
+    A packed, column-oriented collection of `PlayerStatLine` records for the whole league.
+
+    Names and team abbreviations are kept as lists of interned strings, integer stats as `array('q')`
+    columns and the shooting percentage as an `array('d')` column, so the league costs a dozen containers
+    instead of one object per player per stat. Column indices follow `PLAYER_STAT_COLUMNS`; a last,
+    undisplayed column holds the player IDs, with 0 standing for an unknown ID.
+
+    Parameters:
+        records (iterable of PlayerStatLine, optional): The players to start with.
+    """
+    TEXT_COLUMNS = (0, 1)
+    FLOAT_COLUMNS = (11,)
+    ID_COLUMN = 12
+
+    def __init__(self, records=()):
+        self.columns = self._empty_columns()
+        self.extend(records)
+
+    @staticmethod
+    def _empty_columns():
+        return [[], []] + [array('q') for _ in range(9)] + [array('d'), array('q')]
+
+    @staticmethod
+    def _record(values):
+        return PlayerStatLine(*values[:12], values[12] or None)
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, row):
+        return self._record([column[row] for column in self.columns])
+
+    def __iter__(self):
+        return (self._record(values) for values in zip(*self.columns))
+
+    def extend(self, records):
+        """
+        Appends records to the end of the table.
+
+        Parameters:
+            records (iterable of PlayerStatLine): The players to append.
+        """
+        for record in records:
+            self.append(record)
+
+    def append(self, record):
+        """
+        Appends one record to the end of the table.
+
+        Parameters:
+            record (PlayerStatLine): The player to append.
+        """
+        columns = self.columns
+        columns[0].append(sys.intern(record[0] or ""))
+        columns[1].append(sys.intern(record[1] or ""))
+        for col in range(2, 11):
+            columns[col].append(int(record[col] or 0))
+        columns[11].append(float(record[11] or 0.0))
+        columns[12].append(record.player_id or 0)
+
+    def set_row(self, row, record):
+        """
+        Overwrites one row of the table in place.
+
+        Parameters:
+            row (int): The row in the table.
+            record (PlayerStatLine): The player's new statistics.
+        """
+        columns = self.columns
+        columns[0][row] = sys.intern(record[0] or "")
+        columns[1][row] = sys.intern(record[1] or "")
+        for col in range(2, 11):
+            columns[col][row] = int(record[col] or 0)
+        columns[11][row] = float(record[11] or 0.0)
+        columns[12][row] = record.player_id or 0
+
+    def clear(self):
+        """
+        Removes every player from the table.
+        """
+        self.columns = self._empty_columns()
+
+    def value(self, row, column):
+        """
+        Returns the raw value stored at a row and column.
+
+        Parameters:
+            row (int): The row in the table.
+            column (int): The column index, following `PLAYER_STAT_COLUMNS`.
+
+        Returns:
+            str, int or float: The stored value.
+        """
+        return self.columns[column][row]
+
+    def display_value(self, row, column):
+        """
+        Returns the value to show at a row and column, formatting the shooting percentage.
+
+        Parameters:
+            row (int): The row in the table.
+            column (int): The column index, following `PLAYER_STAT_COLUMNS`.
+
+        Returns:
+            str or int: The display value.
+        """
+        if column == 11:
+            return format_shooting_percentage(self.columns[11][row])
+        return self.columns[column][row]
+
+    def sorted_rows(self, column, descending=False):
+        """
+        Returns the rows ordered by the raw values of one column.
+
+        Parameters:
+            column (int): The column index to sort by.
+            descending (bool): Whether to put the largest values first.
+
+        Returns:
+            array: The row indices in sorted order. Ties keep their table order.
+        """
+        return array('l', sorted(range(len(self)), key=self.columns[column].__getitem__, reverse=descending))
 
 def extract_player_stats(player_data):
     """
-    Extracts and formats player statistics from the provided player data.
+    Extracts player statistics from the provided player data.
 
     This function parses the player data dictionary to extract the player's first and last name,
     team abbreviation, and various statistics for the regular season. These statistics include
     games played, goals, assists, total points, plus-minus rating, penalty minutes (PIM),
-    game-winning goals, overtime goals, total shots, and shooting percentage. The shooting
-    percentage is formatted to a string with two decimal places.
+    game-winning goals, overtime goals, total shots, and shooting percentage.
 
     Parameters:
         player_data (dict): A dictionary containing detailed information about a player,
                             including their name, team, and statistics.
 
     Returns:
-        dict: A dictionary containing the player's name, team, and formatted statistics.
-              The keys include "Name", "Team", "Games Played", "Goals", "Assists", "Points",
-              "Plus Minus", "Pim", "Game Winning Goals", "OT Goals", "Shots", and
-              "Shooting Percentage".
+        PlayerStatLine: The player's name, team, and numeric statistics. Use `as_dict` or
+        `display_values` for the formatted values shown in tables.
 
     Note:
         - The function assumes that the input dictionary contains all the necessary keys.
         - If certain statistics are not available, they are defaulted to 0.
-        - The shooting percentage is calculated as a percentage and formatted as a string.
+        - The shooting percentage is kept as a fraction and only formatted for display.
     """
     player_fname = player_data.get('firstName').get('default')
     player_lname = player_data.get('lastName').get('default')
@@ -170,20 +679,131 @@ def extract_player_stats(player_data):
     featured_stats = player_data.get('featuredStats', {})
     regular_season_stats = featured_stats.get('regularSeason', {})
     player_stats = regular_season_stats.get('subSeason', {})
-    return {
-        "Name": f"{player_fname} {player_lname}",
-        "Team": team,
-        "Games Played": player_stats.get('gamesPlayed', 0),
-        "Goals": player_stats.get('goals', 0),
-        "Assists": player_stats.get('assists', 0),
-        "Points": player_stats.get('points', 0),
-        "Plus Minus": player_stats.get('plusMinus', 0),
-        "Pim": player_stats.get('pim', 0),
-        "Game Winning Goals": player_stats.get('gameWinningGoals', 0),
-        "OT Goals": player_stats.get('otGoals' , 0),
-        "Shots": player_stats.get('shots', 0),
-        "Shooting Percentage": format_shooting_percentage(player_stats.get('shootingPctg'))
-    }
+    return PlayerStatLine(
+        f"{player_fname} {player_lname}",
+        team or "",
+        player_stats.get('gamesPlayed', 0),
+        player_stats.get('goals', 0),
+        player_stats.get('assists', 0),
+        player_stats.get('points', 0),
+        player_stats.get('plusMinus', 0),
+        player_stats.get('pim', 0),
+        player_stats.get('gameWinningGoals', 0),
+        player_stats.get('otGoals', 0),
+        player_stats.get('shots', 0),
+        player_stats.get('shootingPctg') or 0.0,
+        player_data.get('playerId'),
+    )
+
+def extract_goalie_stats(player_data):
+    """
+    Extracts a goalie's regular season statistics from their landing page.
+
+    Parameters:
+        player_data (dict): The goalie's landing page.
+
+    Returns:
+        GoalieStatLine: The goalie's name, team, and numeric statistics. Quality starts are not on the
+        landing page, so they are left as None; see `count_quality_starts`.
+    """
+    player_fname = player_data.get('firstName').get('default')
+    player_lname = player_data.get('lastName').get('default')
+    team = player_data.get('currentTeamAbbrev')
+    goalie_stats = player_data.get('featuredStats', {}).get('regularSeason', {}).get('subSeason', {})
+    return GoalieStatLine(
+        f"{player_fname} {player_lname}",
+        team or "",
+        goalie_stats.get('gamesPlayed', 0),
+        goalie_stats.get('wins', 0),
+        goalie_stats.get('losses', 0),
+        goalie_stats.get('otLosses', 0),
+        goalie_stats.get('shutouts', 0),
+        goalie_stats.get('goalsAgainstAvg') or 0.0,
+        goalie_stats.get('savePctg') or 0.0,
+        None,
+        player_data.get('playerId'),
+    )
+
+def count_quality_starts(game_log):
+    """
+    Counts a goalie's quality starts in their game log.
+
+    A quality start is a start with a save percentage of at least `QUALITY_START_SAVE_PCTG`, or of at
+    least `QUALITY_START_LIGHT_SAVE_PCTG` in a start facing `QUALITY_START_LIGHT_SHOTS` shots or fewer.
+
+    Parameters:
+        game_log (list of dict): The games of the goalie's game log.
+
+    Returns:
+        int: The number of quality starts.
+    """
+    count = 0
+    for game in game_log:
+        if not game.get('gamesStarted'):
+            continue
+        save_pctg = game.get('savePctg') or 0.0
+        if save_pctg >= QUALITY_START_SAVE_PCTG or (
+                save_pctg >= QUALITY_START_LIGHT_SAVE_PCTG and game.get('shotsAgainst', 0) <= QUALITY_START_LIGHT_SHOTS):
+            count += 1
+    return count
+
+def current_team(team_abbrevs):
+    """
+    Returns the team a player is with now from a stats report's 'teamAbbrevs', e.g. 'MTL,TOR' for a
+    player traded from Montreal to Toronto.
+    """
+    return (team_abbrevs or "").split(",")[-1].strip()
+
+def skater_line_from_summary(row):
+    """
+    Converts one row of the skater summary report into a `PlayerStatLine`.
+
+    Parameters:
+        row (dict): The report row.
+
+    Returns:
+        PlayerStatLine: The skater's name, current team, and numeric statistics.
+    """
+    return PlayerStatLine(
+        row.get('skaterFullName', ""),
+        current_team(row.get('teamAbbrevs')),
+        row.get('gamesPlayed') or 0,
+        row.get('goals') or 0,
+        row.get('assists') or 0,
+        row.get('points') or 0,
+        row.get('plusMinus') or 0,
+        row.get('penaltyMinutes') or 0,
+        row.get('gameWinningGoals') or 0,
+        row.get('otGoals') or 0,
+        row.get('shots') or 0,
+        row.get('shootingPct') or 0.0,
+        row.get('playerId'),
+    )
+
+def goalie_line_from_summary(row, quality_starts=None):
+    """
+    Converts one row of the goalie summary report into a `GoalieStatLine`.
+
+    Parameters:
+        row (dict): The report row.
+        quality_starts (int, optional): The goalie's quality starts, from the goalie advanced report.
+
+    Returns:
+        GoalieStatLine: The goalie's name, current team, and numeric statistics.
+    """
+    return GoalieStatLine(
+        row.get('goalieFullName', ""),
+        current_team(row.get('teamAbbrevs')),
+        row.get('gamesPlayed') or 0,
+        row.get('wins') or 0,
+        row.get('losses') or 0,
+        row.get('otLosses') or 0,
+        row.get('shutouts') or 0,
+        row.get('goalsAgainstAverage') or 0.0,
+        row.get('savePct') or 0.0,
+        quality_starts,
+        row.get('playerId'),
+    )
 
 def format_shooting_percentage(shooting_pctg):
     """
@@ -205,29 +825,184 @@ def format_shooting_percentage(shooting_pctg):
         return "0.00%"
     return "{:.2f}%".format(shooting_pctg * 100)
 
-async def get_all_team_rosters_and_player_stats():
+async def fetch_league_player_stats(scheduler, deadline=None):
     """
-    This function uses asynchronous programming to fetch the rosters and player statistics for all NHL teams.
+    Asynchronously fetches the rosters and player statistics for all NHL teams and reports partial results.
+
+    The roster and player stages are pipelined rather than separated by a barrier: every team's player
+    fetches are started the moment its roster arrives. Rosters or players that fail after all retries, or
+    that are still pending at the deadline, are counted in the report instead of failing the whole fetch.
+
+    Parameters:
+        scheduler (FetchScheduler): An open scheduler used for every request.
+        deadline (float, optional): The absolute event loop time by which the whole fetch must finish.
+            Defaults to `scheduler.total_deadline` seconds from now.
+
+    Returns:
+        FetchReport: The `PlayerStatLine` records that were fetched, in completion order, plus the
+        failures and timeouts from both stages. Players whose landing page could not be found are skipped.
+
+    Note:
+        The whole fetch shares one deadline. Fetches still pending at the deadline are cancelled and
+        counted in `report.timed_out`.
+    """
+    loop = asyncio.get_running_loop()
+    if deadline is None:
+        deadline = scheduler.deadline()
+    report = FetchReport()
+    finished = asyncio.Queue()
+    pending = set()
+    roster_tasks = set()
+
+    def start(coro):
+        task = loop.create_task(coro)
+        pending.add(task)
+        task.add_done_callback(on_done)
+        return task
+
+    def on_done(task):
+        pending.discard(task)
+        finished.put_nowait(task)
+
+    async def fetch_roster_and_start_players(abbreviation):
+        for player_id in await fetch_team_rosters(scheduler, abbreviation):
+            start(fetch_player_stats(scheduler, player_id))
+
+    for abbreviation in nhl_team_abbreviations:
+        roster_tasks.add(start(fetch_roster_and_start_players(abbreviation)))
+
+    try:
+        while pending or not finished.empty():
+            try:
+                task = await asyncio.wait_for(finished.get(), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                report.timed_out += len(pending)
+                break
+            if task.cancelled():
+                continue
+            if task.exception() is not None:
+                report.failures.append(task.exception())
+            elif task not in roster_tasks and task.result() is not None:
+                report.results.append(task.result())
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    return report
+
+def merge_bulk_stats(abbreviation, player_ids, bulk):
+    """
+    Looks up a team's rostered players in league-wide stat records.
 
     Parameters:
-        session (aiohttp.ClientSession): The aiohttp session object used to make HTTP requests.
+        abbreviation (str): The team the players are rostered with, which overrides the team in the records.
+        player_ids (list of int): The IDs of the rostered players.
+        bulk (dict): Stat records keyed by player ID, from `fetch_bulk_skater_stats` or `fetch_bulk_goalie_stats`.
 
     Returns:
-        list: A list of dictionaries, where each dictionary represents a player and their statistics for a specific NHL team. The keys include "Name", "Team", "Games Played", "Goals", "Assists", "Points", "Plus Minus", "Pim", "Game Winning Goals", "OT Goals", "Shots", and "Shooting Percentage".
+        tuple: `(player_id, record)` pairs for the players found, and the IDs of the players missing from
+        the records, whose landing pages must be fetched instead.
+    """
+    found = []
+    missing = []
+    for player_id in player_ids:
+        line = bulk.get(player_id)
+        if line is None:
+            missing.append(player_id)
+        else:
+            found.append((player_id, line._replace(team=abbreviation)))
+    return found, missing
+
+async def fetch_league_player_stats_bulk(scheduler, season=CURRENT_SEASON):
+    """
+    Asynchronously fetches the player statistics for all NHL teams from the league-wide skater report.
+
+    The rosters and the report pages are requested concurrently, so the whole league costs the 32 roster
+    requests and about ten report pages instead of one landing page per player. Landing pages are only
+    fetched for rostered players missing from the report, such as those who have not played yet. If the
+    report cannot be fetched, this falls back to `fetch_league_player_stats`.
+
+    Rosters and landing pages only describe the present, so a completed season is read from the report
+    alone, with each player on the last team they played for that season.
+
+    Parameters:
+        scheduler (FetchScheduler): An open scheduler used for every request.
+        season (int): The season ID.
+
+    Returns:
+        FetchReport: The `PlayerStatLine` records that were fetched, plus the failures and timeouts.
 
     Note:
-        This function uses the aiohttp library for asynchronous HTTP requests.
+        For a season in progress, the rosters, the report and the landing pages share one deadline of
+        `scheduler.total_deadline` seconds, which also bounds the fallback. Fetches still pending at the
+        deadline are cancelled and counted in `report.timed_out`.
     """
-    async with aiohttp.ClientSession() as session:
-        # Get the player IDs for all forwards on each team
-        tasks = [fetch_team_rosters(session, abbreviation) for abbreviation in nhl_team_abbreviations]
-        player_ids_lists = await asyncio.gather(*tasks)
+    if is_completed_season(season):
+        report = FetchReport()
+        try:
+            bulk = await fetch_bulk_skater_stats(scheduler, season)
+        except Exception as error:
+            report.failures.append(error)
+            return report
+        if bulk is None:
+            report.failures.append(LookupError(f"The skater report for {season_label(season)} is unavailable"))
+        else:
+            report.results.extend(bulk.values())
+        return report
+
+    async def roster(abbreviation):
+        return abbreviation, await fetch_team_rosters(scheduler, abbreviation)
+
+    loop = asyncio.get_running_loop()
+    deadline = scheduler.deadline()
+    bulk_task = asyncio.ensure_future(fetch_bulk_skater_stats(scheduler, season))
+    rosters = await scheduler.gather_partial((roster(abbreviation) for abbreviation in nhl_team_abbreviations),
+                                             deadline)
+    report = FetchReport(failures=rosters.failures, timed_out=rosters.timed_out)
+    try:
+        bulk = await asyncio.wait_for(bulk_task, max(0.0, deadline - loop.time()))
+    except asyncio.TimeoutError:
+        report.timed_out += 1
+        return report
+    except Exception:
+        bulk = None
+    if bulk is None:
+        return await fetch_league_player_stats(scheduler, deadline)
+
+    missing = []
+    for abbreviation, player_ids in rosters.results:
+        found, not_found = merge_bulk_stats(abbreviation, player_ids, bulk)
+        report.results.extend(line for _, line in found)
+        missing.extend(not_found)
+    fetched = await scheduler.gather_partial((fetch_player_stats(scheduler, player_id) for player_id in missing),
+                                             deadline)
+    report.results.extend(line for line in fetched.results if line is not None)
+    report.failures.extend(fetched.failures)
+    report.timed_out += fetched.timed_out
+    return report
+
+async def get_all_team_rosters_and_player_stats(scheduler=None, season=CURRENT_SEASON):
+    """
+    This function uses asynchronous programming to fetch the rosters and player statistics for all NHL teams.
 
-        # Get the player statistics for each player ID
-        tasks = [fetch_player_stats(session, player_id) for player_ids in player_ids_lists for player_id in player_ids]
-        all_player_stats = await asyncio.gather(*tasks)
+    Parameters:
+        scheduler (FetchScheduler, optional): An open scheduler used for every request. If omitted, a
+            scheduler with the default limits is opened for the duration of the call.
+        season (int): The season ID. Completed seasons are downloaded once and then served from the cache.
+
+    Returns:
+        list of PlayerStatLine: One record per player, holding their team and numeric regular season statistics.
 
-    return all_player_stats
+    Note:
+        The statistics come from the league-wide skater report, with landing pages only as a fallback;
+        see `fetch_league_player_stats_bulk`. Players whose requests failed or timed out are left out
+        rather than failing the whole list.
+    """
+    if scheduler is None:
+        async with FetchScheduler() as scheduler:
+            report = await fetch_league_player_stats_bulk(scheduler, season)
+    else:
+        report = await fetch_league_player_stats_bulk(scheduler, season)
+    return report.results
 
-# Call the function
-player_stats = asyncio.run(get_all_team_rosters_and_player_stats())
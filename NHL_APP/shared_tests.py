@@ -1,5 +1,9 @@
 import unittest
-from shared import fetch_team_rosters, extract_player_stats, get_all_team_rosters_and_player_stats
+from shared import fetch_team_rosters, extract_player_stats, get_all_team_rosters_and_player_stats, fetch_league_player_stats, PlayerStatLine, PlayerStatTable
+from shared import extract_goalie_stats, count_quality_starts, skater_line_from_summary, merge_bulk_stats, fetch_league_player_stats_bulk
+from shared import season_for_date
+from datetime import date
+from fetch_scheduler import FetchScheduler
 import asyncio
 import aiohttp
 from unittest.mock import MagicMock, patch
@@ -78,7 +82,71 @@ class TestExtractPlayerStats(unittest.TestCase):
         }
 
         result = extract_player_stats(player_data)
-        self.assertEqual(result, expected_result)
+        self.assertEqual(result.as_dict(), expected_result)
+        self.assertAlmostEqual(result.shooting_pctg, 0.13333)
+
+    def test_player_stat_table_sorts_on_numeric_shooting_percentage(self):
+        """
+        Shooting percentage must sort numerically, e.g. 9% below 10%, which string sorting gets wrong.
+        """
+        table = PlayerStatTable([
+            PlayerStatLine('A', 'TOR', 10, 1, 0, 1, 0, 0, 0, 0, 10, 0.10),
+            PlayerStatLine('B', 'MTL', 10, 1, 0, 1, 0, 0, 0, 0, 11, 0.09),
+        ])
+
+        self.assertEqual(list(table.sorted_rows(11)), [1, 0])
+        self.assertEqual(table.display_value(1, 11), "9.00%")
+        self.assertEqual(table[0], PlayerStatLine('A', 'TOR', 10, 1, 0, 1, 0, 0, 0, 0, 10, 0.10))
+
+    def test_extract_goalie_stats(self):
+        """
+        Goalie landing pages yield numeric save percentage and goals against average, formatted only for display.
+        """
+        goalie_data = {
+            'playerId': 8479361,
+            'firstName': {'default': 'Joseph'},
+            'lastName': {'default': 'Woll'},
+            'currentTeamAbbrev': 'TOR',
+            'featuredStats': {'regularSeason': {'subSeason': {
+                'gamesPlayed': 25, 'wins': 12, 'losses': 11, 'otLosses': 1, 'shutouts': 1,
+                'goalsAgainstAvg': 2.9428, 'savePctg': 0.9068,
+            }}},
+        }
+
+        result = extract_goalie_stats(goalie_data)
+
+        self.assertEqual(result.as_dict(), {
+            'Name': 'Joseph Woll', 'Team': 'TOR', 'Games Played': 25, 'Wins': 12, 'Losses': 11, 'OT Losses': 1,
+            'Shutouts': 1, 'Goals Against Average': '2.94', 'Save Percentage': '.907', 'Quality Starts': '-',
+        })
+        self.assertEqual(result.player_id, 8479361)
+
+    def test_count_quality_starts(self):
+        """
+        Starts at .913 or better count, as do starts at .885 or better on 20 shots or fewer; relief appearances never do.
+        """
+        game_log = [
+            {'gamesStarted': 1, 'shotsAgainst': 30, 'savePctg': 0.9333},
+            {'gamesStarted': 1, 'shotsAgainst': 18, 'savePctg': 0.8889},
+            {'gamesStarted': 1, 'shotsAgainst': 30, 'savePctg': 0.9},
+            {'gamesStarted': 0, 'shotsAgainst': 10, 'savePctg': 1.0},
+        ]
+
+        self.assertEqual(count_quality_starts(game_log), 2)
+
+    def test_skater_summary_rows_use_the_rostered_team(self):
+        """
+        A traded player's report row lists every team they played for; the roster they are on now wins.
+        """
+        row = {'playerId': 8478483, 'skaterFullName': 'Sean Monahan', 'teamAbbrevs': 'MTL,WPG', 'gamesPlayed': 83,
+               'goals': 26, 'assists': 33, 'points': 59, 'plusMinus': 1, 'penaltyMinutes': 16,
+               'gameWinningGoals': 6, 'otGoals': 1, 'shots': 155, 'shootingPct': 0.16774}
+        line = skater_line_from_summary(row)
+
+        self.assertEqual((line.team, line.points, line.player_id), ('WPG', 59, 8478483))
+        found, missing = merge_bulk_stats('WPG', [8478483, 8470000], {8478483: line._replace(team='MTL')})
+        self.assertEqual(found, [(8478483, line)])
+        self.assertEqual(missing, [8470000])
         
 class TestGetAllTeamRostersAndPlayerStats(unittest.TestCase):
     @patch('shared.fetch_team_rosters')
@@ -108,7 +176,73 @@ class TestGetAllTeamRostersAndPlayerStats(unittest.TestCase):
         mock_fetch_team_rosters.assert_called()
         mock_fetch_player_stats.assert_called()
 
-        
+
+class TestFetchLeaguePlayerStats(unittest.IsolatedAsyncioTestCase):
+    async def test_players_are_fetched_before_slowest_roster_arrives(self):
+        """
+        Player fetches for a team must start as soon as its roster arrives, without waiting for the other teams.
+        """
+        async def fake_rosters(scheduler, abbreviation):
+            if abbreviation == 'ANA':
+                await asyncio.sleep(0.2)
+            return [f'{abbreviation}-1', f'{abbreviation}-2']
+
+        async def fake_player_stats(scheduler, player_id):
+            return {'Name': player_id}
+
+        with patch('shared.fetch_team_rosters', fake_rosters), patch('shared.fetch_player_stats', fake_player_stats):
+            report = await fetch_league_player_stats(FetchScheduler())
+        names = [player['Name'] for player in report.results]
+
+        self.assertEqual(len(names), 2 * 31)
+        self.assertEqual(names[-2:], ['ANA-1', 'ANA-2'])
+        self.assertTrue(report.complete)
+
+    async def test_failed_roster_is_reported_not_raised(self):
+        async def fake_rosters(scheduler, abbreviation):
+            if abbreviation == 'TOR':
+                raise aiohttp.ClientError('connection reset')
+            return [abbreviation]
+
+        async def fake_player_stats(scheduler, player_id):
+            return {'Name': player_id}
+
+        with patch('shared.fetch_team_rosters', fake_rosters), patch('shared.fetch_player_stats', fake_player_stats):
+            report = await fetch_league_player_stats(FetchScheduler())
+        names = [player['Name'] for player in report.results]
+
+        self.assertEqual(len(names), 30)
+        self.assertNotIn('TOR', names)
+        self.assertEqual(len(report.failures), 1)
+
+
+class TestFetchLeaguePlayerStatsBulk(unittest.IsolatedAsyncioTestCase):
+    async def test_rosters_pending_at_the_deadline_are_reported(self):
+        seasons = []
+
+        async def fake_bulk(scheduler, season):
+            seasons.append(season)
+            return {}
+
+        async def fake_rosters(scheduler, abbreviation):
+            await asyncio.sleep(5 if abbreviation == 'TOR' else 0)
+            return []
+
+        with patch('shared.fetch_bulk_skater_stats', fake_bulk), patch('shared.fetch_team_rosters', fake_rosters):
+            report = await asyncio.wait_for(
+                fetch_league_player_stats_bulk(FetchScheduler(total_deadline=0.1), season=20992100), 2)
+
+        self.assertEqual(report.timed_out, 1)
+        self.assertEqual(seasons, [20992100])
+
+
+class TestSeasonForDate(unittest.TestCase):
+    def test_the_previous_season_is_current_until_october(self):
+        self.assertEqual(season_for_date(date(2024, 3, 1)), 20232024)
+        self.assertEqual(season_for_date(date(2024, 8, 1)), 20232024)
+        self.assertEqual(season_for_date(date(2024, 10, 4)), 20242025)
+
+
 if __name__ == '__main__':
     unittest.main()
     asyncio.run(unittest.main(), debug=True)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from PyQt5.QtCore import QEvent, QObject, pyqtSignal
+
+from instrumentation import Span, tracer
+
+STARTUP_LOG_PATH = os.environ.get("NHL_STARTUP_LOG", "nhl_startup.jsonl")  # One JSON line per launch
+STARTUP_BUDGET_MS = float(os.environ.get("NHL_STARTUP_BUDGET_MS", 1500))  # Allowed time to the login window
+
+
+class StartupTrace(QObject):
+    """
+    Times the launch of the app, from its first import to the first paint of the login window.
+
+    The clock starts when the trace is created, so `WholeApp` imports this module before anything else.
+    `mark` records how long each step took to be reached; `watch` records the 'window' mark when the
+    main window first paints and then finishes the trace. Each finished launch is appended to the
+    startup log as one JSON line, and is also recorded as spans while tracing is on.
+
+    Signals:
+        finished (dict): Emitted with the launch's record once the login window has been painted.
+
+    Parameters:
+        path (str, optional): The startup log. Nothing is written if this is empty.
+        budget_ms (float): The time to the login window the launch is expected to stay within.
+        parent (QObject, optional): The owner of the trace.
+    """
+    finished = pyqtSignal(dict)
+
+    def __init__(self, path=STARTUP_LOG_PATH, budget_ms=STARTUP_BUDGET_MS, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.budget_ms = budget_ms
+        self.origin = time.perf_counter_ns()
+        self.marks = {}
+        self.record = None
+
+    def mark(self, name):
+        """
+        Records that a step of the launch has been reached.
+
+        Parameters:
+            name (str): The step, e.g. 'imports' or 'window'.
+
+        Returns:
+            float: The milliseconds since the launch began.
+        """
+        now = time.perf_counter_ns()
+        if tracer.enabled:
+            span = Span(tracer, f"startup.{name}", "startup", {})
+            span.start = max(self.marks.values(), default=self.origin)
+            tracer.record(span, now)
+        self.marks[name] = now
+        return (now - self.origin) / 1e6
+
+    def watch(self, window):
+        """
+        Finishes the trace when a window is first painted.
+
+        Parameters:
+            window (QWidget): The window shown at launch.
+        """
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.record is None:
+            watched.removeEventFilter(self)
+            self.mark("window")
+            self.finished.emit(self.finish())
+        return False
+
+    def finish(self):
+        """
+        Builds the launch's record and appends it to the startup log.
+
+        Returns:
+            dict: When the app was launched, the milliseconds to each mark (e.g. 'imports_ms' and
+            'window_ms'), the budget and whether the login window was shown within it.
+        """
+        record = {"launched_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        record.update({f"{name}_ms": round((ns - self.origin) / 1e6, 1) for name, ns in self.marks.items()})
+        record["budget_ms"] = self.budget_ms
+        record["within_budget"] = record.get("window_ms", 0) <= self.budget_ms
+        if self.path:
+            with open(self.path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+        self.record = record
+        return record
+
+
+# Started by the first import, which makes it the launch's clock
+startup_trace = StartupTrace()
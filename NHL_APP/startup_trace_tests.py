@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from startup_trace import STARTUP_BUDGET_MS, StartupTrace
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Modules the login window must not wait for
+DEFERRED_MODULES = ("aiohttp", "requests", "asyncio", "PyQt5.QtSvg", "shared", "HomeScreen", "PlayerStatsDialog")
+
+
+class TestStartupTrace(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmpdir.name, "startup.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def launch(self, *args, **env):
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen", NHL_STARTUP_LOG=self.log,
+                   NHL_USERS=os.path.join(self.tmpdir.name, "users.sqlite"), **env)
+        # The app loads its stylesheets relative to the repository root
+        return subprocess.run([sys.executable, *args], cwd=os.path.dirname(APP_DIR), env=env,
+                              capture_output=True, text=True, timeout=120)
+
+    def test_each_launch_appends_a_record(self):
+        trace = StartupTrace(self.log, budget_ms=1000)
+        trace.mark("imports")
+        trace.mark("window")
+        trace.finish()
+        trace.finish()
+
+        with open(self.log) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 2)
+        self.assertLessEqual(records[0]["imports_ms"], records[0]["window_ms"])
+        self.assertEqual(records[0]["budget_ms"], 1000)
+        self.assertTrue(records[0]["within_budget"])
+
+    def test_login_window_is_shown_within_the_budget(self):
+        result = self.launch(os.path.join(APP_DIR, "WholeApp.py"), NHL_EXIT_AFTER_STARTUP="1")
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        with open(self.log) as file:
+            record = json.loads(file.readlines()[-1])
+        self.assertLessEqual(record["window_ms"], STARTUP_BUDGET_MS,
+                             f"The login window took {record['window_ms']} ms to show; the budget is "
+                             f"{STARTUP_BUDGET_MS} ms (NHL_STARTUP_BUDGET_MS)")
+
+    def test_launch_does_not_import_the_network_stack(self):
+        result = self.launch("-c", f"import sys; sys.path.insert(0, {APP_DIR!r}); import WholeApp; "
+                                   f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
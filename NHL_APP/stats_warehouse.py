@@ -0,0 +1,481 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from shared import (CURRENT_SEASON, GoalieStatLine, PlayerStatLine, fetch_bulk_goalie_stats, fetch_bulk_skater_stats,
+                    fetch_goalie_stats, fetch_player_stats, fetch_team_roster_groups, merge_bulk_stats,
+                    nhl_team_abbreviations)
+from fetch_scheduler import FetchReport
+from team_stats import StandingsSnapshot, standings_service
+
+DEFAULT_WAREHOUSE_PATH = os.environ.get("NHL_WAREHOUSE", "nhl_stats.sqlite")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS teams ("
+    " abbrev TEXT PRIMARY KEY,"
+    " name TEXT,"
+    " logo TEXT,"
+    " synced_games_played INTEGER,"  # Games played by the team when its players were last synced
+    " synced_at REAL)",
+    "CREATE TABLE IF NOT EXISTS players ("
+    " player_id INTEGER PRIMARY KEY,"
+    " name TEXT NOT NULL,"
+    " team TEXT REFERENCES teams(abbrev))",  # NULL once the player leaves a synced roster
+    "CREATE TABLE IF NOT EXISTS player_season_stats ("
+    " player_id INTEGER NOT NULL REFERENCES players(player_id),"
+    " season INTEGER NOT NULL,"
+    " games_played INTEGER NOT NULL,"
+    " goals INTEGER NOT NULL,"
+    " assists INTEGER NOT NULL,"
+    " points INTEGER NOT NULL,"
+    " plus_minus INTEGER NOT NULL,"
+    " pim INTEGER NOT NULL,"
+    " game_winning_goals INTEGER NOT NULL,"
+    " ot_goals INTEGER NOT NULL,"
+    " shots INTEGER NOT NULL,"
+    " shooting_pctg REAL NOT NULL,"
+    " updated_at REAL NOT NULL,"
+    " PRIMARY KEY (player_id, season))",
+    "CREATE TABLE IF NOT EXISTS goalie_season_stats ("
+    " player_id INTEGER NOT NULL REFERENCES players(player_id),"
+    " season INTEGER NOT NULL,"
+    " games_played INTEGER NOT NULL,"
+    " wins INTEGER NOT NULL,"
+    " losses INTEGER NOT NULL,"
+    " ot_losses INTEGER NOT NULL,"
+    " shutouts INTEGER NOT NULL,"
+    " goals_against_avg REAL NOT NULL,"
+    " save_pctg REAL NOT NULL,"
+    " quality_starts INTEGER,"  # NULL if the goalie's game log could not be fetched
+    " updated_at REAL NOT NULL,"
+    " PRIMARY KEY (player_id, season))",
+    "CREATE TABLE IF NOT EXISTS standings_snapshots ("
+    " snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " season INTEGER NOT NULL,"
+    " taken_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS standings_rows ("
+    " snapshot_id INTEGER NOT NULL REFERENCES standings_snapshots(snapshot_id),"
+    " rank INTEGER NOT NULL,"
+    " team TEXT,"
+    " games_played INTEGER NOT NULL,"
+    " wins INTEGER NOT NULL,"
+    " losses INTEGER NOT NULL,"
+    " points INTEGER NOT NULL,"
+    " goal_differential INTEGER NOT NULL,"
+    " goal_differential_pctg REAL NOT NULL,"
+    " goal_against INTEGER NOT NULL,"
+    " goal_for INTEGER NOT NULL,"
+    " goals_for_pctg REAL NOT NULL,"
+    " ot_losses INTEGER NOT NULL DEFAULT 0,"
+    " regulation_wins INTEGER NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (snapshot_id, rank))",
+    "CREATE INDEX IF NOT EXISTS players_team_idx ON players(team)",
+    "CREATE INDEX IF NOT EXISTS player_season_stats_points_idx ON player_season_stats(season, points DESC)",
+    "CREATE INDEX IF NOT EXISTS standings_snapshots_season_idx ON standings_snapshots(season, taken_at)",
+]
+
+# Columns added to a table after it was first created, as (table, column, definition), so databases
+# created before are upgraded when opened
+ADDED_COLUMNS = [
+    ("standings_rows", "ot_losses", "INTEGER NOT NULL DEFAULT 0"),
+    ("standings_rows", "regulation_wins", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# Stat columns of `player_season_stats`, in the order of the numeric `PlayerStatLine` fields
+STAT_COLUMNS = ("games_played", "goals", "assists", "points", "plus_minus", "pim", "game_winning_goals",
+                "ot_goals", "shots", "shooting_pctg")
+
+# Stat columns of `goalie_season_stats`, in the order of the numeric `GoalieStatLine` fields
+GOALIE_STAT_COLUMNS = ("games_played", "wins", "losses", "ot_losses", "shutouts", "goals_against_avg", "save_pctg",
+                       "quality_starts")
+
+# Columns of `standings_rows` and the `StandingsSnapshot.teams` keys they hold
+STANDINGS_COLUMNS = (
+    ("games_played", "Games Played"), ("wins", "Wins"), ("losses", "Losses"), ("points", "Points"),
+    ("goal_differential", "Goal Differential"), ("goal_differential_pctg", "Goal Differential Percentage"),
+    ("goal_against", "Goal Against"), ("goal_for", "Goal For"), ("goals_for_pctg", "Goals For Percentage"),
+    ("ot_losses", "OT Losses"), ("regulation_wins", "Regulation Wins"),
+)
+
+
+class StatsWarehouse:
+    """
+    A local SQLite store of players, teams, season stat lines and standings snapshots.
+
+    The stats views read from here with indexed queries, so opening them needs no network once a sync
+    has run. `WarehouseSync` keeps the tables current.
+
+    Parameters:
+        path (str): The SQLite database file. Defaults to `nhl_stats.sqlite` in the working directory.
+
+    Note:
+        The database connection is opened on first use, so creating a `StatsWarehouse` never touches the disk.
+    """
+    def __init__(self, path=DEFAULT_WAREHOUSE_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+            for table, column, definition in ADDED_COLUMNS:
+                existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            self._conn.commit()
+        return self._conn
+
+    def player_stat_lines(self, season=CURRENT_SEASON):
+        """
+        Returns the stat line of every player currently on a roster, highest points first.
+
+        Parameters:
+            season (int): The season ID.
+
+        Returns:
+            list of PlayerStatLine: The players' statistics for the season.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT p.name, p.team, " + ", ".join(f"s.{column}" for column in STAT_COLUMNS) + ", s.player_id"
+                " FROM player_season_stats s JOIN players p ON p.player_id = s.player_id"
+                " WHERE s.season = ? AND p.team IS NOT NULL"
+                " ORDER BY s.points DESC", (season,)).fetchall()
+        return [PlayerStatLine._make(row) for row in rows]
+
+    def goalie_stat_lines(self, season=CURRENT_SEASON):
+        """
+        Returns the stat line of every goalie currently on a roster, most wins first.
+
+        Parameters:
+            season (int): The season ID.
+
+        Returns:
+            list of GoalieStatLine: The goalies' statistics for the season.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT p.name, p.team, " + ", ".join(f"g.{column}" for column in GOALIE_STAT_COLUMNS) +
+                ", g.player_id FROM goalie_season_stats g JOIN players p ON p.player_id = g.player_id"
+                " WHERE g.season = ? AND p.team IS NOT NULL"
+                " ORDER BY g.wins DESC", (season,)).fetchall()
+        return [GoalieStatLine._make(row) for row in rows]
+
+    def has_player_stats(self, season=CURRENT_SEASON):
+        """
+        Returns True if at least one player's statistics for the season are stored.
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM player_season_stats WHERE season = ? LIMIT 1", (season,)).fetchone()
+        return row is not None
+
+    def latest_standings(self, season=CURRENT_SEASON):
+        """
+        Returns the most recent standings snapshot stored for a season.
+
+        Parameters:
+            season (int): The season ID.
+
+        Returns:
+            StandingsSnapshot or None: The snapshot, or None if no standings were stored for the season.
+        """
+        with self._lock:
+            conn = self._connection()
+            latest = conn.execute(
+                "SELECT snapshot_id FROM standings_snapshots WHERE season = ? ORDER BY taken_at DESC LIMIT 1",
+                (season,)).fetchone()
+            if latest is None:
+                return None
+            rows = conn.execute(
+                "SELECT t.name, r.team, t.logo, " + ", ".join(f"r.{column}" for column, _ in STANDINGS_COLUMNS) +
+                " FROM standings_rows r LEFT JOIN teams t ON t.abbrev = r.team"
+                " WHERE r.snapshot_id = ? ORDER BY r.rank", latest).fetchall()
+        keys = ('Team', 'abbrev', 'logo') + tuple(key for _, key in STANDINGS_COLUMNS)
+        return StandingsSnapshot.from_teams(dict(zip(keys, row)) for row in rows)
+
+    def stale_teams(self, snapshot, season=CURRENT_SEASON):
+        """
+        Returns the teams whose players must be fetched again.
+
+        A team is stale if it has played since its players were last synced, was never synced, or has no
+        goalie statistics stored, as happens for teams synced before goalies were.
+
+        Parameters:
+            snapshot (StandingsSnapshot): The current standings.
+            season (int): The season ID.
+
+        Returns:
+            list of str: The abbreviations of the stale teams.
+        """
+        with self._lock:
+            conn = self._connection()
+            synced = dict(conn.execute(
+                "SELECT abbrev, synced_games_played FROM teams WHERE synced_at IS NOT NULL").fetchall())
+            with_goalies = {team for team, in conn.execute(
+                "SELECT DISTINCT p.team FROM goalie_season_stats g JOIN players p ON p.player_id = g.player_id"
+                " WHERE g.season = ?", (season,)).fetchall()}
+        played = {team['abbrev']: team['Games Played'] for team in snapshot.teams if team.get('abbrev')}
+        return [abbreviation for abbreviation in nhl_team_abbreviations
+                if abbreviation not in synced or played.get(abbreviation) != synced[abbreviation]
+                or abbreviation not in with_goalies]
+
+    def record_standings(self, snapshot, season=CURRENT_SEASON):
+        """
+        Stores a standings snapshot and the name and logo of every team in it.
+
+        A snapshot identical to the latest one stored is not stored again, so frequent syncs on days
+        without games do not grow the table.
+
+        Parameters:
+            snapshot (StandingsSnapshot): The standings to store.
+            season (int): The season ID.
+
+        Returns:
+            int: The ID of the stored snapshot, or of the identical latest one.
+        """
+        values = [(team.get('abbrev'),) + tuple(team[key] for _, key in STANDINGS_COLUMNS) for team in snapshot.teams]
+        with self._lock:
+            conn = self._connection()
+            latest = conn.execute(
+                "SELECT snapshot_id FROM standings_snapshots WHERE season = ? ORDER BY taken_at DESC LIMIT 1",
+                (season,)).fetchone()
+            if latest is not None:
+                stored = conn.execute(
+                    "SELECT team, " + ", ".join(column for column, _ in STANDINGS_COLUMNS) +
+                    " FROM standings_rows WHERE snapshot_id = ? ORDER BY rank", latest).fetchall()
+                if stored == values:
+                    return latest[0]
+            with conn:
+                snapshot_id = conn.execute("INSERT INTO standings_snapshots (season, taken_at) VALUES (?, ?)",
+                                           (season, time.time())).lastrowid
+                for rank, team in enumerate(snapshot.teams):
+                    if team.get('abbrev'):
+                        conn.execute(
+                            "INSERT INTO teams (abbrev, name, logo) VALUES (?, ?, ?)"
+                            " ON CONFLICT(abbrev) DO UPDATE SET name = excluded.name, logo = excluded.logo",
+                            (team['abbrev'], team['Team'], team['logo']))
+                    conn.execute(
+                        "INSERT INTO standings_rows (snapshot_id, rank, team, " +
+                        ", ".join(column for column, _ in STANDINGS_COLUMNS) + ") VALUES (?, ?, ?" +
+                        ", ?" * len(STANDINGS_COLUMNS) + ")",
+                        (snapshot_id, rank) + values[rank])
+        return snapshot_id
+
+    def store_team(self, abbreviation, players, roster_ids, games_played=None, season=CURRENT_SEASON, goalies=()):
+        """
+        Stores the freshly fetched players of one team in a single transaction.
+
+        Players who were on the team but are not on the new roster are detached from it. If
+        `games_played` is given, the team is marked as synced at that number of games.
+
+        Parameters:
+            abbreviation (str): The team abbreviation.
+            players (list of tuple): `(player_id, PlayerStatLine)` pairs.
+            roster_ids (list of int): The IDs of every player on the team's current roster, goalies included.
+            games_played (int, optional): The team's games played when the roster was fetched. Leave it
+                out if some players could not be fetched, so the team is synced again next time.
+            season (int): The season ID of the statistics.
+            goalies (list of tuple): `(player_id, GoalieStatLine)` pairs.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO teams (abbrev) VALUES (?)", (abbreviation,))
+                for player_id, line in players:
+                    conn.execute(
+                        "INSERT INTO players (player_id, name, team) VALUES (?, ?, ?)"
+                        " ON CONFLICT(player_id) DO UPDATE SET name = excluded.name, team = excluded.team",
+                        (player_id, line.name, line.team or abbreviation))
+                    conn.execute(
+                        "INSERT OR REPLACE INTO player_season_stats (player_id, season, " + ", ".join(STAT_COLUMNS) +
+                        ", updated_at) VALUES (?, ?" + ", ?" * len(STAT_COLUMNS) + ", ?)",
+                        (player_id, season) + tuple(line[2:12]) + (now,))
+                for player_id, line in goalies:
+                    conn.execute(
+                        "INSERT INTO players (player_id, name, team) VALUES (?, ?, ?)"
+                        " ON CONFLICT(player_id) DO UPDATE SET name = excluded.name, team = excluded.team",
+                        (player_id, line.name, line.team or abbreviation))
+                    conn.execute(
+                        "INSERT OR REPLACE INTO goalie_season_stats (player_id, season, " +
+                        ", ".join(GOALIE_STAT_COLUMNS) + ", updated_at) VALUES (?, ?" +
+                        ", ?" * len(GOALIE_STAT_COLUMNS) + ", ?)",
+                        (player_id, season) + tuple(line[2:10]) + (now,))
+                placeholders = ", ".join("?" * len(roster_ids))
+                conn.execute(f"UPDATE players SET team = NULL WHERE team = ? AND player_id NOT IN ({placeholders})",
+                             (abbreviation, *roster_ids))
+                if games_played is not None:
+                    conn.execute("UPDATE teams SET synced_games_played = ?, synced_at = ? WHERE abbrev = ?",
+                                 (games_played, now, abbreviation))
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class WarehouseSync:
+    """
+    Brings a `StatsWarehouse` up to date, fetching only what changed since the last sync.
+
+    Each sync fetches the standings first. Only teams whose games played changed since they were last
+    synced have their roster fetched again, and those requests revalidate any cached copy, since a team
+    that played has new statistics. The players' statistics come from the league-wide skater and goalie
+    reports, fetched once per sync concurrently with the rosters, so a full sync costs the rosters and a
+    few report pages. Landing pages are only fetched for rostered players missing from the reports, or
+    for everyone if a report is unavailable. On a day without games a sync costs a single standings
+    request. A team is marked as synced only once every one of its players was stored, so a team that
+    failed part-way is retried by the next sync.
+
+    Parameters:
+        warehouse (StatsWarehouse): The warehouse to update.
+    """
+    def __init__(self, warehouse):
+        self.warehouse = warehouse
+        self._sync_lock = None
+        self._sync_lock_loop = None
+
+    def _lock(self):
+        # Created on first use, and again when syncs move to another event loop (each test runs its own),
+        # since an asyncio lock belongs to one loop. Only the latest loop's lock is kept.
+        loop = asyncio.get_running_loop()
+        if self._sync_lock_loop is not loop:
+            self._sync_lock = asyncio.Lock()
+            self._sync_lock_loop = loop
+        return self._sync_lock
+
+    @staticmethod
+    async def _fetch_bulk(scheduler):
+        # The league-wide skater and goalie reports, or None for a report that could not be fetched, in
+        # which case the teams fall back to landing pages
+        reports = await asyncio.gather(fetch_bulk_skater_stats(scheduler, revalidate=True),
+                                       fetch_bulk_goalie_stats(scheduler, revalidate=True), return_exceptions=True)
+        return tuple(None if isinstance(report, Exception) else report for report in reports)
+
+    async def _sync_team(self, scheduler, abbreviation, games_played, progress, bulk):
+        skater_ids, goalie_ids = await fetch_team_roster_groups(scheduler, abbreviation, revalidate=True)
+        if not skater_ids:
+            raise LookupError(f"No roster was returned for {abbreviation}.")
+        roster_ids = skater_ids + goalie_ids
+        progress(0, len(roster_ids))
+        # Shielded, since every team waits on the same reports
+        skater_report, goalie_report = await asyncio.shield(bulk)
+        players, missing_skaters = merge_bulk_stats(abbreviation, skater_ids, skater_report or {})
+        goalies, missing_goalies = merge_bulk_stats(abbreviation, goalie_ids, goalie_report or {})
+        progress(len(players) + len(goalies), 0)
+        # Players missing from the reports are fetched in one concurrent batch of landing pages
+        fetched = await asyncio.gather(
+            *(self._fetch_player(scheduler, fetch_player_stats, player_id, progress) for player_id in missing_skaters),
+            *(self._fetch_player(scheduler, fetch_goalie_stats, player_id, progress) for player_id in missing_goalies),
+            return_exceptions=True)
+        missing_ids = missing_skaters + missing_goalies
+        players += [(player_id, line) for player_id, line in zip(missing_ids, fetched)
+                    if isinstance(line, PlayerStatLine)]
+        goalies += [(player_id, line) for player_id, line in zip(missing_ids, fetched)
+                    if isinstance(line, GoalieStatLine)]
+        failures = [error for error in fetched if isinstance(error, BaseException)]
+        self.warehouse.store_team(abbreviation, players, roster_ids, None if failures else games_played,
+                                  goalies=goalies)
+        return players, failures
+
+    @staticmethod
+    async def _fetch_player(scheduler, fetch, player_id, progress):
+        try:
+            return await fetch(scheduler, player_id, revalidate=True)
+        finally:
+            progress(1, 0)
+
+    async def stream(self, scheduler, report=None, progress=None, force=False):
+        """
+        Asynchronously syncs the stale teams and yields each one's players once they are stored.
+
+        Only one sync runs at a time; a second caller waits for the first one to finish and then finds
+        nothing left to fetch.
+
+        Parameters:
+            scheduler (FetchScheduler): An open scheduler used for every request.
+            report (FetchReport, optional): Receives the failures and the number of teams still pending at
+                the deadline.
+            progress (callable, optional): Called as `progress(done, expected)` after each player fetch
+                finishes, where `expected` grows as rosters arrive.
+            force (bool): If True, every team is synced, whether it played or not.
+
+        Yields:
+            PlayerStatLine: The statistics of each skater that was fetched. Goalies are stored but not
+            yielded; read them with `StatsWarehouse.goalie_stat_lines`.
+        """
+        async with self._lock():
+            snapshot = await standings_service.snapshot(scheduler)
+            self.warehouse.record_standings(snapshot)
+            teams = nhl_team_abbreviations if force else self.warehouse.stale_teams(snapshot)
+            played = {team['abbrev']: team['Games Played'] for team in snapshot.teams}
+            counts = {'done': 0, 'expected': 0}
+
+            def count(done, expected):
+                counts['done'] += done
+                counts['expected'] += expected
+                if progress is not None and done:
+                    progress(counts['done'], counts['expected'])
+
+            loop = asyncio.get_running_loop()
+            deadline = scheduler.deadline()
+            bulk = loop.create_task(self._fetch_bulk(scheduler)) if teams else None
+            pending = {loop.create_task(self._sync_team(scheduler, team, played.get(team), count, bulk))
+                       for team in teams}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - loop.time()),
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        if report is not None:
+                            report.timed_out += len(pending)
+                        break
+                    for task in done:
+                        if task.exception() is not None:
+                            if report is not None:
+                                report.failures.append(task.exception())
+                            continue
+                        players, failures = task.result()
+                        if report is not None:
+                            report.failures.extend(failures)
+                        for _, line in players:
+                            yield line
+            finally:
+                if bulk is not None:
+                    pending.add(bulk)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+    async def sync(self, scheduler, force=False):
+        """
+        Asynchronously brings the warehouse up to date.
+
+        Parameters:
+            scheduler (FetchScheduler): An open scheduler used for every request.
+            force (bool): If True, every team is synced, whether it played or not.
+
+        Returns:
+            FetchReport: The players that were fetched, plus the failures and timeouts.
+        """
+        report = FetchReport()
+        async for line in self.stream(scheduler, report, force=force):
+            report.results.append(line)
+        return report
+
+
+# Shared warehouse and sync job used by the stats views
+stats_warehouse = StatsWarehouse()
+warehouse_sync = WarehouseSync(stats_warehouse)
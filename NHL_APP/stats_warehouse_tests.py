@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import shared
+from api_cache import ApiCache
+from fetch_scheduler import FetchScheduler
+from nhl_api_standin import NHLApiStandin
+from stats_warehouse import StatsWarehouse, WarehouseSync
+from team_stats import StandingsSnapshot, standings_service
+
+
+class TestWarehouseSync(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ApiCache(os.path.join(self.tmpdir.name, "cache.sqlite"))
+        self.warehouse = StatsWarehouse(os.path.join(self.tmpdir.name, "stats.sqlite"))
+        self.sync = WarehouseSync(self.warehouse)
+        self.previous_base_url = shared.API_BASE_URL
+        standings_service.invalidate()
+
+    async def asyncTearDown(self):
+        shared.set_api_base_url(self.previous_base_url)
+        standings_service.invalidate()
+        self.warehouse.close()
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    async def test_only_teams_that_played_are_fetched_again(self):
+        async with NHLApiStandin(fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url)
+            async with FetchScheduler(cache=self.cache) as scheduler:
+                first = await self.sync.sync(scheduler)
+                stored = self.warehouse.player_stat_lines()
+                first_requests = standin.request_count
+
+                # Nothing changed: only the season list and the standings are requested
+                self.cache.clear()
+                standings_service.invalidate()
+                requests_before = standin.request_count
+                unchanged = await self.sync.sync(scheduler)
+                self.assertEqual(standin.request_count - requests_before, 2)
+
+                # Toronto played a game: only its roster and players are requested
+                standings = standin.synthesizer.standings()
+                for team in standings['standings']:
+                    if team['teamAbbrev']['default'] == 'TOR':
+                        team['gamesPlayed'] += 1
+                with open(os.path.join(self.tmpdir.name, "standings.json"), "w") as file:
+                    json.dump(standings, file)
+                self.cache.clear()
+                standings_service.invalidate()
+                played = await self.sync.sync(scheduler)
+
+        self.assertTrue(first.complete)
+        self.assertEqual(len(first.results), 22 * len(shared.nhl_team_abbreviations))
+        self.assertEqual(len(stored), len(first.results))
+        # Standings, rosters and a few report pages; no landing pages
+        self.assertLess(first_requests, len(shared.nhl_team_abbreviations) + 20)
+        self.assertGreaterEqual(stored[0].points, stored[-1].points)
+        self.assertEqual(unchanged.results, [])
+        self.assertEqual({line.team for line in played.results}, {'TOR'})
+        self.assertEqual(len(self.warehouse.player_stat_lines()), len(stored))
+
+        goalies = self.warehouse.goalie_stat_lines()
+        self.assertEqual(len(goalies), 2 * len(shared.nhl_team_abbreviations))
+        self.assertGreaterEqual(goalies[0].wins, goalies[-1].wins)
+        self.assertTrue(all(goalie.quality_starts is not None for goalie in goalies))
+
+    async def test_standings_are_read_back_from_the_warehouse(self):
+        async with NHLApiStandin(fixture_dir=self.tmpdir.name) as standin:
+            shared.set_api_base_url(standin.base_url)
+            async with FetchScheduler(cache=self.cache) as scheduler:
+                snapshot = await standings_service.snapshot(scheduler)
+
+        first_id = self.warehouse.record_standings(snapshot)
+        self.assertEqual(self.warehouse.record_standings(snapshot), first_id)
+        self.assertEqual(self.warehouse.latest_standings().rows(), snapshot.rows())
+
+class TestWarehouseSyncLock(unittest.TestCase):
+    def test_only_the_latest_loops_lock_is_kept(self):
+        sync = WarehouseSync(None)
+
+        async def locks():
+            return sync._lock(), sync._lock()
+
+        first, again = asyncio.run(locks())
+        second, _ = asyncio.run(locks())
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+        self.assertIs(sync._sync_lock, second)
+
+
+class TestStatsWarehouseSchema(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "stats.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_databases_without_the_added_standings_columns_are_upgraded(self):
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("CREATE TABLE standings_rows (snapshot_id INTEGER NOT NULL, rank INTEGER NOT NULL, team TEXT,"
+                         " games_played INTEGER NOT NULL, wins INTEGER NOT NULL, losses INTEGER NOT NULL,"
+                         " points INTEGER NOT NULL, goal_differential INTEGER NOT NULL,"
+                         " goal_differential_pctg REAL NOT NULL, goal_against INTEGER NOT NULL,"
+                         " goal_for INTEGER NOT NULL, goals_for_pctg REAL NOT NULL, PRIMARY KEY (snapshot_id, rank))")
+        conn.close()
+        warehouse = StatsWarehouse(self.path)
+        snapshot = StandingsSnapshot({'standings': [{
+            'teamName': {'default': 'Rangers'}, 'teamAbbrev': {'default': 'NYR'}, 'teamLogo': 'NYR.svg',
+            'gamesPlayed': 82, 'wins': 55,
+            'losses': 23, 'otLosses': 4, 'points': 114, 'regulationWins': 43, 'goalDifferential': 53,
+            'goalDifferentialPctg': 0.646, 'goalAgainst': 229, 'goalFor': 282, 'goalsForPctg': 3.439}]})
+
+        warehouse.record_standings(snapshot)
+        stored = warehouse.latest_standings().teams[0]
+        warehouse.close()
+
+        self.assertEqual((stored['OT Losses'], stored['Regulation Wins']), (4, 43))
+
+
+if __name__ == '__main__':
+    unittest.main()
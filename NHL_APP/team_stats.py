@@ -1,91 +1,425 @@
-import requests
-import requests_cache
+from array import array
 from datetime import date
+from functools import partial
+import sys
+import time
 import aiohttp
 import asyncio
-from shared import format_shooting_percentage
+from api_cache import api_cache
+from instrumentation import span
+from shared import (CURRENT_SEASON, api_url, format_shooting_percentage, is_completed_season, previous_season,
+                    season_label)
 
 
-def top_3_teams():
+STANDINGS_MAX_AGE = 5 * 60  # Seconds a snapshot is reused before the standings are fetched again
+GAMES_PER_SEASON = 82  # Regular season games per team, over which the pace columns are projected
+
+# Column headers of the team stats table: the standings as stored, then the metrics derived from them
+TEAM_STAT_COLUMNS = [
+    "Team", "Games Played", "Wins", "Losses", "OT Losses", "Points", "Regulation Wins", "Goal For", "Goal Against",
+    "Goal Differential", "Points Percentage", "Goals For Per Game", "Goals Against Per Game", "Points Pace",
+    "Wins Pace",
+]
+
+
+class StandingsSnapshot:
     """
-    Fetches and returns the top 3 teams from the NHL standings.
+    The NHL standings of one season parsed once from a single `/v1/standings` response.
 
-    This function makes a GET request to the NHL standings API, extracts the top 3 teams,
-    and formats their information into a list of dictionaries. Each dictionary contains
-    the team's name, wins and losses record, points, and logo URL.
+    Both the home screen's top teams and the full standings table are views of the same parsed teams,
+    so neither needs its own request or its own parse.
 
-    Returns:
-        list of dict: A list containing dictionaries for each of the top 3 teams. Each dictionary
-        includes the team's name ('Team'), wins and losses record ('wins_losses'), points ('Points'),
-        and logo URL ('logo'). If the 'standings' key is not present in the response, an empty list is returned.
+    Parameters:
+        standings (dict): The decoded standings response.
+        season (int): The season ID of the standings.
+
+    Attributes:
+        teams (list of dict): One entry per team in standings order, holding the name, abbreviation,
+            logo and every stat shown by `rows`, `top` and `TeamStatTable`.
+        season (int): The season ID of the standings.
+        fetched_at (float): The `time.monotonic()` value when the snapshot was built.
     """
-    url = 'https://api-web.nhle.com/v1/standings/now'
-    r = requests.get(url).json()  # Sends a GET request to the NHL standings API.
-    top_3 = []  # Initializes an empty list to store the top 3 teams' information.
-    if 'standings' in r:  # Checks if the 'standings' key is present in the API response.
-        for team in r['standings'][:3]:  # Iterates over the top 3 teams in the standings.
-            team_name = team.get('teamName', {}).get('default')  # Extracts the team's name.
-            points = team.get('points', {})  # Extracts the team's points.
-            wins = team.get('wins', {})  # Extracts the number of wins.
-            losses = team.get('losses', {})  # Extracts the number of losses.
-            logo = team.get('teamLogo', {})  # Extracts the team's logo URL.
-            wins_and_losses = f"{wins} - {losses}"  # Formats the wins and losses record.
-            top_3.append({
-                'Team': team_name,
-                'wins_losses': wins_and_losses,
-                'Points': points,
-                'logo': logo
-                
-            })  # Appends the team's information as a dictionary to the top_3 list.
-    
-    return top_3  # Returns the list of top 3 teams.
-
-async def team_standings():
+    def __init__(self, standings, season=CURRENT_SEASON):
+        self.season = season
+        self.fetched_at = time.monotonic()
+        self.teams = []
+        for team in standings.get('standings', []):
+            self.teams.append({
+                'Team': team.get('teamName', {}).get('default'),
+                'abbrev': team.get('teamAbbrev', {}).get('default'),
+                'logo': team.get('teamLogo', {}),
+                'Games Played': team.get('gamesPlayed', 0),
+                'Wins': team.get('wins', {}),
+                'Losses': team.get('losses', {}),
+                'OT Losses': team.get('otLosses', 0),
+                'Points': team.get('points', {}),
+                'Regulation Wins': team.get('regulationWins', 0),
+                'Goal Differential': team.get('goalDifferential', 0),
+                'Goal Differential Percentage': team.get('goalDifferentialPctg', 0),
+                'Goal Against': team.get('goalAgainst', 0),
+                'Goal For': team.get('goalFor', 0),
+                'Goals For Percentage': team.get('goalsForPctg', 0),
+            })
+
+    @classmethod
+    def from_teams(cls, teams, season=CURRENT_SEASON):
+        """
+        Builds a snapshot from teams that were already parsed, e.g. when read back from the stats warehouse.
+
+        Parameters:
+            teams (list of dict): Teams in standings order, shaped like `StandingsSnapshot.teams`.
+            season (int): The season ID of the standings.
+
+        Returns:
+            StandingsSnapshot: The snapshot.
+        """
+        snapshot = cls({}, season)
+        snapshot.teams = list(teams)
+        return snapshot
+
+    def top(self, n):
+        """
+        Returns the first `n` teams in the standings in the shape shown on the home screen.
+
+        Parameters:
+            n (int): The number of teams.
+
+        Returns:
+            list of dict: One dictionary per team with the team's name ('Team'), wins and losses record
+            ('wins_losses'), points ('Points'), and logo URL ('logo').
+        """
+        return [{
+            'Team': team['Team'],
+            'wins_losses': f"{team['Wins']} - {team['Losses']}",
+            'Points': team['Points'],
+            'logo': team['logo'],
+        } for team in self.teams[:n]]
+
+    def rows(self):
+        """
+        Returns every team in the standings in the shape shown by the team stats table.
+
+        Returns:
+            list of dict: One dictionary per team with keys for 'Team', 'Games Played', 'Wins', 'Losses',
+            'Points', 'Goal Differential', 'Goal Differential Percentage', 'Goal Against', 'Goal For',
+            and 'Goals For Percentage'. The two percentages are formatted for display.
+        """
+        return [{
+            'Team': team['Team'],
+            'Games Played': team['Games Played'],
+            'Wins': team['Wins'],
+            'Losses': team['Losses'],
+            'Points': team['Points'],
+            'Goal Differential': team['Goal Differential'],
+            'Goal Differential Percentage': format_shooting_percentage(team['Goal Differential Percentage']),
+            'Goal Against': team['Goal Against'],
+            'Goal For': team['Goal For'],
+            'Goals For Percentage': format_shooting_percentage(team['Goals For Percentage']),
+        } for team in self.teams]
+
+
+class TeamStatTable:
+    """
+    The standings of every team packed into columns, with the derived metrics computed up front.
+
+    Stored counts are kept as `array('q')` columns. The derived metrics are computed for all teams in one
+    pass over those columns into `array('d')` columns when the table is built, and every cell's display
+    value is prepared at the same time, so painting a cell is a lookup. Column indices follow
+    `TEAM_STAT_COLUMNS`; a last, undisplayed column holds the team abbreviations.
+
+    A team that has not played yet has every rate and pace at 0.
+
+    Parameters:
+        teams (iterable of dict): Teams shaped like `StandingsSnapshot.teams`.
     """
-    Asynchronously fetches and returns the standings of NHL teams.
+    TEXT_COLUMNS = (0,)
+    ABBREV_COLUMN = len(TEAM_STAT_COLUMNS)
+    # `StandingsSnapshot.teams` keys of the stored count columns, in column order
+    COUNT_KEYS = ('Games Played', 'Wins', 'Losses', 'OT Losses', 'Points', 'Regulation Wins', 'Goal For',
+                  'Goal Against', 'Goal Differential')
+    # Formats of the derived columns, in column order
+    DERIVED_FORMATS = ("{:.3f}", "{:.2f}", "{:.2f}", "{:.0f}", "{:.0f}")
+
+    def __init__(self, teams=()):
+        teams = list(teams)
+        names = [sys.intern(team.get('Team') or "") for team in teams]
+        counts = [array('q', (int(team.get(key) or 0) for team in teams)) for key in self.COUNT_KEYS]
+        count = dict(zip(self.COUNT_KEYS, counts))
+        derived = self.derive(count['Games Played'], count['Wins'], count['Points'], count['Goal For'],
+                              count['Goal Against'])
+        abbreviations = [sys.intern(team.get('abbrev') or "") for team in teams]
+        self.columns = [names] + counts + derived + [abbreviations]
+        self.display_columns = [names] + counts + [
+            [fmt.format(value) for value in column] for fmt, column in zip(self.DERIVED_FORMATS, derived)]
+        # The points percentage is shown in the usual .625 form
+        points_pctg = TEAM_STAT_COLUMNS.index("Points Percentage")
+        self.display_columns[points_pctg] = [value.lstrip("0") for value in self.display_columns[points_pctg]]
+
+    @staticmethod
+    def derive(games_played, wins, points, goal_for, goal_against):
+        """
+        Computes the derived metrics of every team in one pass over the count columns they depend on.
+
+        Parameters:
+            games_played, wins, points, goal_for, goal_against (array): The count columns, one value per team.
+
+        Returns:
+            list of array: The points percentage, goals for and against per game, and the points and wins
+            projected over `GAMES_PER_SEASON` games, one value per team.
+        """
+        points_pctg, goals_for_per_game, goals_against_per_game, points_pace, wins_pace = (
+            array('d') for _ in range(5))
+        for games, won, pts, scored, allowed in zip(games_played, wins, points, goal_for, goal_against):
+            per_game = 1 / games if games else 0.0
+            points_pctg.append(pts * per_game / 2)
+            goals_for_per_game.append(scored * per_game)
+            goals_against_per_game.append(allowed * per_game)
+            points_pace.append(pts * per_game * GAMES_PER_SEASON)
+            wins_pace.append(won * per_game * GAMES_PER_SEASON)
+        return [points_pctg, goals_for_per_game, goals_against_per_game, points_pace, wins_pace]
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def key(self, row):
+        """
+        Returns the team's abbreviation, or its name when the abbreviation is not known.
+        """
+        return self.columns[self.ABBREV_COLUMN][row] or self.columns[0][row]
+
+    def row_values(self, row):
+        """
+        Returns every stored and derived value of one row, for comparing rows between updates.
+        """
+        return tuple(column[row] for column in self.columns)
+
+    def value(self, row, column):
+        """
+        Returns the raw value stored at a row and column.
+
+        Parameters:
+            row (int): The row in the table.
+            column (int): The column index, following `TEAM_STAT_COLUMNS`.
 
-    This function makes an asynchronous GET request to the NHL standings API and processes the response
-    to extract detailed information about each team. The information includes the team's name, games played,
-    wins, losses, points, goal differential, goal differential percentage, goals against, goals for, and goals
-    for percentage. The goal differential percentage and goals for percentage are formatted using a shared utility
-    function.
+        Returns:
+            str, int or float: The stored value.
+        """
+        return self.columns[column][row]
+
+    def display_value(self, row, column):
+        """
+        Returns the value to show at a row and column.
+
+        Parameters:
+            row (int): The row in the table.
+            column (int): The column index, following `TEAM_STAT_COLUMNS`.
+
+        Returns:
+            str or int: The display value.
+        """
+        return self.display_columns[column][row]
+
+    def sorted_rows(self, column, descending=False):
+        """
+        Returns the rows ordered by the raw values of one column.
+
+        Parameters:
+            column (int): The column index to sort by.
+            descending (bool): Whether to put the largest values first.
+
+        Returns:
+            array: The row indices in sorted order. Ties keep their table order.
+        """
+        return array('l', sorted(range(len(self)), key=self.columns[column].__getitem__, reverse=descending))
+
+
+class StandingsService:
+    """
+    Holds a `StandingsSnapshot` per season and coalesces concurrent requests for each.
+
+    The first caller starts a season's standings fetch; every caller that arrives while it is in flight
+    awaits the same task instead of issuing another request. The current season's snapshot is then reused
+    until it is older than `max_age` seconds. A completed season's standings never change, so its snapshot
+    is kept for good and its responses are cached as immutable.
+
+    Parameters:
+        max_age (float): The number of seconds a snapshot is reused before the standings are fetched again.
+    """
+    def __init__(self, max_age=STANDINGS_MAX_AGE):
+        self.max_age = max_age
+        self._snapshots = {}
+        self._pending = {}
+
+    def current(self, season=CURRENT_SEASON):
+        """
+        Returns the held snapshot of a season if it is still fresh.
+
+        Parameters:
+            season (int): The season ID.
+
+        Returns:
+            StandingsSnapshot or None: The snapshot, or None if none is held or it has expired.
+        """
+        snapshot = self._snapshots.get(season)
+        if snapshot is not None and (is_completed_season(season)
+                                     or time.monotonic() - snapshot.fetched_at < self.max_age):
+            return snapshot
+        return None
+
+    async def snapshot(self, scheduler=None, season=CURRENT_SEASON):
+        """
+        Asynchronously returns a season's standings snapshot, fetching it if needed.
+
+        Parameters:
+            scheduler (FetchScheduler, optional): An open scheduler used to make the request, so the call
+                shares its connection pool. If omitted, a one-off session is used.
+            season (int): The season ID. Defaults to the current season.
+
+        Returns:
+            StandingsSnapshot: The shared snapshot.
+
+        Raises:
+            LookupError: If the season has no published standings or a request did not return 200. Nothing
+                is held then, so the next call tries again.
+        """
+        snapshot = self.current(season)
+        if snapshot is not None:
+            return snapshot
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(season)
+        if pending is None or pending.get_loop() is not loop:
+            pending = self._pending[season] = loop.create_task(self._fetch(scheduler, season))
+        try:
+            snapshot = await pending
+        finally:
+            if self._pending.get(season) is pending and pending.done():
+                del self._pending[season]
+        self._snapshots[season] = snapshot
+        return snapshot
+
+    @staticmethod
+    async def _fetch(scheduler, season):
+        if scheduler is not None:
+            return await StandingsService._fetch_with(scheduler.get, season)
+        async with aiohttp.ClientSession() as session:
+            return await StandingsService._fetch_with(partial(api_cache.get_async, session), season)
+
+    @staticmethod
+    async def _fetch_with(get, season):
+        # Standings are requested by date within the season's dates, so they are always those of the
+        # season asked for, the same one the player reports are requested for
+        start, end = await StandingsService._season_dates(get, season)
+        if is_completed_season(season):
+            # A completed season's standings are those of its last day
+            url = api_url(f'/v1/standings/{end}')
+            response = StandingsService._checked(await get(url, immutable=True), url)
+        else:
+            url = api_url(f'/v1/standings/{max(start, min(date.today().isoformat(), end))}')
+            response = StandingsService._checked(await get(url), url)
+        with span("team_standings", "parse", bytes=len(response.body), season=season):
+            return StandingsSnapshot(response.json(), season)
+
+    @staticmethod
+    async def _season_dates(get, season):
+        url = api_url('/v1/standings-season')
+        # A cached season list may predate the current season, so that one is looked up again once
+        for revalidate in (False, True):
+            seasons = StandingsService._checked(await get(url, revalidate=revalidate), url).json().get('seasons', [])
+            entry = next((entry for entry in seasons if entry.get('id') == season), None)
+            if entry is not None and entry.get('standingsStart') and entry.get('standingsEnd'):
+                return entry['standingsStart'], entry['standingsEnd']
+            if is_completed_season(season):
+                break
+        raise LookupError(f"No standings are published for {season_label(season)}")
+
+    @staticmethod
+    def _checked(response, url):
+        # A failed request raises rather than being parsed, so it is never held as an empty snapshot
+        if response.status != 200:
+            raise LookupError(f"{url} returned status {response.status}")
+        return response
+
+    def invalidate(self):
+        """
+        Drops the current season's snapshot so the next caller fetches the standings again. Completed
+        seasons are kept, since their standings cannot change.
+        """
+        self._snapshots.pop(CURRENT_SEASON, None)
+
+
+# Shared standings used by the home screen and the team stats dialog
+standings_service = StandingsService()
+
+
+async def team_standings(scheduler=None, season=CURRENT_SEASON):
+    """
+    Asynchronously returns the standings of NHL teams.
+
+    The teams are taken from the shared standings snapshot, which is fetched once and also backs the
+    home screen's top teams. The information includes the team's name, games played, wins, losses, points, goal
+    differential, goal differential percentage, goals against, goals for, and goals for percentage. The goal
+    differential percentage and goals for percentage are formatted using a shared utility function.
+
+    Parameters:
+        scheduler (FetchScheduler, optional): An open scheduler used to make the request, so the call shares its
+            connection pool. If omitted, a one-off session is used.
+        season (int): The season ID. Defaults to the current season.
 
     Returns:
         list of dict: A list of dictionaries, each representing a team and its standings information. Each dictionary
         contains keys for 'Team', 'Games Played', 'Wins', 'Losses', 'Points', 'Goal Differential', 'Goal Differential
         Percentage', 'Goal Against', 'Goal For', and 'Goals For Percentage'.
     """
-    url = 'https://api-web.nhle.com/v1/standings/now'
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            r = await response.json()
-    team_standings = []
-    if 'standings' in r:
-        for team in r['standings']:
-            team_name = team.get('teamName', {}).get('default')
-            points = team.get('points', {})
-            wins = team.get('wins', {})
-            losses = team.get('losses', {})
-            games_played = team.get('gamesPlayed', 0)
-            goal_differential = team.get('goalDifferential', 0)
-            goal_differential_percentage = team.get('goalDifferentialPctg', 0)
-            goal_against = team.get('goalAgainst', 0)
-            goal_for = team.get('goalFor', 0)
-            goals_for_percentage = team.get('goalsForPctg', 0)
-            
-            team_standings.append({
-                'Team': team_name,
-                'Games Played': games_played,
-                'Wins': wins,
-                'Losses': losses,
-                'Points': points,
-                'Goal Differential': goal_differential,
-                'Goal Differential Percentage': format_shooting_percentage(goal_differential_percentage),
-                'Goal Against': goal_against,
-                'Goal For': goal_for,
-                'Goals For Percentage': format_shooting_percentage(goals_for_percentage),
-            })
-    return team_standings
+    snapshot = await standings_service.snapshot(scheduler, season)
+    return snapshot.rows()
+
+def season_over_season(current, previous):
+    """
+    Compares each team's standings with the season before.
+
+    Parameters:
+        current (StandingsSnapshot): The standings of the later season.
+        previous (StandingsSnapshot): The standings of the earlier season.
+
+    Returns:
+        list of dict: One dictionary per team in the later season's standings order, with the team's name
+        ('Team'), points in both seasons ('Points', 'Previous Points'), and the change in points, wins and
+        goal differential ('Points Change', 'Wins Change', 'Goal Differential Change'). The previous values
+        and the changes are None for a team that did not play in the earlier season.
+    """
+    before = {team['abbrev']: team for team in previous.teams}
+    rows = []
+    for team in current.teams:
+        earlier = before.get(team['abbrev'])
+        rows.append({
+            'Team': team['Team'],
+            'Points': team['Points'],
+            'Previous Points': earlier['Points'] if earlier else None,
+            'Points Change': team['Points'] - earlier['Points'] if earlier else None,
+            'Wins Change': team['Wins'] - earlier['Wins'] if earlier else None,
+            'Goal Differential Change': team['Goal Differential'] - earlier['Goal Differential'] if earlier else None,
+        })
+    return rows
+
+async def compare_with_previous_season(scheduler=None, season=CURRENT_SEASON):
+    """
+    Asynchronously compares each team's standings in a season with the season before.
+
+    Both seasons' standings are fetched concurrently. The earlier one is a completed season, so after the
+    first comparison it costs no request at all.
+
+    Parameters:
+        scheduler (FetchScheduler, optional): An open scheduler used to make the requests. If omitted,
+            one-off sessions are used.
+        season (int): The later season ID. Defaults to the current season.
+
+    Returns:
+        list of dict: The comparison rows described by `season_over_season`.
+    """
+    current, previous = await asyncio.gather(standings_service.snapshot(scheduler, season),
+                                             standings_service.snapshot(scheduler, previous_season(season)))
+    return season_over_season(current, previous)
+
 async def main():
     """
     Asynchronously retrieves and returns the NHL team standings.
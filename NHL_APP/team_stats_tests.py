@@ -0,0 +1,129 @@
+import asyncio
+import json
+import unittest
+from datetime import date
+
+from api_cache import CachedResponse
+from shared import CURRENT_SEASON, season_for_date
+from team_stats import StandingsService, StandingsSnapshot, season_over_season
+
+STANDINGS = {
+    'standings': [
+        {'teamName': {'default': 'Rangers'}, 'teamLogo': 'https://assets.nhle.com/logos/nhl/svg/NYR_light.svg',
+         'gamesPlayed': 82, 'wins': 55, 'losses': 23, 'points': 114, 'goalDifferential': 53,
+         'goalDifferentialPctg': 0.646, 'goalAgainst': 229, 'goalFor': 282, 'goalsForPctg': 3.439},
+        {'teamName': {'default': 'Stars'}, 'teamLogo': 'https://assets.nhle.com/logos/nhl/svg/DAL_light.svg',
+         'gamesPlayed': 82, 'wins': 52, 'losses': 21, 'points': 113, 'goalDifferential': 67,
+         'goalDifferentialPctg': 0.817, 'goalAgainst': 231, 'goalFor': 298, 'goalsForPctg': 3.634},
+    ]
+}
+
+
+SEASONS = {'seasons': [{'id': 20222023, 'standingsStart': '2022-10-07', 'standingsEnd': '2023-04-14'},
+                       {'id': CURRENT_SEASON, 'standingsStart': f'{CURRENT_SEASON // 10000}-10-01',
+                        'standingsEnd': f'{CURRENT_SEASON % 10000}-04-30'}]}
+
+
+class FakeScheduler:
+    def __init__(self, standings_status=200):
+        self.standings_status = standings_status
+        self.calls = 0
+        self.urls = []
+
+    async def get(self, url, revalidate=False, immutable=False):
+        self.urls.append((url.split('/v1/')[-1], immutable))
+        self.calls += not url.endswith('standings-season')  # Standings requests only
+        await asyncio.sleep(0.01)
+        if url.endswith('standings-season'):
+            return CachedResponse(200, json.dumps(SEASONS).encode())
+        return CachedResponse(self.standings_status, json.dumps(STANDINGS).encode())
+
+
+class TestStandingsSnapshot(unittest.TestCase):
+    def test_top_and_rows_share_one_parse(self):
+        snapshot = StandingsSnapshot(STANDINGS)
+
+        self.assertEqual(snapshot.top(1), [{
+            'Team': 'Rangers', 'wins_losses': '55 - 23', 'Points': 114,
+            'logo': 'https://assets.nhle.com/logos/nhl/svg/NYR_light.svg'}])
+        rows = snapshot.rows()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['Team'], 'Stars')
+        self.assertEqual(rows[1]['Goals For Percentage'], '363.40%')
+
+    def test_season_over_season_compares_teams_by_abbreviation(self):
+        current = StandingsSnapshot.from_teams([
+            {'Team': 'Rangers', 'abbrev': 'NYR', 'Points': 114, 'Wins': 55, 'Goal Differential': 53},
+            {'Team': 'Utah', 'abbrev': 'UTA', 'Points': 89, 'Wins': 38, 'Goal Differential': -8},
+        ])
+        previous = StandingsSnapshot.from_teams([
+            {'Team': 'Rangers', 'abbrev': 'NYR', 'Points': 107, 'Wins': 47, 'Goal Differential': 61},
+        ], season=20222023)
+
+        rows = season_over_season(current, previous)
+
+        self.assertEqual(rows[0], {'Team': 'Rangers', 'Points': 114, 'Previous Points': 107, 'Points Change': 7,
+                                   'Wins Change': 8, 'Goal Differential Change': -8})
+        self.assertIsNone(rows[1]['Points Change'])
+
+
+class TestStandingsService(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_coalesce_onto_one_request(self):
+        service = StandingsService()
+        scheduler = FakeScheduler()
+
+        snapshots = await asyncio.gather(*(service.snapshot(scheduler) for _ in range(5)))
+        again = await service.snapshot(scheduler)
+
+        self.assertEqual(scheduler.calls, 1)
+        self.assertTrue(all(snapshot is again for snapshot in snapshots))
+
+    async def test_expired_snapshot_is_fetched_again(self):
+        service = StandingsService(max_age=0)
+        scheduler = FakeScheduler()
+
+        await service.snapshot(scheduler)
+        await service.snapshot(scheduler)
+
+        self.assertEqual(scheduler.calls, 2)
+
+    async def test_completed_season_is_fetched_once_from_its_last_day(self):
+        service = StandingsService(max_age=0)
+        scheduler = FakeScheduler()
+
+        first = await service.snapshot(scheduler, season=20222023)
+        again = await service.snapshot(scheduler, season=20222023)
+        service.invalidate()
+
+        self.assertIs(service.current(20222023), first)
+        self.assertIs(again, first)
+        self.assertEqual(first.season, 20222023)
+        self.assertEqual(scheduler.urls, [('standings-season', False), ('standings/2023-04-14', True)])
+
+    async def test_current_season_standings_are_requested_within_its_dates(self):
+        scheduler = FakeScheduler()
+
+        snapshot = await StandingsService().snapshot(scheduler)
+
+        day = scheduler.urls[-1][0].split('/')[-1]
+        self.assertEqual(season_for_date(date.fromisoformat(day)), CURRENT_SEASON)
+        self.assertEqual(scheduler.urls[-1][1], False)
+        self.assertEqual(snapshot.season, CURRENT_SEASON)
+
+    async def test_failed_requests_raise_and_are_not_held(self):
+        service = StandingsService()
+
+        with self.assertRaises(LookupError):
+            await service.snapshot(FakeScheduler(standings_status=503), season=20222023)
+        snapshot = await service.snapshot(FakeScheduler(), season=20222023)
+
+        self.assertEqual(len(snapshot.teams), 2)
+        self.assertIs(service.current(20222023), snapshot)
+
+    async def test_seasons_without_standings_raise(self):
+        with self.assertRaises(LookupError):
+            await StandingsService().snapshot(FakeScheduler(), season=19041905)
+
+
+if __name__ == '__main__':
+    unittest.main()
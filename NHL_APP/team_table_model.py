@@ -0,0 +1,180 @@
+import operator
+from array import array
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+from team_stats import TEAM_STAT_COLUMNS, TeamStatTable
+
+# Prefixes of a team filter that compare a numeric column with a number, longest first
+COMPARISONS = ((">=", operator.ge), ("<=", operator.le), (">", operator.gt), ("<", operator.lt), ("=", operator.eq))
+
+
+class TeamStatsModel(QAbstractTableModel):
+    """
+    A read-only table model over a `TeamStatTable`, with numeric columns and derived metrics.
+
+    The table prepares every display value when the standings arrive, so `data` only looks values up.
+    Like `PlayerStatsModel`, the model keeps a permutation of storage rows as its view order and sorts
+    by the raw numbers, so percentages and paces sort as numbers rather than as text.
+
+    Parameters:
+        parent (QObject, optional): The owner of the model.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = TeamStatTable()
+        self._order = array('l')
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TEAM_STAT_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.store.display_value(self._order[index.row()], index.column())
+        if role == Qt.TextAlignmentRole and index.column() not in TeamStatTable.TEXT_COLUMNS:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return TEAM_STAT_COLUMNS[section]
+        return section + 1
+
+    def storage_row(self, row):
+        """
+        Returns the storage row shown at a given view row.
+
+        Parameters:
+            row (int): The row in the model.
+
+        Returns:
+            int: The row in `store`.
+        """
+        return self._order[row]
+
+    def set_teams(self, teams):
+        """
+        Shows the given standings.
+
+        When the same teams are already shown, they keep their storage rows and only the rows whose values
+        changed are reported through `dataChanged`; if the active sort order is affected, the rows are
+        re-sorted instead. Any other standings replace the rows.
+
+        Parameters:
+            teams (iterable of dict): Teams shaped like `StandingsSnapshot.teams`.
+        """
+        teams = list(teams)
+        by_key = {team.get('abbrev') or team.get('Team'): team for team in teams}
+        old = self.store
+        same_teams = (0 < len(old) == len(teams) == len(by_key)
+                      and all(old.key(row) in by_key for row in range(len(old))))
+        if same_teams:
+            self.store = TeamStatTable(by_key[old.key(row)] for row in range(len(old)))
+            changed = [row for row in range(len(old)) if self.store.row_values(row) != old.row_values(row)]
+            if not changed:
+                return
+            if self._sort_column >= 0 and self.store.sorted_rows(self._sort_column,
+                                                                self._sort_order == Qt.DescendingOrder) != self._order:
+                self.sort(self._sort_column, self._sort_order)
+            else:
+                view_rows = {storage_row: row for row, storage_row in enumerate(self._order)}
+                last_column = self.columnCount() - 1
+                for storage_row in changed:
+                    row = view_rows[storage_row]
+                    self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+            return
+
+        self.beginResetModel()
+        self.store = TeamStatTable(teams)
+        self._order = array('l', range(len(self.store)))
+        self.endResetModel()
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts the model by one column using the raw stored values.
+
+        Parameters:
+            column (int): The column index to sort by, or -1 to restore standings order.
+            order (Qt.SortOrder): The sort direction.
+        """
+        self.layoutAboutToBeChanged.emit()
+        old_order = self._order
+        if column < 0:
+            self._order = array('l', range(len(self.store)))
+        else:
+            self._order = self.store.sorted_rows(column, order == Qt.DescendingOrder)
+        self._sort_column = column
+        self._sort_order = order
+
+        # Keep selections and the current index on the same teams after the rows move
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_rows = {storage_row: row for row, storage_row in enumerate(self._order)}
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(new_rows[old_order[index.row()]], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+
+class TeamStatsFilterProxy(QSortFilterProxyModel):
+    """
+    Filters a `TeamStatsModel` on any column and forwards sorting to the source model.
+
+    Text is looked for in the shown values, ignoring case; the team column also matches abbreviations.
+    On a numeric column, a filter starting with a comparison, such as '>= 90' or '< .500', keeps the
+    teams whose stored value compares true instead.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._needle = ""
+        self._column = -1
+        self._comparison = None
+
+    def set_filter(self, text, column=-1):
+        """
+        Shows only the teams matching a filter.
+
+        Parameters:
+            text (str): The text to look for, or a comparison on a numeric column. An empty string shows
+                every team.
+            column (int): The column index to filter on, or -1 to look in every column.
+        """
+        self._needle = text.strip().casefold()
+        self._column = column
+        self._comparison = None
+        if column >= 0 and column not in TeamStatTable.TEXT_COLUMNS:
+            for symbol, compare in COMPARISONS:
+                if self._needle.startswith(symbol):
+                    try:
+                        self._comparison = compare, float(self._needle[len(symbol):])
+                    except ValueError:
+                        pass  # Not a number yet, e.g. while it is being typed; look for the text instead
+                    break
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._needle:
+            return True
+        store = self.sourceModel().store
+        storage_row = self.sourceModel().storage_row(source_row)
+        if self._comparison is not None:
+            compare, number = self._comparison
+            return compare(store.value(storage_row, self._column), number)
+        columns = range(len(TEAM_STAT_COLUMNS)) if self._column < 0 else (self._column,)
+        if 0 in columns and self._needle in store.value(storage_row, TeamStatTable.ABBREV_COLUMN).casefold():
+            return True
+        return any(self._needle in str(store.display_value(storage_row, column)).casefold() for column in columns)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
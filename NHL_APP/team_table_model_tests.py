@@ -0,0 +1,68 @@
+import unittest
+
+from PyQt5.QtCore import Qt
+
+from team_stats import TEAM_STAT_COLUMNS
+from team_table_model import TeamStatsFilterProxy, TeamStatsModel
+
+
+def team(name, abbrev, wins, points, goal_for=250, games=82):
+    return {'Team': name, 'abbrev': abbrev, 'Games Played': games, 'Wins': wins, 'Losses': games - wins - 5,
+            'OT Losses': 5, 'Points': points, 'Regulation Wins': wins - 4, 'Goal For': goal_for,
+            'Goal Against': 240, 'Goal Differential': goal_for - 240}
+
+
+class TestTeamStatsModel(unittest.TestCase):
+    POINTS_PCTG = TEAM_STAT_COLUMNS.index("Points Percentage")
+    POINTS_PACE = TEAM_STAT_COLUMNS.index("Points Pace")
+
+    def test_derived_columns_sort_as_numbers(self):
+        model = TeamStatsModel()
+        model.set_teams([team("Rangers", "NYR", 55, 114), team("Sharks", "SJS", 10, 25, games=41),
+                         team("Utah", "UTA", 0, 0, games=0)])
+        model.sort(self.POINTS_PACE, Qt.DescendingOrder)
+
+        self.assertEqual([model.index(row, 0).data() for row in range(3)], ["Rangers", "Sharks", "Utah"])
+        self.assertEqual(model.index(0, self.POINTS_PCTG).data(), ".695")
+        self.assertEqual(model.index(1, self.POINTS_PACE).data(), "50")
+        self.assertEqual(model.index(2, self.POINTS_PCTG).data(), ".000")
+        self.assertAlmostEqual(model.store.value(model.storage_row(0), self.POINTS_PCTG), 114 / 164)
+
+    def test_refreshed_standings_report_only_changed_rows(self):
+        model = TeamStatsModel()
+        model.set_teams([team("Rangers", "NYR", 55, 114), team("Stars", "DAL", 52, 113)])
+        changed_rows = []
+        model.dataChanged.connect(lambda top_left, bottom_right: changed_rows.append(top_left.row()))
+        resets = []
+        model.modelReset.connect(lambda: resets.append(True))
+
+        model.set_teams([team("Stars", "DAL", 53, 115, games=83), team("Rangers", "NYR", 55, 114)])
+
+        self.assertEqual(changed_rows, [1])
+        self.assertEqual(resets, [])
+        self.assertEqual(model.index(1, 2).data(), 53)
+
+    def test_proxy_filters_on_any_column(self):
+        model = TeamStatsModel()
+        proxy = TeamStatsFilterProxy()
+        proxy.setSourceModel(model)
+        model.set_teams([team("Rangers", "NYR", 55, 114), team("Stars", "DAL", 52, 113, goal_for=298),
+                         team("Sharks", "SJS", 19, 47)])
+
+        proxy.set_filter("dal")
+        self.assertEqual(proxy.index(0, 0).data(), "Stars")
+        proxy.set_filter(">= 113", TEAM_STAT_COLUMNS.index("Points"))
+        self.assertEqual(proxy.rowCount(), 2)
+        proxy.set_filter("< .5", self.POINTS_PCTG)
+        self.assertEqual(proxy.index(0, 0).data(), "Sharks")
+        proxy.set_filter("298", TEAM_STAT_COLUMNS.index("Goal For"))
+        self.assertEqual(proxy.rowCount(), 1)
+
+        proxy.set_filter("")
+        proxy.sort(TEAM_STAT_COLUMNS.index("Goal For"), Qt.DescendingOrder)
+        self.assertEqual(proxy.index(0, 0).data(), "Stars")
+
+
+
+if __name__ == '__main__':
+    unittest.main()
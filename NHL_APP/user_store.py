@@ -0,0 +1,164 @@
+import os
+import sqlite3
+
+DEFAULT_USERS_PATH = os.environ.get("NHL_USERS", "nhl_users.sqlite")
+
+# The Access database the app originally kept its users in, used by `AccessUserStore`
+DEFAULT_ACCESS_CONNECTION_STRING = (
+    r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
+    r"DBQ=C:\\Users\\domus\\OneDrive - Hillsborough Community College\\Desktop\\DB\\Database21.accdb"
+)
+
+EMAIL_TAKEN = "Email already exists!"
+USERNAME_TAKEN = "Username already exists!"
+
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS Users ("
+    " UserID INTEGER PRIMARY KEY,"
+    " Username TEXT NOT NULL,"
+    " Email TEXT NOT NULL,"
+    " Password TEXT NOT NULL)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_username_idx ON Users(Username)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_email_idx ON Users(Email)",
+]
+
+
+class UserStore:
+    """
+    Where the app's user accounts are kept.
+
+    A store opens DB-API connections and runs the two account queries on them. The `AuthService` owns the
+    connections, pools them and calls the store from its worker threads, so a store keeps no state of its
+    own beyond its configuration. Subclasses provide `connect` and may replace the queries with ones
+    suited to their database.
+    """
+    def connect(self):
+        """
+        Opens a connection to the users database.
+
+        Returns:
+            A DB-API connection whose parameters are marked with '?'.
+        """
+        raise NotImplementedError
+
+    def password_hash(self, conn, username):
+        """
+        Looks up a user's password hash.
+
+        Parameters:
+            conn: A connection opened by `connect`.
+            username (str): The username entered.
+
+        Returns:
+            str or None: The bcrypt hash, or None if there is no such user.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT Password FROM Users WHERE Username = ?", (username,))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return row[0] if row is not None else None
+
+    def add_user(self, conn, username, email, password_hash):
+        """
+        Stores a new user unless the username or email is already taken.
+
+        The check and the insert run in one transaction, so a concurrent registration cannot slip in
+        between them.
+
+        Parameters:
+            conn: A connection opened by `connect`.
+            username (str): The new user's username.
+            email (str): The new user's email address.
+            password_hash (str): The bcrypt hash of the new user's password.
+
+        Returns:
+            str or None: None once the user is stored, or the reason it was refused.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT Email FROM Users WHERE Email = ? OR Username = ?", (email, username))
+            taken = cursor.fetchone()
+            if taken is not None:
+                conn.rollback()
+                return EMAIL_TAKEN if taken[0] == email else USERNAME_TAKEN
+            cursor.execute("INSERT INTO Users (Username, Email, Password) VALUES (?,?,?)",
+                           (username, email, password_hash))
+            conn.commit()
+        finally:
+            cursor.close()
+        return None
+
+
+class AccessUserStore(UserStore):
+    """
+    Users kept in a Microsoft Access database, reached through ODBC with pyodbc.
+
+    Parameters:
+        connection_string (str): The ODBC connection string.
+    """
+    def __init__(self, connection_string=DEFAULT_ACCESS_CONNECTION_STRING):
+        self.connection_string = connection_string
+
+    def connect(self):
+        import pyodbc  # Only needed by this backend, which only runs on Windows
+        return pyodbc.connect(self.connection_string)
+
+
+class SQLiteUserStore(UserStore):
+    """
+    Users kept in an embedded SQLite database, which runs anywhere the app does.
+
+    The database is created on first use with unique indexes on `Username` and `Email`, so logins are
+    index lookups and duplicates are refused by the database itself. It runs in WAL mode so logins keep
+    reading while a registration writes. Each connection keeps its statements prepared in its statement
+    cache, so the pooled connections compile each query once.
+
+    Parameters:
+        path (str): The SQLite database file. Defaults to `nhl_users.sqlite` in the working directory.
+    """
+    def __init__(self, path=DEFAULT_USERS_PATH):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SQLITE_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        return conn
+
+    def add_user(self, conn, username, email, password_hash):
+        """
+        Stores a new user unless the username or email is already taken, in one atomic statement.
+
+        The unique indexes decide: a conflicting insert is skipped, and only then is the existing row
+        read to tell which field was taken.
+
+        Returns:
+            str or None: None once the user is stored, or the reason it was refused.
+        """
+        with conn:
+            inserted = conn.execute(
+                "INSERT INTO Users (Username, Email, Password) VALUES (?,?,?) ON CONFLICT DO NOTHING",
+                (username, email, password_hash)).rowcount
+        if inserted:
+            return None
+        taken = conn.execute("SELECT 1 FROM Users WHERE Email = ?", (email,)).fetchone()
+        return EMAIL_TAKEN if taken is not None else USERNAME_TAKEN
+
+
+def default_user_store():
+    """
+    Returns the store the app keeps its users in.
+
+    Returns:
+        UserStore: An `AccessUserStore` on the ODBC connection string in NHL_USERS_DB if that is set,
+        otherwise a `SQLiteUserStore` on `DEFAULT_USERS_PATH`.
+    """
+    connection_string = os.environ.get("NHL_USERS_DB")
+    if connection_string:
+        return AccessUserStore(connection_string)
+    return SQLiteUserStore()
@@ -0,0 +1,50 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from user_store import EMAIL_TAKEN, USERNAME_TAKEN, SQLiteUserStore, UserStore
+
+
+class TestSQLiteUserStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteUserStore(os.path.join(self.tmpdir.name, "users.sqlite"))
+        self.conn = self.store.connect()
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmpdir.cleanup()
+
+    def test_database_is_created_in_wal_mode_with_unique_indexes(self):
+        self.assertEqual(self.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[1]: row[2] for row in self.conn.execute("PRAGMA index_list(Users)")}
+        self.assertEqual(indexes, {"users_username_idx": 1, "users_email_idx": 1})
+        plan = self.conn.execute("EXPLAIN QUERY PLAN SELECT Password FROM Users WHERE Username = ?", ("dom",))
+        self.assertIn("users_username_idx", plan.fetchone()[3])
+
+    def test_taken_usernames_and_emails_are_refused_atomically(self):
+        self.assertIsNone(self.store.add_user(self.conn, "dom", "dom@example.com", "hash"))
+        self.assertEqual(self.store.add_user(self.conn, "other", "dom@example.com", "hash"), EMAIL_TAKEN)
+        self.assertEqual(self.store.add_user(self.conn, "dom", "other@example.com", "hash"), USERNAME_TAKEN)
+        self.assertEqual(self.store.password_hash(self.conn, "dom"), "hash")
+        self.assertIsNone(self.store.password_hash(self.conn, "other"))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM Users").fetchone()[0], 1)
+
+
+class TestUserStore(unittest.TestCase):
+    def test_generic_queries_check_before_inserting(self):
+        # The generic queries, used by the ODBC backend, run on any DB-API connection with '?' parameters
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE Users (Username TEXT, Email TEXT, Password TEXT)")
+        store = UserStore()
+
+        self.assertIsNone(store.add_user(conn, "dom", "dom@example.com", "hash"))
+        self.assertEqual(store.add_user(conn, "other", "dom@example.com", "hash"), EMAIL_TAKEN)
+        self.assertEqual(store.add_user(conn, "dom", "other@example.com", "hash"), USERNAME_TAKEN)
+        self.assertEqual(store.password_hash(conn, "dom"), "hash")
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()